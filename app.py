@@ -1,29 +1,44 @@
 import os
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 
 from dotenv import load_dotenv
 from flask import Flask, jsonify
-from flask_jwt_extended import JWTManager, get_jwt, set_access_cookies
+from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from flask_smorest import Api
 
 from blocklist import BLOCKLIST
+from cli import build_assets_command, compress_static_command, seed_command, templates_group
 from constants import JWT_SECRET_KEY, UPLOAD_FOLDER
 from db import db
 from resources import (
     AuthBlueprint,
     CourseBlueprint,
     CourseRegisterBlueprint,
+    DebugBlueprint,
     RoutesBlueprint,
     StudentBlueprint,
     TutorBlueprint,
 )
-from resources.auth import TokenManager, TokenRefresh
+from resources.auth import TokenManager
+from services import (
+    FastJSONProvider,
+    assets,
+    cache,
+    catalog,
+    compression,
+    fragment_cache,
+    password_hasher,
+    session_refresher,
+    sql_instrumentation,
+    template_cache,
+)
 
 
 def create_app(db_url=None):
     load_dotenv()
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
 
     app.config["PROPAGATE_EXCEPTION"] = True
     app.config["API_TITLE"] = "Tutoring REST API"
@@ -35,8 +50,20 @@ def create_app(db_url=None):
     app.config["SQLALCHEMY_DATABASE_URI"] = db_url or os.getenv("DATABASE_URL", "sqlite:///data.db")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+    app.config["STREAM_BATCH_SIZE"] = 1000
     db.init_app(app)
     Migrate(app, db)
+    BLOCKLIST.init_app(app)
+    password_hasher.init_app(app)
+    session_refresher.init_app(app)
+    sql_instrumentation.init_app(app)
+    cache.init_app(app)
+    catalog.init_app(app)
+    fragment_cache.init_app(app)
+    # the bundles are built before the static files are precompressed
+    assets.init_app(app)
+    compression.init_app(app)
+    template_cache.init_app(app)
     api = Api(app)
 
     app.config["JWT_SECRET_KEY"] = JWT_SECRET_KEY
@@ -48,7 +75,7 @@ def create_app(db_url=None):
 
     @jwt.token_in_blocklist_loader
     def check_if_token_in_blocklist(jwt_header, jwt_payload):
-        return jwt_payload["jti"] in BLOCKLIST
+        return BLOCKLIST.is_revoked(jwt_payload)
 
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
@@ -92,27 +119,18 @@ def create_app(db_url=None):
             401,
         )
 
-    @app.after_request
-    def refresh_expiring_jwts(response):
-        try:
-            exp_timestamp = get_jwt()["exp"]
-            now = datetime.now(timezone.utc)
-            target_timestamp = datetime.timestamp(now + timedelta(minutes=15))
-            if target_timestamp > exp_timestamp:
-                refresh_response = TokenRefresh.post()
-                set_access_cookies(response, refresh_response.access_token)
-            return response
-
-        except (RuntimeError, KeyError):
-            # Case where there is not a valid JWT. Just return the original response
-            return response
-
     api.register_blueprint(CourseBlueprint)
     api.register_blueprint(StudentBlueprint)
     api.register_blueprint(TutorBlueprint)
     api.register_blueprint(CourseRegisterBlueprint)
     api.register_blueprint(AuthBlueprint)
     api.register_blueprint(RoutesBlueprint)
+    api.register_blueprint(DebugBlueprint)
+
+    app.cli.add_command(seed_command)
+    app.cli.add_command(compress_static_command)
+    app.cli.add_command(build_assets_command)
+    app.cli.add_command(templates_group)
 
     return app
 
@@ -0,0 +1,186 @@
+"""
+A load driver replaying a weighted mix of the real endpoints against a running app, seeded with `flask seed`.
+Reports the p50/p95/p99 latency and throughput of each route, and optionally saves the report such that releases can
+be compared.
+
+    flask seed --students 10000 --tutors 500 --registers 2000 --prefix bench
+    gunicorn "app:create_app()" --workers 4
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 --prefix bench --students 10000 --registers 2000 \
+        --duration 60 --concurrency 32 --output release.json --compare baseline.json
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# the relative weight of each route in the replayed mix
+DEFAULT_MIX = {
+    "GET /homepage": 30,
+    "GET /students": 20,
+    "GET /course_registers": 20,
+    "POST /students/login": 10,
+    "POST /students/<id>/course_registers/<id>": 10,
+    "DELETE /students/<id>/course_registers/<id>": 10,
+}
+
+# the error statuses a route is expected to return with the random ids of the mix, they are not counted as errors
+EXPECTED_ERRORS = {
+    # the random student is often not enrolled on the random register
+    "DELETE /students/<id>/course_registers/<id>": {404},
+}
+
+
+def is_error(route, status_code):
+    """:return: True if a response is an error, anything but a 2xx or 3xx that is not expected of the route"""
+    return not 200 <= status_code < 400 and status_code not in EXPECTED_ERRORS.get(route, ())
+
+
+def percentile(latencies, percent):
+    """:return: the nearest-rank percentile of the sorted latencies"""
+    if not latencies:
+        return None
+    return latencies[max(0, math.ceil(percent / 100 * len(latencies)) - 1)]
+
+
+def summarise(results, elapsed):
+    """
+    :param results: the latencies (seconds) and whether the request failed, by route
+    :param elapsed: the duration of the run in seconds
+    :return: the report of each route
+    """
+    report = {}
+    for route, samples in sorted(results.items()):
+        latencies = sorted(latency for latency, _ in samples)
+        report[route] = {
+            "requests": len(samples),
+            "errors": sum(failed for _, failed in samples),
+            "throughput": round(len(samples) / elapsed, 2),
+            **{f"p{p}_ms": round(percentile(latencies, p) * 1000, 2) for p in (50, 95, 99)},
+        }
+    return report
+
+
+class LoadDriver:
+    """
+    Replays the weighted mix of routes from `concurrency` threads, each with its own session
+    :param base_url: the url of the running app
+    :param prefix: the `--prefix` the app was seeded with
+    :param students: the number of seeded students (requires the ids to start at 1)
+    :param registers: the number of seeded course registers (requires the ids to start at 1)
+    """
+
+    def __init__(self, base_url, prefix, students, registers, password="password", mix=None, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.prefix = prefix
+        self.students = students
+        self.registers = registers
+        self.password = password
+        self.mix = mix or DEFAULT_MIX
+        self.timeout = timeout
+        self.results = defaultdict(list)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._scenarios = {
+            "GET /homepage": lambda: self._request("GET", "/homepage"),
+            "GET /students": lambda: self._request("GET", "/students"),
+            "GET /course_registers": lambda: self._request("GET", "/course_registers"),
+            "POST /students/login": self._login,
+            "POST /students/<id>/course_registers/<id>": lambda: self._request("POST", self._enrolment_path()),
+            "DELETE /students/<id>/course_registers/<id>": lambda: self._request("DELETE", self._enrolment_path()),
+        }
+
+    @property
+    def session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _request(self, method, path, **kwargs):
+        return self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+
+    def _login(self):
+        # seeded student ids are unknown to the driver, their usernames are not
+        username = f"{self.prefix}-student-{random.randrange(self.students)}"
+        return self._request("POST", "/students/login", data={"username": username, "password": self.password})
+
+    def _enrolment_path(self):
+        return f"/students/{random.randint(1, self.students)}/course_registers/{random.randint(1, self.registers)}"
+
+    def _record(self, route, latency, failed):
+        with self._lock:
+            self.results[route].append((latency, failed))
+
+    def _worker(self, deadline):
+        routes, weights = list(self.mix), list(self.mix.values())
+        while time.monotonic() < deadline:
+            route = random.choices(routes, weights)[0]
+            started = time.perf_counter()
+            try:
+                failed = is_error(route, self._scenarios[route]().status_code)
+            except requests.RequestException:
+                failed = True
+            self._record(route, time.perf_counter() - started, failed)
+
+    def run(self, duration, concurrency):
+        """:return: the report of each route after replaying the mix for `duration` seconds"""
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(self._worker, started + duration) for _ in range(concurrency)]:
+                future.result()
+        return summarise(self.results, time.monotonic() - started)
+
+
+def print_report(report, baseline=None):
+    header = f"{'route':<46}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    if baseline:
+        header += f"{'p95 vs baseline':>17}"
+    print(header)
+    for route, stats in report.items():
+        line = (
+            f"{route:<46}{stats['requests']:>10}{stats['errors']:>8}{stats['throughput']:>10}"
+            f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+        )
+        if baseline and route in baseline:
+            change = (stats["p95_ms"] - baseline[route]["p95_ms"]) / baseline[route]["p95_ms"] * 100
+            line += f"{change:>+16.1f}%"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--prefix", default="seed", help="the --prefix the app was seeded with")
+    parser.add_argument("--students", type=int, default=1000, help="the number of seeded students")
+    parser.add_argument("--registers", type=int, default=200, help="the number of seeded course registers")
+    parser.add_argument("--password", default="password", help="the password of the seeded users")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to replay the mix for")
+    parser.add_argument("--concurrency", type=int, default=16, help="the number of concurrent clients")
+    parser.add_argument("--mix", type=json.loads, default=None, help="route weights e.g. '{\"GET /students\": 1}'")
+    parser.add_argument("--output", help="saves the report as json")
+    parser.add_argument("--compare", help="a report saved by a previous run to compare against")
+    args = parser.parse_args(argv)
+
+    driver = LoadDriver(args.base_url, args.prefix, args.students, args.registers, args.password, args.mix)
+    report = driver.run(args.duration, args.concurrency)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,295 @@
-from typing import Set
+"""
+The token revocation store (blocklist). Revoked token JTIs are stored in a backend shared by every gunicorn worker and
+expire with the token that was revoked; an expired token is rejected by its `exp` claim so it no longer needs to be
+remembered.
 
-BLOCKLIST: Set[str] = set()
+An in-process Bloom filter of the revoked JTIs sits in front of the backend. Most tokens were never revoked; the
+filter answers "definitely not revoked" for those without leaving the worker, and only possible matches are confirmed
+against the backend. The filter is kept up to date by periodically pulling the JTIs revoked since the last sync (by any
+worker), `JWT_REVOCATION_SYNC_SECONDS` bounds how long a token revoked by another worker may still be accepted.
+
+The JTIs revoked since a sync are found by the time they were added rather than by their id; ids are reused by sqlite
+once the newest rows are purged and committed out of order by postgres, either of which would hide a revocation from
+the filters of the other workers. Each sync looks back `TokenSet.SYNC_OVERLAP_SECONDS` before the previous one, such
+that a transaction committed after it started, or a host whose clock is behind, is not missed.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from flask import current_app
+from sqlalchemy import delete, select
+
+from db import conflict_insert, db
+from models import RevokedTokenModel
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    A fixed size Bloom filter
+    :param capacity: the number of items the filter is sized for
+    :param error_rate: the false positive rate of the filter when holding `capacity` items
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, item):
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self._positions(item))
+
+
+class TokenSet(ABC):
+    """
+    The interface of a set of token jtis shared between workers, each jti is held until the token it identifies
+    expires. Adding a jti is atomic such that the set can also be used to claim a token once across workers.
+    """
+
+    # how far `revoked_since` looks back before its marker, covering late commits and the clocks of other hosts
+    SYNC_OVERLAP_SECONDS = 60
+
+    @abstractmethod
+    def add(self, jti, expires_at):
+        """stores a jti until `expires_at` (unix timestamp), :return: True if the jti was not already in the set"""
+
+    @abstractmethod
+    def contains(self, jti):
+        """:return: True if the jti is in the set and has not expired"""
+
+    @abstractmethod
+    def revoked_since(self, marker):
+        """
+        :param marker: the marker returned by the previous call, None to fetch every unexpired jti
+        :return: the jtis revoked since the marker, some of which may have been returned before, and a new marker
+        """
+
+    @abstractmethod
+    def purge_expired(self):
+        """removes the jtis of tokens that have expired"""
+
+
+class DatabaseTokenSet(TokenSet):
+    """
+    Stores jtis in a database table, shared by every worker and host using the database
+    :param model: the model of the table e.g. `RevokedTokenModel`, with `jti` `expires_at` and `added_at` columns
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def add(self, jti, expires_at):
+        statement = (
+            conflict_insert(self.model.__table__)
+            .values(jti=jti, expires_at=expires_at, added_at=time.time())
+            .on_conflict_do_nothing(index_elements=["jti"])
+        )
+        # use a dedicated transaction such that adding a jti does not commit the work of the request session
+        with db.engine.begin() as connection:
+            return connection.execute(statement).rowcount == 1
+
+    def contains(self, jti):
+        statement = select(self.model.id).where(self.model.jti == jti, self.model.expires_at > int(time.time()))
+        with db.engine.connect() as connection:
+            return connection.execute(statement).first() is not None
+
+    def revoked_since(self, marker):
+        # the marker is the time of the previous call, taken before reading such that no commit falls between calls
+        now = time.time()
+        statement = select(self.model.jti).where(self.model.expires_at > int(now))
+        if marker is not None:
+            statement = statement.where(self.model.added_at > marker - self.SYNC_OVERLAP_SECONDS)
+        with db.engine.connect() as connection:
+            return connection.execute(statement.order_by(self.model.added_at)).scalars().all(), now
+
+    def purge_expired(self):
+        with db.engine.begin() as connection:
+            connection.execute(delete(self.model).where(self.model.expires_at <= int(time.time())))
+
+
+class FileTokenSet(TokenSet):
+    """
+    Stores jtis in a local sqlite file, shared by the workers of a single host without a database round trip
+    :param path: the path of the sqlite file
+    :param table: the table of the sqlite file holding the set
+    """
+
+    def __init__(self, path, table):
+        self.path = path
+        self.table = table
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(jti TEXT PRIMARY KEY, expires_at INTEGER NOT NULL, added_at REAL NOT NULL DEFAULT 0)"
+            )
+            # files created before `added_at` was added, their jtis are loaded by the next full sync of each worker
+            columns = [row[1] for row in connection.execute(f"PRAGMA table_info({table})")]
+            if "added_at" not in columns:
+                connection.execute(f"ALTER TABLE {table} ADD COLUMN added_at REAL NOT NULL DEFAULT 0")
+
+    def _connection(self):
+        """:return: the sqlite connection of the calling thread"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def add(self, jti, expires_at):
+        cursor = self._connection().execute(
+            f"INSERT OR IGNORE INTO {self.table} (jti, expires_at, added_at) VALUES (?, ?, ?)",
+            (jti, expires_at, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def contains(self, jti):
+        cursor = self._connection().execute(
+            f"SELECT 1 FROM {self.table} WHERE jti = ? AND expires_at > ?", (jti, int(time.time()))
+        )
+        return cursor.fetchone() is not None
+
+    def revoked_since(self, marker):
+        now = time.time()
+        since = marker - self.SYNC_OVERLAP_SECONDS if marker is not None else None
+        rows = (
+            self._connection()
+            .execute(
+                f"SELECT jti FROM {self.table} WHERE (? IS NULL OR added_at > ?) AND expires_at > ? ORDER BY added_at",
+                (since, since, int(now)),
+            )
+            .fetchall()
+        )
+        return [jti for (jti,) in rows], now
+
+    def purge_expired(self):
+        self._connection().execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (int(time.time()),))
+
+
+class RevocationStore:
+    """
+    Puts an in-process Bloom filter in front of a shared set of revoked jtis
+    :param backend: the TokenSet shared between workers
+    :param sync_seconds: the maximum age of the Bloom filter before it pulls newly revoked jtis from the backend
+    :param capacity: the number of revoked jtis the Bloom filter is sized for
+    :param rebuild_seconds: how often expired jtis are purged and the Bloom filter is rebuilt without them
+    """
+
+    def __init__(self, backend, sync_seconds=1.0, capacity=100_000, rebuild_seconds=3600):
+        self.backend = backend
+        self.sync_seconds = sync_seconds
+        self.capacity = capacity
+        self.rebuild_seconds = rebuild_seconds
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._marker = None
+        self._synced_at = 0.0
+        self._built_at = 0.0
+
+    def _sync(self):
+        """brings the Bloom filter up to date with the backend, rebuilding it when it is due"""
+        now = time.monotonic()
+        if self._bloom is not None and now - self._synced_at < self.sync_seconds:
+            return
+
+        with self._lock:
+            if self._bloom is None or now - self._built_at >= self.rebuild_seconds:
+                self.backend.purge_expired()
+                self._bloom, self._marker, self._built_at = BloomFilter(self.capacity), None, now
+
+            jtis, self._marker = self.backend.revoked_since(self._marker)
+            for jti in jtis:
+                self._bloom.add(jti)
+            self._synced_at = now
+
+    def revoke(self, jti, expires_at):
+        """revokes a token until it expires"""
+        revoked = self.backend.add(jti, expires_at)
+        self._sync()
+        self._bloom.add(jti)
+        return revoked
+
+    def is_revoked(self, jti):
+        """:return: True if the token has been revoked by any worker"""
+        self._sync()
+        if jti not in self._bloom:
+            return False
+
+        return self.backend.contains(jti)
+
+
+def create_token_set(app, model, table):
+    """
+    creates the TokenSet configured by `JWT_REVOCATION_BACKEND`
+    :param model: the model of the table used by the `database` backend
+    :param table: the table of the sqlite file used by the `file` backend
+    """
+    if app.config["JWT_REVOCATION_BACKEND"] == "database":
+        return DatabaseTokenSet(model)
+
+    if app.config["JWT_REVOCATION_BACKEND"] == "file":
+        os.makedirs(os.path.dirname(app.config["JWT_REVOCATION_FILE"]), exist_ok=True)
+        return FileTokenSet(app.config["JWT_REVOCATION_FILE"], table)
+
+    raise ValueError(f"unknown JWT_REVOCATION_BACKEND: {app.config['JWT_REVOCATION_BACKEND']}")
+
+
+def init_token_set_config(app):
+    """sets the defaults of the config shared by the token sets of an app"""
+    app.config.setdefault("JWT_REVOCATION_BACKEND", "database")
+    app.config.setdefault("JWT_REVOCATION_FILE", os.path.join(app.instance_path, "tokens.db"))
+
+
+class Blocklist:
+    """The flask extension holding the revocation store of an app"""
+
+    def init_app(self, app):
+        """
+        configures the revocation store of the app with the following config:
+        JWT_REVOCATION_BACKEND: one of `database` `file`, the backend shared between workers
+        JWT_REVOCATION_FILE: the sqlite file used by the `file` backend
+        JWT_REVOCATION_SYNC_SECONDS: the maximum staleness of the in-process Bloom filter
+        JWT_REVOCATION_BLOOM_CAPACITY: the number of revoked tokens the Bloom filter is sized for
+        """
+        init_token_set_config(app)
+        app.config.setdefault("JWT_REVOCATION_SYNC_SECONDS", 1.0)
+        app.config.setdefault("JWT_REVOCATION_BLOOM_CAPACITY", 100_000)
+
+        app.extensions["blocklist"] = RevocationStore(
+            create_token_set(app, RevokedTokenModel, table="revoked_tokens"),
+            sync_seconds=app.config["JWT_REVOCATION_SYNC_SECONDS"],
+            capacity=app.config["JWT_REVOCATION_BLOOM_CAPACITY"],
+        )
+
+    @property
+    def store(self):
+        return current_app.extensions["blocklist"]
+
+    def revoke(self, jwt_payload):
+        """revokes the token with the given payload until it expires"""
+        return self.store.revoke(jwt_payload["jti"], jwt_payload["exp"])
+
+    def is_revoked(self, jwt_payload):
+        """:return: True if the token with the given payload has been revoked"""
+        return self.store.is_revoked(jwt_payload["jti"])
+
+
+BLOCKLIST = Blocklist()
@@ -0,0 +1,57 @@
+"""The `flask` commands of the app, registered in `create_app`"""
+
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from services import build_bundles, precompress_static, seed, template_cache
+
+
+@click.command("seed")
+@click.option("--students", default=1000, show_default=True, help="the number of students")
+@click.option("--tutors", default=100, show_default=True, help="the number of tutors")
+@click.option("--registers", default=200, show_default=True, help="the number of course registers")
+@click.option("--courses", type=int, default=None, help="the number of courses  [default: registers / 10]")
+@click.option("--enrolments", default=3, show_default=True, help="the number of registers each student is on")
+@click.option("--tutors-per-register", default=2, show_default=True, help="the number of tutors on each register")
+@click.option("--prefix", default="seed", show_default=True, help="distinguishes the data of separate runs")
+@click.option("--password", default="password", show_default=True, help="the password of every seeded user")
+@click.option("--random-seed", type=int, default=None, help="makes the generated data reproducible")
+@with_appcontext
+def seed_command(**options):
+    """Bulk generate related students, tutors, courses and course registers into the configured database."""
+    started = time.perf_counter()
+    counts = seed(**options)
+    click.echo(f"seeded {counts} in {time.perf_counter() - started:.1f}s")
+
+
+@click.command("build-assets")
+@with_appcontext
+def build_assets_command():
+    """Build the fingerprinted stylesheet bundles and their compressed variants."""
+    manifest = build_bundles(current_app.static_folder)
+    written = precompress_static(current_app.static_folder, current_app.config)
+    click.echo(f"built {', '.join(manifest.values())} and wrote {written} compressed static files")
+
+
+@click.command("compress-static")
+@with_appcontext
+def compress_static_command():
+    """Write the brotli and gzip variants of the static files served to clients accepting them."""
+    written = precompress_static(current_app.static_folder, current_app.config)
+    click.echo(f"wrote {written} compressed static files")
+
+
+@click.group("templates")
+def templates_group():
+    """Manage the jinja templates."""
+
+
+@templates_group.command("compile")
+@with_appcontext
+def compile_templates_command():
+    """Precompile every template into the bytecode cache, such that workers do not compile them on first render."""
+    names = template_cache.compile(current_app)
+    click.echo(f"compiled {len(names)} templates into {current_app.config['TEMPLATE_CACHE_DIR']}")
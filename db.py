@@ -1,4 +1,16 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects import postgresql, sqlite
 
 # hello world
 db = SQLAlchemy()
+
+# dialect specific INSERT constructs supporting `ON CONFLICT` clauses
+_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def conflict_insert(table):
+    """
+    returns an INSERT construct for the dialect of the bound database that supports `on_conflict_do_nothing` and
+    `on_conflict_do_update` (must be called within an app context)
+    """
+    return _CONFLICT_INSERTS[db.engine.dialect.name](table)
@@ -1,5 +1,6 @@
 #!/bin/zsh
 
 flask db upgrade
+flask build-assets
 
 exec gunicorn --bind 0.0.0.0:80 "app:create_app()"
@@ -0,0 +1,36 @@
+"""add RefreshedTokens table for rate limited silent token refresh
+
+Revision ID: 3f8a1c6d2e47
+Revises: 7c2e5d1f9a3b
+Create Date: 2026-10-18 14:03:18.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3f8a1c6d2e47"
+down_revision = "7c2e5d1f9a3b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "RefreshedTokens",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("jti", sa.String(length=36), nullable=False),
+        sa.Column("expires_at", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("jti"),
+    )
+    with op.batch_alter_table("RefreshedTokens", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_RefreshedTokens_expires_at"), ["expires_at"], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table("RefreshedTokens", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_RefreshedTokens_expires_at"))
+
+    op.drop_table("RefreshedTokens")
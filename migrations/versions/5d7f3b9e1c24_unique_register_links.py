@@ -0,0 +1,39 @@
+"""add unique constraints and indexes to the StudentRegister and TutorRegister links
+
+Revision ID: 5d7f3b9e1c24
+Revises: 9b4e2a7c5d10
+Create Date: 2026-10-18 19:12:44.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5d7f3b9e1c24"
+down_revision = "9b4e2a7c5d10"
+branch_labels = None
+depends_on = None
+
+LINKS = {"StudentRegister": "student_id", "TutorRegister": "tutor_id"}
+
+
+def upgrade():
+    for table_name, user_id in LINKS.items():
+        # remove duplicated enrolments, keeping the first link of each user and course register
+        table = sa.table(table_name, sa.column("id"), sa.column(user_id), sa.column("course_register_id"))
+        first_links = sa.select(sa.func.min(table.c.id)).group_by(table.c[user_id], table.c.course_register_id)
+        op.execute(table.delete().where(table.c.id.not_in(first_links.scalar_subquery())))
+
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.create_unique_constraint(
+                f"uq_{table_name}_{user_id}_course_register_id", [user_id, "course_register_id"]
+            )
+            batch_op.create_index(f"ix_{table_name}_course_register_id", ["course_register_id"], unique=False)
+
+
+def downgrade():
+    for table_name, user_id in LINKS.items():
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_index(f"ix_{table_name}_course_register_id")
+            batch_op.drop_constraint(f"uq_{table_name}_{user_id}_course_register_id", type_="unique")
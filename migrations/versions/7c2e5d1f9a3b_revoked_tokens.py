@@ -0,0 +1,36 @@
+"""add RevokedTokens table for the shared token blocklist
+
+Revision ID: 7c2e5d1f9a3b
+Revises: a5047bbcf0c4
+Create Date: 2026-10-18 10:12:41.263917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7c2e5d1f9a3b"
+down_revision = "a5047bbcf0c4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "RevokedTokens",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("jti", sa.String(length=36), nullable=False),
+        sa.Column("expires_at", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("jti"),
+    )
+    with op.batch_alter_table("RevokedTokens", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_RevokedTokens_expires_at"), ["expires_at"], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table("RevokedTokens", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_RevokedTokens_expires_at"))
+
+    op.drop_table("RevokedTokens")
@@ -0,0 +1,29 @@
+"""add CacheVersions table for versioned caches
+
+Revision ID: 9b4e2a7c5d10
+Revises: 3f8a1c6d2e47
+Create Date: 2026-10-18 16:41:07.902355
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9b4e2a7c5d10"
+down_revision = "3f8a1c6d2e47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "CacheVersions",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+
+
+def downgrade():
+    op.drop_table("CacheVersions")
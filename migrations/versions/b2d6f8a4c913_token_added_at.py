@@ -0,0 +1,33 @@
+"""add added_at columns the token sets are synced on
+
+Revision ID: b2d6f8a4c913
+Revises: e4b9d2c7a815
+Create Date: 2026-10-19 09:12:41.207355
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b2d6f8a4c913"
+down_revision = "e4b9d2c7a815"
+branch_labels = None
+depends_on = None
+
+TABLES = ["RevokedTokens", "RefreshedTokens"]
+
+
+def upgrade():
+    for table_name in TABLES:
+        # the existing tokens are loaded by the next full sync of each worker, which does not filter on added_at
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column("added_at", sa.Float(), nullable=False, server_default="0"))
+            batch_op.create_index(f"ix_{table_name}_added_at", ["added_at"], unique=False)
+
+
+def downgrade():
+    for table_name in TABLES:
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_index(f"ix_{table_name}_added_at")
+            batch_op.drop_column("added_at")
@@ -0,0 +1,28 @@
+"""add an index on the course of a CourseRegister
+
+Revision ID: c81e4f2a6b93
+Revises: 5d7f3b9e1c24
+Create Date: 2026-10-18 20:03:51.640117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c81e4f2a6b93"
+down_revision = "5d7f3b9e1c24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the foreign keys of StudentRegister and TutorRegister are indexed by 5d7f3b9e1c24; the user id by the leading
+    # column of the unique constraint and the course register id by its own index
+    with op.batch_alter_table("CourseRegisters", schema=None) as batch_op:
+        batch_op.create_index("ix_CourseRegisters_course_id_name", ["course_id", "name"], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table("CourseRegisters", schema=None) as batch_op:
+        batch_op.drop_index("ix_CourseRegisters_course_id_name")
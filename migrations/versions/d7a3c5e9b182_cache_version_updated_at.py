@@ -0,0 +1,35 @@
+"""add updated_at to CacheVersions, the Last-Modified of the conditional GETs
+
+Revision ID: d7a3c5e9b182
+Revises: b2d6f8a4c913
+Create Date: 2026-10-19 10:47:05.631920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d7a3c5e9b182"
+down_revision = "b2d6f8a4c913"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # added as nullable and backfilled, sqlite cannot add a column defaulting to the current time
+    with op.batch_alter_table("CacheVersions", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+
+    table = sa.table("CacheVersions", sa.column("updated_at"))
+    op.execute(table.update().values(updated_at=sa.func.now()))
+
+    with op.batch_alter_table("CacheVersions", schema=None) as batch_op:
+        batch_op.alter_column(
+            "updated_at", existing_type=sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("CacheVersions", schema=None) as batch_op:
+        batch_op.drop_column("updated_at")
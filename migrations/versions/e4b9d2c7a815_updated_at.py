@@ -0,0 +1,44 @@
+"""add updated_at columns validating conditional GETs
+
+Revision ID: e4b9d2c7a815
+Revises: c81e4f2a6b93
+Create Date: 2026-10-18 21:26:09.412870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e4b9d2c7a815"
+down_revision = "c81e4f2a6b93"
+branch_labels = None
+depends_on = None
+
+TABLES = ["Courses", "CourseRegisters", "Students", "Tutors", "StudentRegister", "TutorRegister"]
+
+
+def upgrade():
+    for table_name in TABLES:
+        # added as nullable and backfilled, sqlite cannot add a column defaulting to the current time
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+
+        table = sa.table(table_name, sa.column("updated_at"))
+        op.execute(table.update().values(updated_at=sa.func.now()))
+
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.alter_column(
+                "updated_at",
+                existing_type=sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.func.now(),
+            )
+            batch_op.create_index(f"ix_{table_name}_updated_at", ["updated_at"], unique=False)
+
+
+def downgrade():
+    for table_name in TABLES:
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_index(f"ix_{table_name}_updated_at")
+            batch_op.drop_column("updated_at")
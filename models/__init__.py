@@ -1,5 +1,8 @@
+from models.cache_version import CacheVersionModel  # noqa: F401
 from models.course import CourseModel  # noqa: F401
 from models.course_register import CourseRegisterModel  # noqa: F401
+from models.refreshed_token import RefreshedTokenModel  # noqa: F401
+from models.revoked_token import RevokedTokenModel  # noqa: F401
 from models.student import StudentModel  # noqa: F401
 from models.student_register import StudentRegister  # noqa: F401
 from models.tutor import TutorModel  # noqa: F401
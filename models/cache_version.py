@@ -0,0 +1,10 @@
+from db import db
+
+
+class CacheVersionModel(db.Model):
+    __tablename__ = "CacheVersions"
+
+    key = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    # the time of the latest bump, the Last-Modified of the conditional GETs
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=db.func.now())
@@ -1,7 +1,8 @@
 from db import db
+from models.timestamps import UpdatedAtMixin
 
 
-class CourseModel(db.Model):
+class CourseModel(UpdatedAtMixin, db.Model):
     __tablename__ = "Courses"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -11,5 +12,5 @@ class CourseModel(db.Model):
     tutors = db.Column(db.Integer)
     summary = db.Column(db.String)
 
-    registers = db.relationship("CourseRegisterModel", back_populates="course", lazy="dynamic")
+    registers = db.relationship("CourseRegisterModel", back_populates="course")
     # students = db.relationship("StudentModel", back_populates="courses", secondary="CourseRegisters")
@@ -1,8 +1,13 @@
 from db import db
+from models.timestamps import UpdatedAtMixin
 
 
-class CourseRegisterModel(db.Model):
+class CourseRegisterModel(UpdatedAtMixin, db.Model):
     __tablename__ = "CourseRegisters"
+    __table_args__ = (
+        # the registers of a course, and the check for a duplicated register name within a course
+        db.Index("ix_CourseRegisters_course_id_name", "course_id", "name"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), unique=False)
@@ -0,0 +1,14 @@
+import time
+
+from db import db
+
+
+class RevokedTokenModel(db.Model):
+    __tablename__ = "RevokedTokens"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    expires_at = db.Column(db.Integer, nullable=False, index=True)  # the `exp` claim of the token (unix timestamp)
+    added_at = db.Column(
+        db.Float, nullable=False, index=True, default=time.time
+    )  # unix timestamp, synced on by workers
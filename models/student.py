@@ -1,7 +1,8 @@
 from db import db
+from models.timestamps import UpdatedAtMixin
 
 
-class StudentModel(db.Model):
+class StudentModel(UpdatedAtMixin, db.Model):
     __tablename__ = "Students"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -12,7 +13,7 @@ class StudentModel(db.Model):
     profile_picture = db.Column(db.String)
 
     username = db.Column(db.String, unique=True, nullable=False)
-    password = db.Column(db.String, nullable=False)
+    password = db.deferred(db.Column(db.String, nullable=False))  # only loaded to authenticate, never dumped
 
     registers = db.relationship("CourseRegisterModel", back_populates="students", secondary="StudentRegister")
     # courses = db.relationship("CourseModel", back_populates="students", secondary="CourseRegisters")
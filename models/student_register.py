@@ -1,8 +1,16 @@
 from db import db
+from models.timestamps import UpdatedAtMixin
 
 
-class StudentRegister(db.Model):
+class StudentRegister(UpdatedAtMixin, db.Model):
     __tablename__ = "StudentRegister"
+    __table_args__ = (
+        # a student is enrolled on a course register at most once, the constraint also indexes the student's registers
+        db.UniqueConstraint(
+            "student_id", "course_register_id", name="uq_StudentRegister_student_id_course_register_id"
+        ),
+        db.Index("ix_StudentRegister_course_register_id", "course_register_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey("Students.id"))
@@ -0,0 +1,17 @@
+from db import db
+
+
+class UpdatedAtMixin:
+    """
+    Adds an `updated_at` column, set by the database on every insert and update; including the bulk statements and the
+    association rows written through relationships.
+    """
+
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        default=db.func.now(),
+        server_default=db.func.now(),
+        onupdate=db.func.now(),
+        index=True,
+    )
@@ -1,7 +1,8 @@
 from db import db
+from models.timestamps import UpdatedAtMixin
 
 
-class TutorModel(db.Model):
+class TutorModel(UpdatedAtMixin, db.Model):
     __tablename__ = "Tutors"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -12,6 +13,6 @@ class TutorModel(db.Model):
     profile_picture = db.Column(db.String)
 
     username = db.Column(db.String, unique=True, nullable=False)
-    password = db.Column(db.String, nullable=False)
+    password = db.deferred(db.Column(db.String, nullable=False))  # only loaded to authenticate, never dumped
 
     registers = db.relationship("CourseRegisterModel", back_populates="tutors", secondary="TutorRegister")
@@ -1,8 +1,14 @@
 from db import db
+from models.timestamps import UpdatedAtMixin
 
 
-class TutorRegister(db.Model):
+class TutorRegister(UpdatedAtMixin, db.Model):
     __tablename__ = "TutorRegister"
+    __table_args__ = (
+        # a tutor is enrolled on a course register at most once, the constraint also indexes the tutor's registers
+        db.UniqueConstraint("tutor_id", "course_register_id", name="uq_TutorRegister_tutor_id_course_register_id"),
+        db.Index("ix_TutorRegister_course_register_id", "course_register_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     tutor_id = db.Column(db.Integer, db.ForeignKey("Tutors.id"))
@@ -1,6 +1,7 @@
 from resources.auth import blp as AuthBlueprint  # noqa: F401
 from resources.course import blp as CourseBlueprint  # noqa: F401
 from resources.course_register import blp as CourseRegisterBlueprint  # noqa: F401
+from resources.debug import blp as DebugBlueprint  # noqa: F401
 from resources.routes import blp as RoutesBlueprint  # noqa: F401
 from resources.student import blp as StudentBlueprint  # noqa: F401
 from resources.tutor import blp as TutorBlueprint  # noqa: F401
@@ -12,11 +12,11 @@ from flask_jwt_extended import (
     unset_jwt_cookies,
 )
 from flask_smorest import Blueprint, abort
-from passlib.handlers.pbkdf2 import pbkdf2_sha256
 
 from blocklist import BLOCKLIST
 from models import StudentModel, TutorModel
 from schemas import LoginSchema
+from services import authenticate
 
 blp = Blueprint("Auth", "auth", description="Authorising a user")
 
@@ -71,15 +71,33 @@ class TokenManager:
         return response
 
 
+def login_user(model, user_type, login_data):
+    """
+    Authenticates a user against the `LoginSchema` payload and issues a fresh set of tokens
+    :param model: the `StudentModel` or `TutorModel` the user is stored in
+    :param user_type: one of `student` `tutor`
+    :return: a TokenManager instance, None if the credentials are invalid
+    """
+    user = authenticate(model, login_data["username"], login_data["password"])
+    if user is None:
+        return None
+
+    return TokenManager.get_tokens(uid=user.id, user_type=user_type, is_fresh=True)
+
+
+def revoke_current_token():
+    """adds the jwt of the current request to the BLOCKLIST such that it cannot be used again"""
+    BLOCKLIST.revoke(get_jwt())
+
+
 @blp.route("/students/login")
 class StudentLogin(MethodView):
     """handles student login"""
 
     @blp.arguments(LoginSchema, location="form", content_type="form")
     def post(self, login_data):
-        student = StudentModel.query.filter(StudentModel.username == login_data["username"]).first()
-        if student and pbkdf2_sha256.verify(login_data["password"], student.password):
-            token_manager = TokenManager.get_tokens(uid=student.id, user_type="student", is_fresh=True)
+        token_manager = login_user(StudentModel, "student", login_data)
+        if token_manager:
             return {"access_token": token_manager.access_token, "refresh_token": token_manager.refresh_token}
 
         abort(401, message="Invalid credentials")
@@ -91,10 +109,8 @@ class TutorLogin(MethodView):
 
     @blp.arguments(LoginSchema, location="form", content_type="form")
     def post(self, login_data):
-        tutor = TutorModel.query.filter(TutorModel.username == login_data["username"]).first()
-
-        if tutor and pbkdf2_sha256.verify(login_data["password"], tutor.password):
-            token_manager = TokenManager.get_tokens(uid=tutor.id, user_type="tutor", is_fresh=True)
+        token_manager = login_user(TutorModel, "tutor", login_data)
+        if token_manager:
             return {"access_token": token_manager.access_token, "refresh_token": token_manager.refresh_token}
 
         abort(401, message="Invalid credentials")
@@ -123,7 +139,7 @@ class TokenRefresh(MethodView):
         id = payload["sub"]
         user_type = payload["user_type"]
         token_manager = TokenManager.get_tokens(uid=id, user_type=user_type, is_fresh=False)
-        BLOCKLIST.add(payload["jti"])
+        BLOCKLIST.revoke(payload)
         return {"access_token": token_manager.access_token}
 
 
@@ -134,6 +150,5 @@ class Logout(MethodView):
         """
         logs a user out of their account and adds their tokens to a BLOCKLIST such that they cannot be
         used by a malicious actor"""
-        jti = get_jwt()["jti"]
-        BLOCKLIST.add(jti)
+        revoke_current_token()
         return {"message": "Successfully logged out"}, 200
@@ -0,0 +1,23 @@
+import flask_smorest
+
+from resources.conditional import ConditionalMixin
+from resources.fieldsets import SparseFieldsetMixin
+from resources.pagination import KeysetPaginationMixin
+from resources.serialization import CompiledSerializerMixin
+from resources.streaming import StreamingMixin
+
+
+class Blueprint(
+    CompiledSerializerMixin,
+    ConditionalMixin,
+    KeysetPaginationMixin,
+    SparseFieldsetMixin,
+    StreamingMixin,
+    flask_smorest.Blueprint,
+):
+    """The flask-smorest Blueprint extended with the features shared by our resources"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prepare_doc_cbks.append(self._prepare_fieldsets_doc)
+        self._prepare_doc_cbks.append(self._prepare_streaming_doc)
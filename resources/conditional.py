@@ -0,0 +1,75 @@
+"""
+Conditional GETs of the collection endpoints. The ETag of a response is derived from the versions of the tables it
+is read from (see `services.validators`) and from the request, and Last-Modified is the latest write to those tables.
+A client revalidating with `If-None-Match` or `If-Modified-Since` is answered `304 Not Modified` after the single
+validator query, without loading or serialising the collection.
+
+`If-None-Match` takes precedence over `If-Modified-Since`; a client only sending `If-Modified-Since` is not told of
+writes within the second of its date, as the ETag (which changes with every write) would.
+"""
+
+import hashlib
+import json
+from copy import deepcopy
+from functools import wraps
+
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+
+from services.validators import get_validators
+
+
+def _validate(models):
+    """:return: the ETag and Last-Modified of the current request to a collection read from the tables of `models`"""
+    validators = get_validators(*models)
+    last_modified = max((validator.updated_at for validator in validators if validator.updated_at), default=None)
+    data = json.dumps(
+        {
+            "validators": [[validator.table, validator.version] for validator in validators],
+            # pages, fieldsets and streams of a collection are different representations of it
+            "args": sorted(request.args.items(multi=True)),
+            "view_args": request.view_args,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(data.encode()).hexdigest(), last_modified
+
+
+class ConditionalMixin:
+    """Extend Blueprint to add conditional GETs validated by the table versions of the models"""
+
+    def conditional(self, *models):
+        """
+        Decorator answering conditional GETs of an endpoint, it must decorate the view function above `blp.response`
+        such that a `304` skips the serialisation of the response.
+        :param models: the models of every table the response is read from, including those of the relationships it
+            dumps
+        """
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                # views are also called directly by the html routes, their responses are not conditional
+                if request.method not in ("GET", "HEAD") or request.blueprint != self.name:
+                    return func(*args, **kwargs)
+
+                etag, last_modified = _validate(models)
+                if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                    response = current_app.response_class(status=304)
+                else:
+                    response = current_app.make_response(func(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+
+                response.set_etag(etag)
+                if last_modified is not None:
+                    response.last_modified = last_modified
+                return response
+
+            # documents the `If-None-Match` header and the `304` response (see `flask_smorest.etag`)
+            wrapper._apidoc = deepcopy(getattr(wrapper, "_apidoc", {}))
+            wrapper._apidoc["etag"] = True
+            return wrapper
+
+        return decorator
@@ -2,25 +2,38 @@ import logging
 
 from flask.views import MethodView
 from flask_jwt_extended import jwt_required
-from flask_smorest import Blueprint, abort
+from flask_smorest import abort
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from db import db
-from models import CourseModel
-from schemas import CourseSchema, CourseUpdateSchema
+from models import CourseModel, CourseRegisterModel
+from resources.blueprint import Blueprint
+from schemas import CourseSchema, CourseUpdateSchema, PlainCourseSchema
+from services import LoadStrategy, cache, catalog, query_budget, upsert
 
 blp = Blueprint("Courses", __name__, description="Operations on courses")
 
 logger = logging.getLogger(__name__)
 
+# relationships dumped by the `CourseSchema`
+LOAD_STRATEGY = LoadStrategy(CourseModel.registers)
+
 
 @blp.route("/courses")
 class CourseList(MethodView):
     @staticmethod
+    # a catalog miss counts and loads the catalog after validating the request and checking the catalog version
+    @query_budget(5)
+    @blp.conditional(CourseModel, CourseRegisterModel)
     @blp.response(200, CourseSchema(many=True))
-    def get():
-        """return a list of courses present in the db"""
-        return CourseModel.query.all()
+    @blp.keyset_paginate()
+    @blp.sparse_fieldsets(CourseSchema, LOAD_STRATEGY)
+    def get(pagination_parameters, fieldset):
+        """return a page of courses present in the db, read from the catalog cache unless it is disabled"""
+        snapshot = catalog.snapshot()
+        if snapshot is not None:
+            return pagination_parameters.paginate_items(snapshot.courses, "id")
+        return pagination_parameters.paginate(fieldset.apply(CourseModel.query), CourseModel.id)
 
     @blp.arguments(CourseSchema)
     @blp.response(201, CourseSchema)
@@ -31,6 +44,7 @@ class CourseList(MethodView):
         try:
             db.session.add(course)
             db.session.commit()
+            cache.invalidate("courses")
         except IntegrityError as e:
             abort(400, message=f"an integrity error occured please inspect: {e}")
         except SQLAlchemyError as e:
@@ -41,10 +55,18 @@ class CourseList(MethodView):
 
 @blp.route("/courses/<int:course_id>")
 class Course(MethodView):
+    @query_budget(4)
     @blp.response(200, CourseSchema)
-    def get(self, course_id):
-        """given the id of a course db entry, retrieve the record"""
-        course = CourseModel.query.get_or_404(course_id)
+    @blp.sparse_fieldsets(CourseSchema, LOAD_STRATEGY)
+    def get(self, course_id, fieldset):
+        """given the id of a course db entry, retrieve the record from the catalog cache unless it is disabled"""
+        snapshot = catalog.snapshot()
+        if snapshot is None:
+            return fieldset.apply(CourseModel.query).get_or_404(course_id)
+
+        course = snapshot.by_id.get(course_id)
+        if course is None:
+            abort(404)
         return course
 
     @jwt_required()
@@ -53,23 +75,17 @@ class Course(MethodView):
         course = CourseModel.query.get_or_404(course_id)
         db.session.delete(course)
         db.session.commit()
+        # course registers serialise their course
+        cache.invalidate("courses", "course_registers")
         return {"message": "course deleted"}
 
     @blp.arguments(CourseUpdateSchema)
-    @blp.response(200, CourseSchema)
+    @blp.response(200, PlainCourseSchema)
+    @blp.alt_response(201, schema=PlainCourseSchema, description="Created")
     def put(self, course_data, course_id):
         """update the data of a course db entry, if a course isn't present, create the course entry"""
-        course = CourseModel.query.get(course_id)
-        if course:
-            for key, value in course_data.items():
-                setattr(course, key, value)
-            status_code = 200
-
-        else:
-            course = CourseModel(id=course_id, **course_data)
-            status_code = 201
-
-        db.session.add(course)
+        course, created = upsert(CourseModel, course_id, course_data)
         db.session.commit()
+        cache.invalidate("courses", "course_registers")
 
-        return course, status_code
+        return course, 201 if created else 200
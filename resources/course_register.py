@@ -1,22 +1,43 @@
 from flask.views import MethodView
 from flask_jwt_extended import jwt_required
-from flask_smorest import Blueprint, abort
+from flask_smorest import abort
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from db import db
-from models import CourseModel, CourseRegisterModel, StudentModel, TutorModel
-from schemas import CourseRegisterAndStudentSchema, CourseRegisterAndTutorSchema, CourseRegisterSchema
-
-blp = Blueprint("CourseRegisters", "course_registers", description="Operations on course registers")
+from models import CourseModel, CourseRegisterModel, StudentModel, StudentRegister, TutorModel, TutorRegister
+from resources.blueprint import Blueprint
+from schemas import (
+    CourseRegisterAndStudentSchema,
+    CourseRegisterAndTutorSchema,
+    CourseRegisterSchema,
+    EnrolmentOutcomesSchema,
+    EnrolmentSchema,
+)
+from services import LoadStrategy, cache, cached_response, enrol, link, query_budget, unenrol, unlink
+
+blp = Blueprint(
+    "CourseRegisters", "course_registers", description="Operations on course registers", compiled_serializers=True
+)
+
+# relationships dumped by the `CourseRegisterSchema`
+LOAD_STRATEGY = LoadStrategy(CourseRegisterModel.course, CourseRegisterModel.students, CourseRegisterModel.tutors)
+# the tables a `CourseRegisterSchema` is read from, validating the conditional GETs of the registers
+VALIDATED_MODELS = (CourseRegisterModel, CourseModel, StudentRegister, StudentModel, TutorRegister, TutorModel)
 
 
 @blp.route("/courses/<int:course_id>/course_registers")
 class RegistersInCourse(MethodView):
+    @query_budget(5)
+    @blp.conditional(*VALIDATED_MODELS)
     @blp.response(200, CourseRegisterSchema(many=True))
     def get(self, course_id):
-        course = CourseModel.query.get_or_404(course_id)
-        print(course.registers)
-        return course.registers.all()
+        CourseModel.query.get_or_404(course_id)
+        return (
+            LOAD_STRATEGY.apply(CourseRegisterModel.query)
+            .filter(CourseRegisterModel.course_id == course_id)
+            .order_by(CourseRegisterModel.id)
+            .all()
+        )
 
     @blp.arguments(CourseRegisterSchema)
     @blp.response(201, CourseRegisterSchema)
@@ -29,6 +50,7 @@ class RegistersInCourse(MethodView):
         try:
             db.session.add(course_register)
             db.session.commit()
+            cache.invalidate("course_registers")
         except IntegrityError as e:
             abort(400, message=f"an integrity error occured please inspect: {e}")
         except SQLAlchemyError as e:
@@ -40,6 +62,8 @@ class RegistersInCourse(MethodView):
 @blp.route("/students/<int:student_id>/course_registers")
 class RegistersInStudent(MethodView):
     @staticmethod
+    @query_budget(5)
+    @blp.conditional(*VALIDATED_MODELS)
     @blp.response(200, CourseRegisterSchema(many=True))
     def get(student_id):
         """
@@ -50,12 +74,19 @@ class RegistersInStudent(MethodView):
         student = StudentModel.query.get_or_404(student_id)
         if not student:
             abort(401, message="student not registered on a course")
-        return student.registers
+        return (
+            LOAD_STRATEGY.apply(CourseRegisterModel.query)
+            .filter(CourseRegisterModel.students.any(StudentModel.id == student.id))
+            .order_by(CourseRegisterModel.id)
+            .all()
+        )
 
 
 @blp.route("/tutors/<int:tutor_id>/course_registers")
 class RegistersInTutor(MethodView):
     @staticmethod
+    @query_budget(5)
+    @blp.conditional(*VALIDATED_MODELS)
     @blp.response(200, CourseRegisterSchema(many=True))
     def get(tutor_id):
         """
@@ -64,9 +95,15 @@ class RegistersInTutor(MethodView):
         :return a list of events for the tutor
         """
         tutor = TutorModel.query.get_or_404(tutor_id)
-        if not tutor.registers:
+        registers = (
+            LOAD_STRATEGY.apply(CourseRegisterModel.query)
+            .filter(CourseRegisterModel.tutors.any(TutorModel.id == tutor.id))
+            .order_by(CourseRegisterModel.id)
+            .all()
+        )
+        if not registers:
             abort(401, message="tutors not registered on a course")
-        return tutor.registers
+        return registers
 
 
 @blp.route("/course_registers")
@@ -74,10 +111,15 @@ class CourseRegisterList(MethodView):
     """used for operations on events"""
 
     @staticmethod
+    @query_budget(4)
+    @blp.conditional(*VALIDATED_MODELS)
     @blp.response(200, CourseRegisterSchema(many=True))
-    def get():
-        """retrieves a list of all events in the database"""
-        return CourseRegisterModel.query.all()
+    @blp.keyset_paginate()
+    @blp.sparse_fieldsets(CourseRegisterSchema, LOAD_STRATEGY)
+    @blp.streamable(CourseRegisterSchema)
+    def get(pagination_parameters, fieldset):
+        """retrieves a page of events in the database"""
+        return pagination_parameters.paginate(fieldset.apply(CourseRegisterModel.query), CourseRegisterModel.id)
 
     @blp.arguments(CourseRegisterSchema)
     @blp.response(201, CourseRegisterSchema)
@@ -87,6 +129,7 @@ class CourseRegisterList(MethodView):
         try:
             db.session.add(course_register)
             db.session.commit()
+            cache.invalidate("course_registers")
         except IntegrityError as e:
             abort(400, message=f"an integrity error occured please inspect: {e}")
         except SQLAlchemyError as e:
@@ -102,17 +145,19 @@ class LinkCourseRegistersToStudents(MethodView):
     @blp.response(201, CourseRegisterSchema)
     def post(self, student_id, course_register_id):
         """
-        Used to enrol students on a course
+        Used to enrol students on a course, enrolling a student twice has no effect
         :param student_id: the db id of a student
         :param course_register_id: the db id of an event created for a course
         """
-        student = StudentModel.query.get_or_404(student_id)
+        StudentModel.query.get_or_404(student_id)
         course_register = CourseRegisterModel.query.get_or_404(course_register_id)
 
-        student.registers.append(course_register)
         try:
-            db.session.add(student)
+            link("student", student_id, course_register_id)
             db.session.commit()
+            cache.invalidate(
+                f"student:{student_id}", f"course_register:{course_register_id}", "students", "course_registers"
+            )
         except IntegrityError as e:
             abort(400, message=f"an integrity error occured please inspect: {e}")
         except SQLAlchemyError as e:
@@ -126,12 +171,13 @@ class LinkCourseRegistersToStudents(MethodView):
         student = StudentModel.query.get_or_404(student_id)
         course_register = CourseRegisterModel.query.get_or_404(course_register_id)
 
-        student.registers.remove(course_register)
         try:
-            db.session.add(student)
+            if not unlink("student", student_id, course_register_id):
+                abort(404, message="student not enrolled on that course register")
             db.session.commit()
-        except IntegrityError as e:
-            abort(400, message=f"an integrity error occured please inspect: {e}")
+            cache.invalidate(
+                f"student:{student_id}", f"course_register:{course_register_id}", "students", "course_registers"
+            )
         except SQLAlchemyError as e:
             abort(500, message=f"an error occured when saving course to db {e}")
 
@@ -143,17 +189,17 @@ class LinkCourseRegistersToTutors(MethodView):
     @blp.response(201, CourseRegisterSchema)
     def post(self, tutor_id, course_register_id):
         """
-        used to enrol tutors on a course
+        used to enrol tutors on a course, enrolling a tutor twice has no effect
         :param tutor_id: the db id of a tutor
         :param course_register_id: the db id of an event created for a course
         """
-        tutor = TutorModel.query.get_or_404(tutor_id)
+        TutorModel.query.get_or_404(tutor_id)
         course_register = CourseRegisterModel.query.get_or_404(course_register_id)
 
-        tutor.registers.append(course_register)
         try:
-            db.session.add(tutor)
+            link("tutor", tutor_id, course_register_id)
             db.session.commit()
+            cache.invalidate(f"tutor:{tutor_id}", f"course_register:{course_register_id}", "tutors", "course_registers")
         except IntegrityError as e:
             abort(400, message=f"an integrity error occured please inspect: {e}")
         except SQLAlchemyError as e:
@@ -166,27 +212,91 @@ class LinkCourseRegistersToTutors(MethodView):
         """
         used to delete a tutor from a course
         """
-        tutor = StudentModel.query.get_or_404(tutor_id)
+        tutor = TutorModel.query.get_or_404(tutor_id)
         course_register = CourseRegisterModel.query.get_or_404(course_register_id)
 
-        tutor.registers.remove(course_register)
         try:
-            db.session.add(tutor)
+            if not unlink("tutor", tutor_id, course_register_id):
+                abort(404, message="tutor not enrolled on that course register")
             db.session.commit()
+            cache.invalidate(f"tutor:{tutor_id}", f"course_register:{course_register_id}", "tutors", "course_registers")
+        except SQLAlchemyError as e:
+            abort(500, message=f"an error occured when saving course to db {e}")
+
+        return {"message": "tutor removed from course", "tutor": tutor, "course_register": course_register}
+
+
+def _invalidate_enrolments(course_register_id, outcomes, changed):
+    """invalidates the cached responses of a course register and of the users whose enrolment changed"""
+    # the lists of course registers, and of the users enrolled on them, serialise the enrolments
+    tags = [f"course_register:{course_register_id}", "course_registers"]
+    for user_type in ("student", "tutor"):
+        user_tags = [
+            f"{user_type}:{outcome['id']}" for outcome in outcomes[f"{user_type}s"] if outcome["outcome"] == changed
+        ]
+        if user_tags:
+            tags += user_tags + [f"{user_type}s"]
+    cache.invalidate(*tags)
+
+
+@blp.route("/course_registers/<int:course_register_id>/enrolments")
+class CourseRegisterEnrolments(MethodView):
+    """Used to enrol many students and tutors on, or remove them from, an event in one request"""
+
+    @blp.arguments(EnrolmentSchema)
+    @blp.response(200, EnrolmentOutcomesSchema)
+    def post(self, enrolment_data, course_register_id):
+        """
+        Used to enrol students and tutors on a course in bulk, reporting the outcome of each id; one of `enrolled`
+        `already_enrolled` `not_found`
+        :param course_register_id: the db id of an event created for a course
+        """
+        CourseRegisterModel.query.get_or_404(course_register_id)
+        try:
+            outcomes = {
+                "students": enrol("student", enrolment_data["students"], course_register_id),
+                "tutors": enrol("tutor", enrolment_data["tutors"], course_register_id),
+            }
+            db.session.commit()
+            _invalidate_enrolments(course_register_id, outcomes, changed="enrolled")
         except IntegrityError as e:
             abort(400, message=f"an integrity error occured please inspect: {e}")
         except SQLAlchemyError as e:
             abort(500, message=f"an error occured when saving course to db {e}")
 
-        return {"message": "tutor removed from course", "tutor": tutor, "course_register": course_register}
+        return {"message": "enrolments processed", **outcomes}
+
+    @blp.arguments(EnrolmentSchema)
+    @blp.response(200, EnrolmentOutcomesSchema)
+    def delete(self, enrolment_data, course_register_id):
+        """
+        Used to remove students and tutors from a course in bulk, reporting the outcome of each id; one of `unenrolled`
+        `not_enrolled` `not_found`
+        :param course_register_id: the db id of an event created for a course
+        """
+        CourseRegisterModel.query.get_or_404(course_register_id)
+        try:
+            outcomes = {
+                "students": unenrol("student", enrolment_data["students"], course_register_id),
+                "tutors": unenrol("tutor", enrolment_data["tutors"], course_register_id),
+            }
+            db.session.commit()
+            _invalidate_enrolments(course_register_id, outcomes, changed="unenrolled")
+        except SQLAlchemyError as e:
+            abort(500, message=f"an error occured when saving course to db {e}")
+
+        return {"message": "enrolments removed", **outcomes}
 
 
 @blp.route("/course_registers/<int:course_register_id>")
 class CourseRegister(MethodView):
+    @query_budget(3)
+    @cached_response("course_register:{course_register_id}", "course_registers")
     @blp.response(200, CourseRegisterSchema)
-    def get(self, course_register_id):
+    @blp.sparse_fieldsets(CourseRegisterSchema, LOAD_STRATEGY)
+    def get(self, course_register_id, fieldset):
         """used to list the details of an event for a given event id"""
-        course_register = CourseRegisterModel.query.get_or_404(course_register_id)
+        course_register = fieldset.apply(CourseRegisterModel.query).get_or_404(course_register_id)
         return course_register
 
     @jwt_required()
@@ -198,4 +308,6 @@ class CourseRegister(MethodView):
 
         db.session.delete(course_register)
         db.session.commit()
+        # students and tutors serialise the registers they are enrolled on
+        cache.invalidate(f"course_register:{course_register_id}", "course_registers", "students", "tutors")
         return {"message": "course register deleted"}
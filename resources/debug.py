@@ -0,0 +1,30 @@
+from flask import current_app
+from flask.views import MethodView
+from flask_smorest import abort
+
+from resources.blueprint import Blueprint
+from services import catalog, sql_instrumentation
+
+blp = Blueprint("Debug", __name__, description="Diagnostics of the running app")
+
+
+@blp.route("/debug/sql")
+class SqlHistory(MethodView):
+    @staticmethod
+    def get():
+        """return the sql statement count, database time and repeated statements of the recent requests"""
+        if not current_app.config["SQL_DEBUG_ENDPOINT"] or "sql_instrumentation" not in current_app.extensions:
+            abort(404)
+
+        return {"requests": list(reversed(sql_instrumentation.history))}
+
+
+@blp.route("/debug/catalog")
+class CatalogMetrics(MethodView):
+    @staticmethod
+    def get():
+        """return the hits, misses and size of the catalog cache of this worker"""
+        if not current_app.config["CATALOG_DEBUG_ENDPOINT"] or "catalog" not in current_app.extensions:
+            abort(404)
+
+        return catalog.metrics()
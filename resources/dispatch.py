@@ -0,0 +1,70 @@
+"""
+In-process dispatch of the API logic used by the html routes. The html routes previously made http requests against
+our own server in order to reuse the validation and logic of the API resources; this module instead validates the
+submitted form with the same schemas as the API resources and calls their logic directly.
+"""
+
+import logging
+
+from marshmallow import EXCLUDE, ValidationError
+from werkzeug.exceptions import HTTPException
+
+from models import StudentModel, TutorModel
+from resources.auth import login_user, revoke_current_token
+from schemas import LoginSchema, StudentSchema, TutorSchema
+from services import register_user
+
+logger = logging.getLogger(__name__)
+
+# FIXME: file upload no not currently working, `profile_picture` is excluded until it is supported
+USER_TYPES = {
+    "student": (StudentModel, StudentSchema(exclude=["profile_picture"], unknown=EXCLUDE)),
+    "tutor": (TutorModel, TutorSchema(exclude=["profile_picture"], unknown=EXCLUDE)),
+}
+
+
+def login(user_type, form):
+    """
+    Mirrors `Auth.StudentLogin` and `Auth.TutorLogin`
+    :param user_type: one of `student` `tutor`
+    :param form: the submitted login form
+    :return: a TokenManager instance, None if the form is invalid or the credentials are incorrect
+    """
+    if user_type not in USER_TYPES:
+        return None
+
+    model, _ = USER_TYPES[user_type]
+    try:
+        login_data = LoginSchema(unknown=EXCLUDE).load(form)
+    except ValidationError as e:
+        logger.info(f"invalid login form: {e.messages}")
+        return None
+
+    return login_user(model, user_type, login_data)
+
+
+def signup(user_type, form):
+    """
+    Mirrors `Students.StudentList.post` and `Tutors.TutorList.post`
+    :param user_type: one of `student` `tutor`
+    :param form: the submitted register form
+    :return: the created user, None if the form is invalid or the user could not be created
+    """
+    if user_type not in USER_TYPES:
+        return None
+
+    model, schema = USER_TYPES[user_type]
+    try:
+        user_data = schema.load(form)
+        return register_user(model, user_data, user_type=user_type)
+    except ValidationError as e:
+        logger.info(f"invalid register form: {e.messages}")
+    except HTTPException as e:
+        logger.info(f"unable to register {user_type}: {e}")
+
+    return None
+
+
+def logout():
+    """Mirrors `Auth.Logout`, revokes the jwt of the current request"""
+    revoke_current_token()
@@ -0,0 +1,83 @@
+"""
+Sparse fieldsets for the read endpoints. `?fields=id,name` restricts the fields dumped by the schema of the endpoint and
+`?include=registers` the relationships (`include=` with no value dumps none), such that a client that only needs names
+and ids is not sent, and the database does not load, the rest of the object graph.
+"""
+
+import http
+from copy import deepcopy
+from functools import wraps
+
+import marshmallow as ma
+from flask import Response, jsonify, request
+from flask_smorest.utils import unpack_tuple_response
+from webargs.fields import DelimitedList
+
+from services import Fieldset
+
+
+def _fieldset_parameters_schema_factory(field_names, relationship_names):
+    """Generate a FieldsetParametersSchema accepting the fields and relationships of a schema"""
+
+    class FieldsetParametersSchema(ma.Schema):
+        """Deserializes the sparse fieldset params"""
+
+        class Meta:
+            ordered = True
+            unknown = ma.EXCLUDE
+
+        fields = DelimitedList(
+            ma.fields.String(validate=ma.validate.OneOf(field_names)),
+            metadata={"description": f"the fields to return, any of: {', '.join(field_names)}"},
+        )
+        include = DelimitedList(
+            ma.fields.String(validate=ma.validate.OneOf(relationship_names)),
+            metadata={"description": f"the relationships to return, any of: {', '.join(relationship_names)}"},
+        )
+
+    return FieldsetParametersSchema
+
+
+class SparseFieldsetMixin:
+    """Extend Blueprint to add sparse fieldsets to the read endpoints"""
+
+    def sparse_fieldsets(self, schema, load_strategy):
+        """
+        Decorator adding the `fields` and `include` query arguments to an endpoint. A `Fieldset` is injected into the
+        kwargs of the decorated function as `fieldset`, which is responsible for loading its query with
+        `fieldset.apply`; when a sparse fieldset is requested the result is dumped with `fieldset.schema` rather than
+        the schema of the response.
+        :param schema: the marshmallow schema class of the response
+        :param load_strategy: the LoadStrategy of the relationships the schema dumps
+        """
+        parameters_schema = _fieldset_parameters_schema_factory(*Fieldset.field_names(schema, load_strategy))
+        error_status_code = self.PAGINATION_ARGUMENTS_PARSER.DEFAULT_VALIDATION_STATUS
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                fieldset_params = self.PAGINATION_ARGUMENTS_PARSER.parse(parameters_schema, request, location="query")
+                fieldset = Fieldset(schema, load_strategy, **fieldset_params)
+                kwargs["fieldset"] = fieldset
+
+                result, status, headers = unpack_tuple_response(func(*args, **kwargs))
+                if fieldset.is_sparse and not isinstance(result, Response):
+                    result = jsonify(fieldset.schema.dump(result, many=isinstance(result, list)))
+
+                return result, status, headers
+
+            wrapper._apidoc = deepcopy(getattr(wrapper, "_apidoc", {}))
+            wrapper._apidoc["fieldsets"] = {
+                "parameters": {"in": "query", "schema": parameters_schema},
+                "response": {error_status_code: http.HTTPStatus(error_status_code).name},
+            }
+            return wrapper
+
+        return decorator
+
+    def _prepare_fieldsets_doc(self, doc, doc_info, **kwargs):
+        operation = doc_info.get("fieldsets")
+        if operation:
+            doc.setdefault("parameters", []).append(operation["parameters"])
+            doc.setdefault("responses", {}).update(operation["response"])
+        return doc
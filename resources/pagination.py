@@ -0,0 +1,208 @@
+"""
+Keyset (cursor) pagination built on the flask-smorest pagination feature. Rather than selecting a page with an
+`OFFSET`, each page is selected with `WHERE id > :after ORDER BY id LIMIT :limit` such that the cost of a page is
+constant however deep a client pages through a collection.
+"""
+
+import base64
+import binascii
+import bisect
+import http
+import json
+from copy import deepcopy
+from functools import wraps
+from operator import itemgetter
+from urllib.parse import urlencode
+
+import marshmallow as ma
+from flask import request
+from flask_smorest.utils import unpack_tuple_response
+
+
+def encode_cursor(key):
+    """encodes the primary key of the last item in a page into an opaque cursor"""
+    return base64.urlsafe_b64encode(json.dumps({"after": key}).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """decodes a cursor generated by `encode_cursor`, raises a ValueError if the cursor is invalid"""
+    try:
+        after = json.loads(base64.urlsafe_b64decode(cursor.encode()))["after"]
+    except (binascii.Error, json.JSONDecodeError, KeyError, TypeError, UnicodeError) as e:
+        raise ValueError(f"invalid cursor: {cursor}") from e
+
+    # the collections are keyed on integer ids, a well formed cursor holding any other value was not encoded by us
+    if not isinstance(after, int) or isinstance(after, bool):
+        raise ValueError(f"invalid cursor: {cursor}")
+    return after
+
+
+class Cursor(ma.fields.String):
+    """An opaque pagination cursor"""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        try:
+            return decode_cursor(super()._deserialize(value, attr, data, **kwargs))
+        except ValueError as e:
+            raise ma.ValidationError("Invalid cursor.") from e
+
+
+class KeysetPaginationParameters:
+    """
+    Holds the keyset pagination arguments of a request
+    :param after: the primary key after which the page starts, None for the first page
+    :param limit: the maximum number of items in the page
+    """
+
+    def __init__(self, after, limit):
+        self.after = after
+        self.limit = limit
+        self.next_cursor = None
+        # set by `StreamingMixin.streamable` when the whole collection is streamed rather than paged
+        self.stream = False
+
+    def paginate(self, query, key):
+        """
+        Selects a page of items from a query, an extra item is selected to find out whether there is a next page
+        :param query: the sqlalchemy query used to select the collection
+        :param key: the unique column the collection is ordered by e.g. `StudentModel.id`
+        :return: the items in the page, or the ordered query when streaming
+        """
+        if self.after is not None:
+            query = query.filter(key > self.after)
+
+        if self.stream:
+            return query.order_by(key)
+
+        items = query.order_by(key).limit(self.limit + 1).all()
+        if len(items) > self.limit:
+            items = items[: self.limit]
+            self.next_cursor = encode_cursor(getattr(items[-1], key.key))
+
+        return items
+
+    def paginate_items(self, items, key):
+        """
+        Selects a page of items held in memory, rather than from a query
+        :param items: the collection, ordered by `key`
+        :param key: the name of the unique key of the items e.g. `"id"`
+        :return: the items in the page
+        """
+        start = 0 if self.after is None else bisect.bisect_right(items, self.after, key=itemgetter(key))
+        page = items[start : start + self.limit]
+        if start + self.limit < len(items):
+            self.next_cursor = encode_cursor(page[-1][key])
+
+        return page
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(after={self.after!r},limit={self.limit!r})"
+
+
+def _keyset_pagination_parameters_schema_factory(def_limit, def_max_limit):
+    """Generate a KeysetPaginationParametersSchema"""
+
+    class KeysetPaginationParametersSchema(ma.Schema):
+        """Deserializes pagination params into KeysetPaginationParameters"""
+
+        class Meta:
+            ordered = True
+            unknown = ma.EXCLUDE
+
+        after = Cursor(load_default=None)
+        limit = ma.fields.Integer(load_default=def_limit, validate=ma.validate.Range(min=1, max=def_max_limit))
+
+        @ma.post_load
+        def make_paginator(self, data, **kwargs):
+            return KeysetPaginationParameters(**data)
+
+    return KeysetPaginationParametersSchema
+
+
+class KeysetPaginationMetadataSchema(ma.Schema):
+    """Documents the keyset pagination metadata returned in the pagination header"""
+
+    limit = ma.fields.Int()
+    next_cursor = ma.fields.Str()
+
+    class Meta:
+        ordered = True
+
+
+class KeysetPaginationMixin:
+    """Extend Blueprint to add keyset pagination, this reuses the parser and header of the pagination feature"""
+
+    DEFAULT_KEYSET_PAGINATION_PARAMETERS = {"limit": 100, "max_limit": 1000}
+
+    def keyset_paginate(self, *, limit=None, max_limit=None):
+        """
+        Decorator adding keyset pagination to the endpoint, `pagination_parameters` are injected into the kwargs of the
+        decorated function which is responsible for paginating its query with `pagination_parameters.paginate`
+        :param limit: default number of items in a page
+        :param max_limit: the maximum number of items a client may request in a page
+        """
+        if limit is None:
+            limit = self.DEFAULT_KEYSET_PAGINATION_PARAMETERS["limit"]
+        if max_limit is None:
+            max_limit = self.DEFAULT_KEYSET_PAGINATION_PARAMETERS["max_limit"]
+        page_params_schema = _keyset_pagination_parameters_schema_factory(limit, max_limit)
+
+        parameters = {
+            "in": "query",
+            "schema": page_params_schema,
+        }
+
+        error_status_code = self.PAGINATION_ARGUMENTS_PARSER.DEFAULT_VALIDATION_STATUS
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                page_params = self.PAGINATION_ARGUMENTS_PARSER.parse(page_params_schema, request, location="query")
+                kwargs["pagination_parameters"] = page_params
+
+                result, status, headers = unpack_tuple_response(func(*args, **kwargs))
+
+                if self.PAGINATION_HEADER_NAME is not None:
+                    result, headers = self._set_keyset_pagination_metadata(page_params, result, headers)
+
+                return result, status, headers
+
+            # Add pagination params to doc info in wrapper object
+            wrapper._apidoc = deepcopy(getattr(wrapper, "_apidoc", {}))
+            wrapper._apidoc["pagination"] = {
+                "parameters": parameters,
+                "response": {
+                    error_status_code: http.HTTPStatus(error_status_code).name,
+                },
+            }
+
+            return wrapper
+
+        return decorator
+
+    def _set_keyset_pagination_metadata(self, page_params, result, headers):
+        """Add keyset pagination metadata to the pagination header and a `Link` header to the next page"""
+        if headers is None:
+            headers = {}
+
+        if page_params.stream:
+            return result, headers
+
+        metadata = {"limit": page_params.limit}
+        if page_params.next_cursor is not None:
+            metadata["next_cursor"] = page_params.next_cursor
+            next_args = {**request.args, "after": page_params.next_cursor, "limit": page_params.limit}
+            next_url = f"{request.base_url}?{urlencode(next_args)}"
+            headers["Link"] = f'<{next_url}>; rel="next"'
+
+        headers[self.PAGINATION_HEADER_NAME] = json.dumps(KeysetPaginationMetadataSchema().dump(metadata))
+        return result, headers
+
+    def _document_pagination_metadata(self, spec, resp_doc):
+        """Document the keyset pagination metadata header"""
+        resp_doc["headers"] = {
+            self.PAGINATION_HEADER_NAME: {
+                "description": "Pagination metadata",
+                "schema": KeysetPaginationMetadataSchema,
+            }
+        }
@@ -1,17 +1,22 @@
+import hashlib
 import json
 import logging
 from typing import Optional
 
-import requests
-from flask import redirect, render_template, request, url_for
+from flask import current_app, make_response, redirect, render_template, request, url_for
 from flask_jwt_extended import get_jwt, jwt_required, verify_jwt_in_request
-from flask_smorest import Blueprint
 
+from models import CourseModel, StudentModel, TutorModel
+from resources import dispatch
 from resources.auth import TokenManager
+from resources.blueprint import Blueprint
 from resources.course import CourseList
-from resources.course_register import CourseRegisterList, RegistersInStudent, RegistersInTutor
+from resources.course_register import CourseRegisterList
+from resources.pagination import encode_cursor
 from resources.student import Student, StudentList
 from resources.tutor import Tutor, TutorList
+from schemas import PlainCourseSchema, PlainStudentSchema, PlainTutorSchema
+from services import DATA, cache, counterparts_query, courses_query, get_homepage_stats, get_version, query_budget
 
 blp = Blueprint("Routes", __name__, description="html operations")
 
@@ -24,7 +29,30 @@ def root():
     return redirect(url_for("Routes.homepage"))
 
 
+def anonymous_homepage():
+    """
+    The homepage is the same for every anonymous visitor, so it is rendered once per data version and cached in the
+    backend shared by the workers (`CACHE_BACKEND`). It is served with a strong ETag such that a repeat visitor
+    revalidates with `If-None-Match` and gets a 304.
+    """
+    version = get_version(DATA)
+    key = f"homepage:anonymous:{version}"
+    page = cache.get(key)
+    if page is None:
+        body = render_template("homepage.html", user=None, stats=get_homepage_stats, version=version)
+        page = {"body": body, "etag": hashlib.sha256(body.encode()).hexdigest()}
+        cache.set(key, page)
+
+    response = make_response(page["body"])
+    response.set_etag(page["etag"])
+    # revalidate on every visit, the page changes with the data and when the visitor logs in
+    response.cache_control.no_cache = True
+    response.vary.add("Cookie")
+    return response.make_conditional(request)
+
+
 @blp.route("/homepage")
+@query_budget(4)
 def homepage():
     """
     Handles the displayed homepage logic; gets the current and populates. If there is a jwt token the user will
@@ -32,22 +60,19 @@ def homepage():
     """
     user = None
     jwt = verify_jwt_in_request(optional=True)
-    if jwt:
-        payload = get_jwt()
-        id = payload["sub"]
-        if payload["user_type"] == "tutor":
-            user = Tutor.get(id).json
+    if not jwt:
+        return anonymous_homepage()
 
-        elif payload["user_type"] == "student":
-            user = Student.get(id).json
+    payload = get_jwt()
+    id = payload["sub"]
+    if payload["user_type"] == "tutor":
+        user = Tutor.get(id).json
 
-    # populate sections with data
-    tutors = TutorList.get().json
-    courses = CourseList.get().json
-    students = StudentList.get().json
-    events = CourseRegisterList.get().json
+    elif payload["user_type"] == "student":
+        user = Student.get(id).json
 
-    return render_template("homepage.html", user=user, tutors=tutors, events=events, students=students, courses=courses)
+    # the stats are only counted when their cached fragment, keyed on the data version, is stale
+    return render_template("homepage.html", user=user, stats=get_homepage_stats, version=get_version(DATA))
 
 
 @blp.route("/login")
@@ -63,7 +88,7 @@ def login():
 @blp.route("/logout")
 @jwt_required(locations=["cookies"])
 def logout():
-    requests.post(f"{request.url_root}{url_for('Auth.Logout')}")
+    dispatch.logout()
     deauthed_response = TokenManager.unset_jwt()
 
     return deauthed_response
@@ -75,19 +100,9 @@ def handle_login():
     Handles the login e.g. student or tutor, if success we redirect to the homepage with a logged in state
     else we regenerate the login form to try again.
     """
-    response = None
-    user_type = request.form["user_type"]
-    payload = _convert_form_to_json_payload(request.form, ["user_type"])
-    if user_type == "tutor":
-        response = requests.post(f"{request.url_root}{url_for('Auth.TutorLogin')}", data=payload)
-
-    elif user_type == "student":
-        response = requests.post(f"{request.url_root}{url_for('Auth.StudentLogin')}", data=payload)
-
-    if response.status_code == 200:
-        authed_response = TokenManager.generate_response(
-            response.json()["access_token"], response.json()["refresh_token"]
-        )
+    token_manager = dispatch.login(request.form.get("user_type"), request.form)
+    if token_manager:
+        authed_response = TokenManager.generate_response(token_manager.access_token, token_manager.refresh_token)
         return authed_response
 
     return redirect(url_for("Routes.login"))
@@ -107,7 +122,15 @@ def user_info():
         elif payload["user_type"] == "student":
             user = Student.get(uid).json
 
-        return render_template("user_info.html", user=user, user_type=payload["user_type"])
+        # the form only changes when the user is written, which invalidates their tag
+        user_tag = f"{payload['user_type']}:{uid}"
+        return render_template(
+            "user_info.html",
+            user=user,
+            user_type=payload["user_type"],
+            fragment_key=f"user_info:{user_tag}:{request.query_string.decode()}",
+            fragment_tags=[user_tag],
+        )
 
     return render_template("login_form.html")
 
@@ -156,29 +179,63 @@ def signup():
 def handle_signup():
     """Handles the response from a register form and actions the appropriate endpoints, if the signup responds with a
     success then the user is redirected to the login page, otherwise the user is redirected to signup again."""
-    response = None
-
-    user_type = request.form["user_type"]
-    print(request.files)
-    payload = _convert_form_to_json_payload(request.form, ["user_type", "profile_picture"])
     # FIXME: file upload no not currently working
     # file_upload = None
     # file_payload = {"profile_picture": request.files, "user_type": user_type}
+    user = dispatch.signup(request.form.get("user_type"), request.form)
+    if user:
+        return redirect(url_for("Routes.login"))
 
-    if user_type == "student":
-        response = requests.post(f"{request.url_root}{url_for('Students.StudentList')}", data=payload)
+    return render_template("register_form.html")
 
-    elif user_type == "tutor":
-        response = requests.post(f"{request.url_root}{url_for('Tutors.TutorList')}", data=payload)
 
-    if response and response.status_code == 201:
-        return redirect(url_for("Routes.login"))
+def _list_page(response):
+    """:return: the rows of a list response and the cursor of its next page, read from its pagination header"""
+    metadata = json.loads(response.headers.get(blp.PAGINATION_HEADER_NAME, "{}"))
+    return response.json, metadata.get("next_cursor")
 
-    return render_template("register_form.html")
+
+# the collections whose writes change the rows of a list, the rows of each list serialise the course registers
+LIST_DEPENDENCIES = {
+    "student": ["students", "course_registers"],
+    "tutor": ["tutors", "course_registers"],
+    "course": ["courses", "course_registers"],
+    "event": ["course_registers", "courses"],
+}
+
+
+def _list_loader(type, pagination_parameters):
+    """
+    :return: a callable reading a page of a list, only called when its cached table is stale. The list is read in a
+    request of its own holding only the page, such that the other args of the page (e.g. `stream` or `fields`) and
+    its headers (e.g. `If-None-Match`) are not applied to the table
+    """
+    query_string = {"limit": pagination_parameters.limit}
+    if pagination_parameters.after is not None:
+        query_string["after"] = encode_cursor(pagination_parameters.after)
+
+    def load():
+        with current_app.test_request_context(request.path, query_string=query_string):
+            if type == "tutor":
+                response = TutorList.get()
+
+            elif type == "course":
+                response = CourseList.get()
+
+            elif type == "student":
+                response = StudentList.get()
+
+            else:
+                response = CourseRegisterList.get()
+
+            return _list_page(response)
+
+    return load
 
 
 @blp.route("/list_fields/<string:type>", methods=["GET", "POST"])
-def list_fields(type):
+@blp.keyset_paginate()
+def list_fields(type, pagination_parameters):
     """
     A generic form that can list the contents of any table in the database or from another endpoint.
     Databases:
@@ -188,23 +245,17 @@ def list_fields(type):
     /my_people
     /my_courses
     """
-    fields = None
-    if type == "tutor":
-        fields = TutorList.get().json
-
-    elif type == "course":
-        fields = CourseList.get().json
-
-    elif type == "student":
-        fields = StudentList.get().json
-
-    else:
-        fields = CourseRegisterList.get().json
-
-    if fields is None:
-        redirect(url_for("Routes.homepage"))
-
-    return render_template("list.html", fields=fields, type=type)
+    # the table is the same for every user, it is cached for each page of the lists linked by the pages
+    fragment_key = None
+    if type in LIST_DEPENDENCIES:
+        fragment_key = f"list:{type}:{pagination_parameters.after}:{pagination_parameters.limit}"
+    return render_template(
+        "list.html",
+        page=_list_loader(type, pagination_parameters),
+        type=type,
+        fragment_key=fragment_key,
+        fragment_tags=LIST_DEPENDENCIES.get(type, LIST_DEPENDENCIES["event"]),
+    )
 
 
 @blp.route("/detail", methods=["GET", "POST"])
@@ -216,77 +267,56 @@ def detail():
 
 @blp.get("/my_people")
 @jwt_required(locations=["cookies"])
-def my_people():
+@blp.keyset_paginate()
+@query_budget(1)
+def my_people(pagination_parameters):
     """protected, uses jwt token to check what type of user is calling this method
     :returns
         students if the user is a `tutor`
         tutors if the user is a `student`
     """
-    response = None
-    type = None
-    # FIXME: register ids not currently used
-    # register_ids = []
     jwt_payload = get_jwt()
-    uid = jwt_payload["sub"]
     if jwt_payload["user_type"] == "student":
         type = "My Tutors"
-        response = RegistersInStudent.get(student_id=uid)
+        schema = PlainTutorSchema(many=True)
+        key = TutorModel.id
 
     elif jwt_payload["user_type"] == "tutor":
         type = "My Students"
-        response = RegistersInTutor.get(tutor_id=uid)
-
-    if response and response.status_code == 200:
-        # TODO: implement this properly in the backend to remove this horrible logic
-        desired_fields = []
-        for raw_json in response.response:
-            json_data = json.loads(raw_json)
-            for json_item in json_data:
-                if jwt_payload["user_type"] == "tutor":
-                    desired_fields.append(json_item.get("students"))
-                elif jwt_payload["user_type"] == "student":
-                    desired_fields.append(json_item.get("tutors"))
-
-        flat_list = [item for sublist in desired_fields for item in sublist]
-        return render_template("list.html", fields=flat_list, type=type)
+        schema = PlainStudentSchema(many=True)
+        key = StudentModel.id
 
-    return redirect(url_for("Routes.homepage"))
+    else:
+        return redirect(url_for("Routes.homepage"))
+
+    query = counterparts_query(jwt_payload["user_type"], jwt_payload["sub"])
+    people = pagination_parameters.paginate(query, key)
+    return render_template(
+        "list.html", page=lambda: (schema.dump(people), pagination_parameters.next_cursor), type=type
+    )
 
 
 @blp.get("/my_courses")
 @jwt_required(locations=["cookies"])
-def my_courses():
+@blp.keyset_paginate()
+@query_budget(1)
+def my_courses(pagination_parameters):
     """
     protected, uses jwt token to check what type of user is calling this method
-    Returns courses associated with a user
     :returns
-        students if the user is a `tutor`
-        tutors if the user is a `student`
+        the distinct courses the user is enrolled on through their course registers
     """
-    response = None
-    type = "My Courses"
-    # FIXME: register ids not currently used
-    # register_ids = []
     jwt_payload = get_jwt()
-    uid = jwt_payload["sub"]
-    if jwt_payload["user_type"] == "student":
-        response = RegistersInStudent.get(student_id=uid)
-
-    elif jwt_payload["user_type"] == "tutor":
-        response = RegistersInTutor.get(tutor_id=uid)
-
-    if response and response.status_code == 200:
-        # TODO: implement this properly in the backend to remove this horrible logic
-        desired_fields = []
-        for raw_json in response.response:
-            json_data = json.loads(raw_json)
-            for json_item in json_data:
-                print(json_item)
-                desired_fields.append(json_item.get("course"))
-
-        return render_template("list.html", fields=desired_fields, type=type)
-
-    return redirect(url_for("Routes.homepage"))
+    if jwt_payload["user_type"] not in ("student", "tutor"):
+        return redirect(url_for("Routes.homepage"))
+
+    query = courses_query(jwt_payload["user_type"], jwt_payload["sub"])
+    courses = pagination_parameters.paginate(query, CourseModel.id)
+    return render_template(
+        "list.html",
+        page=lambda: (PlainCourseSchema(many=True).dump(courses), pagination_parameters.next_cursor),
+        type="My Courses",
+    )
 
 
 @blp.post("/delete_account")
@@ -0,0 +1,28 @@
+import marshmallow as ma
+from flask_smorest.utils import resolve_schema_instance
+
+from services.serialization import CompiledSchema
+
+
+class CompiledSerializerMixin:
+    """
+    Extend Blueprint to dump the responses of its views with compiled serializers and encode them with orjson (see
+    `services.serialization`), enabled per blueprint with `compiled_serializers=True`
+    """
+
+    def __init__(self, *args, compiled_serializers=False, **kwargs):
+        self.compiled_serializers = compiled_serializers
+        super().__init__(*args, **kwargs)
+
+    def response(self, status_code, schema=None, **kwargs):
+        """`flask_smorest.Blueprint.response`, the schema is compiled when the view is declared"""
+        schema = resolve_schema_instance(schema)
+        if self.compiled_serializers and isinstance(schema, ma.Schema):
+            schema = CompiledSchema(schema)
+        return super().response(status_code, schema, **kwargs)
+
+    def _make_doc_response_schema(self, schema):
+        # the documented schema is the one that was compiled
+        if isinstance(schema, CompiledSchema):
+            schema = schema.schema
+        return super()._make_doc_response_schema(schema)
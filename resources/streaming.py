@@ -0,0 +1,103 @@
+"""
+Streamed responses for export-style consumers of the collection endpoints. With `?stream=json` (a JSON array) or
+`?stream=ndjson` (one JSON document per line) the whole collection is returned in one response rather than a page;
+rows are read through a server-side cursor in batches of `STREAM_BATCH_SIZE`, each row is dumped with the schema of
+the endpoint and written to the socket as it is serialised. The session only holds weak references to unmodified rows,
+so each row is released once written and the memory of a worker stays flat however large the collection.
+"""
+
+import http
+from copy import deepcopy
+from functools import wraps
+
+import marshmallow as ma
+from flask import Response, current_app, request, stream_with_context
+from flask_smorest.utils import unpack_tuple_response
+
+STREAM_MIMETYPES = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+
+class StreamParametersSchema(ma.Schema):
+    """Deserializes the `stream` query argument"""
+
+    class Meta:
+        unknown = ma.EXCLUDE
+
+    stream = ma.fields.String(
+        load_default=None,
+        validate=ma.validate.OneOf(list(STREAM_MIMETYPES)),
+        metadata={"description": "stream the whole collection as a JSON array (`json`) or as NDJSON (`ndjson`)"},
+    )
+
+
+def _stream_rows(query, schema, batch_size):
+    """:return: the rows of the query dumped with the schema, reading `batch_size` rows at a time"""
+    for row in query.yield_per(batch_size):
+        yield schema.dump(row)
+
+
+def stream_json(query, schema, batch_size):
+    """yields a JSON array of the rows of a query"""
+    dumps = current_app.json.dumps
+    yield "["
+    for index, item in enumerate(_stream_rows(query, schema, batch_size)):
+        yield ("," if index else "") + dumps(item)
+    yield "]"
+
+
+def stream_ndjson(query, schema, batch_size):
+    """yields the rows of a query as newline delimited JSON"""
+    dumps = current_app.json.dumps
+    for item in _stream_rows(query, schema, batch_size):
+        yield dumps(item) + "\n"
+
+
+STREAM_WRITERS = {"json": stream_json, "ndjson": stream_ndjson}
+
+
+class StreamingMixin:
+    """Extend Blueprint to add streamed responses to the keyset paginated collection endpoints"""
+
+    def streamable(self, schema):
+        """
+        Decorator adding the `stream` query argument to a keyset paginated endpoint, it must decorate the view function
+        beneath `keyset_paginate`. When streaming, `pagination_parameters.paginate` returns the ordered query rather
+        than a page (starting `after` the cursor if one is given, such that an interrupted export can be resumed).
+        :param schema: the marshmallow schema class each row is dumped with
+        """
+        row_schema = schema()
+        error_status_code = self.PAGINATION_ARGUMENTS_PARSER.DEFAULT_VALIDATION_STATUS
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                stream = self.PAGINATION_ARGUMENTS_PARSER.parse(StreamParametersSchema, request, location="query")[
+                    "stream"
+                ]
+                if stream is None:
+                    return func(*args, **kwargs)
+
+                kwargs["pagination_parameters"].stream = True
+                query, status, headers = unpack_tuple_response(func(*args, **kwargs))
+                # a sparse fieldset (see `sparse_fieldsets`) restricts the fields of each streamed row
+                schema = kwargs["fieldset"].schema if "fieldset" in kwargs else row_schema
+                body = STREAM_WRITERS[stream](query, schema, current_app.config["STREAM_BATCH_SIZE"])
+                return Response(
+                    stream_with_context(body), status=status, headers=headers, mimetype=STREAM_MIMETYPES[stream]
+                )
+
+            wrapper._apidoc = deepcopy(getattr(wrapper, "_apidoc", {}))
+            wrapper._apidoc["streaming"] = {
+                "parameters": {"in": "query", "schema": StreamParametersSchema},
+                "response": {error_status_code: http.HTTPStatus(error_status_code).name},
+            }
+            return wrapper
+
+        return decorator
+
+    def _prepare_streaming_doc(self, doc, doc_info, **kwargs):
+        operation = doc_info.get("streaming")
+        if operation:
+            doc.setdefault("parameters", []).append(operation["parameters"])
+            doc.setdefault("responses", {}).update(operation["response"])
+        return doc
@@ -1,14 +1,17 @@
 from flask.views import MethodView
 from flask_jwt_extended import get_jwt, jwt_required
-from flask_smorest import Blueprint, abort
-from passlib.hash import pbkdf2_sha256
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from flask_smorest import abort
 
 from db import db
-from models import StudentModel
-from schemas import StudentSchema, StudentUpdateSchema
+from models import CourseRegisterModel, StudentModel, StudentRegister
+from resources.blueprint import Blueprint
+from schemas import PlainStudentSchema, StudentSchema, StudentUpdateSchema
+from services import LoadStrategy, cache, cached_response, query_budget, register_user, upsert
 
-blp = Blueprint("Students", __name__, description="Operations on students")
+blp = Blueprint("Students", __name__, description="Operations on students", compiled_serializers=True)
+
+# relationships dumped by the `StudentSchema`
+LOAD_STRATEGY = LoadStrategy(StudentModel.registers)
 
 
 @blp.route("/students")
@@ -16,31 +19,21 @@ class StudentList(MethodView):
     """For getting student db entries and creating new students"""
 
     @staticmethod
+    @query_budget(3)
+    @blp.conditional(StudentModel, StudentRegister, CourseRegisterModel)
     @blp.response(200, StudentSchema(many=True))
-    def get():
-        """Used to retrieve a list of students from the database"""
-        return StudentModel.query.all()
+    @blp.keyset_paginate()
+    @blp.sparse_fieldsets(StudentSchema, LOAD_STRATEGY)
+    @blp.streamable(StudentSchema)
+    def get(pagination_parameters, fieldset):
+        """Used to retrieve a page of students from the database"""
+        return pagination_parameters.paginate(fieldset.apply(StudentModel.query), StudentModel.id)
 
     @blp.arguments(StudentSchema, location="form", content_type="form")
     @blp.response(201, StudentSchema)
     def post(self, student_data):
         """Used to add a student to the database"""
-        if StudentModel.query.filter(StudentModel.username == student_data["username"]).first():
-            abort(409, message="a student with that username already exists")
-
-        student_data["password"] = pbkdf2_sha256.hash(student_data["password"])
-        student = StudentModel(**student_data)
-
-        try:
-            db.session.add(student)
-            db.session.commit()
-        except IntegrityError as e:
-            abort(400, message=f"an integrity error occured please inspect: {e}")
-
-        except SQLAlchemyError as e:
-            abort(500, message=f"an error occured when adding student to db: {e}")
-
-        return student
+        return register_user(StudentModel, student_data, user_type="student")
 
 
 @blp.route("/students/<int:student_id>")
@@ -50,10 +43,13 @@ class Student(MethodView):
     """
 
     @staticmethod
+    @query_budget(2)
+    @cached_response("student:{student_id}", "students")
     @blp.response(200, StudentSchema)
-    def get(student_id):
+    @blp.sparse_fieldsets(StudentSchema, LOAD_STRATEGY)
+    def get(student_id, fieldset):
         """used to retrieve a single student from the database"""
-        student = StudentModel.query.get_or_404(student_id)
+        student = fieldset.apply(StudentModel.query).get_or_404(student_id)
         return student
 
     @jwt_required()
@@ -64,24 +60,18 @@ class Student(MethodView):
             student = StudentModel.query.get_or_404(student_id)
             db.session.delete(student)
             db.session.commit()
+            cache.invalidate(f"student:{student_id}", "students", "course_registers")
             return {"message": "deleted student"}
 
         abort(401, message="you are not allowed to delete other accounts")
 
     @blp.arguments(StudentUpdateSchema)
-    @blp.response(204, StudentSchema)
+    @blp.response(200, PlainStudentSchema)
+    @blp.alt_response(201, schema=PlainStudentSchema, description="Created")
     def put(self, student_data, student_id):
         """used to update student data from the database, if student isn't present, we create the student"""
-        student = StudentModel.query.get(student_id)
-        if student:
-            for key, value in student_data.items():
-                setattr(student, key, value)
-            status_code = 200
-
-        else:
-            student = StudentModel(id=student_id, **student_data)
-            status_code = 201
-
-        db.session.add(student)
+        student, created = upsert(StudentModel, student_id, student_data)
         db.session.commit()
-        return student, status_code
+        # the students list and the course registers the student is enrolled on serialise the student
+        cache.invalidate(f"student:{student_id}", "students", "course_registers")
+        return student, 201 if created else 200
@@ -1,45 +1,36 @@
 from flask.views import MethodView
 from flask_jwt_extended import get_jwt, jwt_required
-from flask_smorest import Blueprint, abort
-from passlib.handlers.pbkdf2 import pbkdf2_sha256
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from flask_smorest import abort
 
 from db import db
-from models import TutorModel
-from schemas import TutorSchema, TutorUpdateSchema
+from models import CourseRegisterModel, TutorModel, TutorRegister
+from resources.blueprint import Blueprint
+from schemas import PlainTutorSchema, TutorSchema, TutorUpdateSchema
+from services import LoadStrategy, cache, cached_response, query_budget, register_user, upsert
 
-blp = Blueprint("Tutors", __name__, description="Operations on Tutors")
+blp = Blueprint("Tutors", __name__, description="Operations on Tutors", compiled_serializers=True)
+
+# relationships dumped by the `TutorSchema`
+LOAD_STRATEGY = LoadStrategy(TutorModel.registers)
 
 
 @blp.route("/tutors")
 class TutorList(MethodView):
     @staticmethod
+    @query_budget(3)
+    @blp.conditional(TutorModel, TutorRegister, CourseRegisterModel)
     @blp.response(200, TutorSchema(many=True))
-    def get():
-        return TutorModel.query.all()
+    @blp.keyset_paginate()
+    @blp.sparse_fieldsets(TutorSchema, LOAD_STRATEGY)
+    @blp.streamable(TutorSchema)
+    def get(pagination_parameters, fieldset):
+        return pagination_parameters.paginate(fieldset.apply(TutorModel.query), TutorModel.id)
 
     @staticmethod
     @blp.arguments(TutorSchema, location="form", content_type="form")
     @blp.response(201, TutorSchema)
     def post(tutor_data):
-        print(tutor_data)
-        if TutorModel.query.filter(TutorModel.username == tutor_data["username"]).first():
-            abort(409, message="a student with that username already exists")
-
-        tutor_data["password"] = pbkdf2_sha256.hash(tutor_data["password"])
-
-        tutor = TutorModel(**tutor_data)
-
-        try:
-            db.session.add(tutor)
-            db.session.commit()
-        except IntegrityError as e:
-            abort(400, message=f"an internal error occured please inspect: {e}")
-
-        except SQLAlchemyError as e:
-            abort(500, message=f"an error occured when adding tutor to db: {e}")
-
-        return tutor
+        return register_user(TutorModel, tutor_data, user_type="tutor")
 
 
 @blp.route("/tutors/<int:tutor_id>")
@@ -49,10 +40,13 @@ class Tutor(MethodView):
     """
 
     @staticmethod
+    @query_budget(2)
+    @cached_response("tutor:{tutor_id}", "tutors")
     @blp.response(200, TutorSchema)
-    def get(tutor_id):
+    @blp.sparse_fieldsets(TutorSchema, LOAD_STRATEGY)
+    def get(tutor_id, fieldset):
         """used to retrieve a single tutor from the database"""
-        tutor = TutorModel.query.get_or_404(tutor_id)
+        tutor = fieldset.apply(TutorModel.query).get_or_404(tutor_id)
         return tutor
 
     @jwt_required()
@@ -63,25 +57,19 @@ class Tutor(MethodView):
             tutor = TutorModel.query.get_or_404(tutor_id)
             db.session.delete(tutor)
             db.session.commit()
+            cache.invalidate(f"tutor:{tutor_id}", "tutors", "course_registers")
             return {"message": "tutors deleted"}
 
         abort(401, message="you are not permissioned to delete other accounts")
 
     @blp.arguments(TutorUpdateSchema)
-    @blp.response(204, TutorSchema)
+    @blp.response(200, PlainTutorSchema)
+    @blp.alt_response(201, schema=PlainTutorSchema, description="Created")
     def put(self, tutor_data, tutor_id):
         """used to update tutor data from the database, if tutor isn't present, we create the tutor"""
-        tutor = TutorModel.query.get(tutor_id)
-        if tutor:
-            for key, value in tutor_data.items():
-                setattr(tutor, key, value)
-            status_code = 200
-
-        else:
-            tutor = TutorModel(id=tutor_id, **tutor_data)
-            status_code = 201
-
-        db.session.add(tutor)
+        tutor, created = upsert(TutorModel, tutor_id, tutor_data)
         db.session.commit()
+        # the tutors list and the course registers the tutor is enrolled on serialise the tutor
+        cache.invalidate(f"tutor:{tutor_id}", "tutors", "course_registers")
 
-        return tutor, status_code
+        return tutor, 201 if created else 200
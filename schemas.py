@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
 
 
 class PlainCourseSchema(Schema):
@@ -79,6 +79,22 @@ class CourseRegisterAndTutorSchema(Schema):
     tutor = fields.Nested(TutorSchema())
 
 
+class EnrolmentSchema(Schema):
+    students = fields.List(fields.Int(), load_default=list, validate=validate.Length(max=1000))
+    tutors = fields.List(fields.Int(), load_default=list, validate=validate.Length(max=1000))
+
+
+class EnrolmentOutcomeSchema(Schema):
+    id = fields.Int()
+    outcome = fields.Str()
+
+
+class EnrolmentOutcomesSchema(Schema):
+    message = fields.Str()
+    students = fields.List(fields.Nested(EnrolmentOutcomeSchema()))
+    tutors = fields.List(fields.Nested(EnrolmentOutcomeSchema()))
+
+
 class StudentUpdateSchema(Schema):
     name = fields.Str()
     email = fields.Email()
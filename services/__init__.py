@@ -0,0 +1,18 @@
+from services.accounts import authenticate, register_user  # noqa: F401
+from services.assets import assets, build_bundles, minify_css  # noqa: F401
+from services.caching import cache  # noqa: F401
+from services.catalog import catalog  # noqa: F401
+from services.compression import compression, precompress_static  # noqa: F401
+from services.enrolments import counterparts_query, courses_query, enrol, link, unenrol, unlink  # noqa: F401
+from services.fragments import fragment_cache  # noqa: F401
+from services.hashing import password_hasher  # noqa: F401
+from services.instrumentation import query_budget, sql_instrumentation  # noqa: F401
+from services.loading import Fieldset, LoadStrategy  # noqa: F401
+from services.response_cache import cached_response  # noqa: F401
+from services.seeding import SeedCounts, seed  # noqa: F401
+from services.serialization import CompiledSchema, FastJSONProvider, compile_schema  # noqa: F401
+from services.sessions import session_refresher  # noqa: F401
+from services.stats import HomepageStats, get_homepage_stats  # noqa: F401
+from services.templates import TemplateNotPrecompiled, template_cache  # noqa: F401
+from services.upserts import upsert  # noqa: F401
+from services.versions import CATALOG, DATA, bump, get_version  # noqa: F401
@@ -0,0 +1,57 @@
+from flask_smorest import abort
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import undefer
+
+from db import db
+from services.caching import cache
+from services.hashing import password_hasher
+
+
+def register_user(model, user_data, user_type):
+    """
+    Creates a user (student or tutor) in the database, hashing their password before it is stored
+    :param model: the `StudentModel` or `TutorModel` used to persist the user
+    :param user_data: the validated payload of the `StudentSchema` or `TutorSchema`
+    :param user_type: one of `student` `tutor`, used in error messages
+    :return: the created user
+    """
+    if model.query.filter(model.username == user_data["username"]).first():
+        abort(409, message=f"a {user_type} with that username already exists")
+
+    user_data["password"] = password_hasher.hash(user_data["password"])
+    user = model(**user_data)
+
+    try:
+        db.session.add(user)
+        db.session.commit()
+        # the lists and counts of the users are cached with the tag of their type
+        cache.invalidate(f"{user_type}s")
+    except IntegrityError as e:
+        abort(400, message=f"an integrity error occured please inspect: {e}")
+
+    except SQLAlchemyError as e:
+        abort(500, message=f"an error occured when adding {user_type} to db: {e}")
+
+    return user
+
+
+def authenticate(model, username, password):
+    """
+    Checks a users credentials against the stored password hash. If the stored hash was created with a different
+    work factor to the one configured, the password is rehashed with the configured work factor.
+    :param model: the `StudentModel` or `TutorModel` the user is stored in
+    :return: the user if the credentials are valid, otherwise None
+    """
+    user = model.query.options(undefer(model.password)).filter(model.username == username).first()
+    if user is None:
+        return None
+
+    is_valid, new_hash = password_hasher.verify(password, user.password)
+    if not is_valid:
+        return None
+
+    if new_hash:
+        user.password = new_hash
+        db.session.commit()
+
+    return user
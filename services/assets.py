@@ -0,0 +1,141 @@
+"""
+Fingerprinted stylesheet bundles. Each bundle in `BUNDLES` concatenates and minifies stylesheets of the static folder
+into `static/dist/<name>.<content hash>.<ext>`, built at startup (or at build time with `flask build-assets`). Pages
+link a bundle with the `asset_urls` template global, so a page needs one stylesheet request. As the name of a bundle
+changes with its content, bundles are served with `Cache-Control: public, max-age=31536000, immutable` and a repeat
+visit makes no request for them at all; the unfingerprinted files keep the default caching of flask. In debug mode the
+bundles are rebuilt when they are linked, such that edits to the stylesheets are picked up without a restart.
+
+When the static folder is read-only, a bundle is linked as built by `flask build-assets` or, if it was not built for
+the current stylesheets, as the stylesheets it bundles.
+"""
+
+import hashlib
+import logging
+import os
+import re
+
+from flask import current_app, request, url_for
+
+from services.compression import write_atomically
+
+logger = logging.getLogger(__name__)
+
+# the stylesheets of each bundle, relative to the static folder, in the order they are concatenated
+BUNDLES = {
+    "homepage.css": [
+        "style.css",
+        "components/banner.css",
+        "components/component.css",
+        "components/component1.css",
+        "components/feature-card2.css",
+        "components/navigation-links.css",
+        "components/navigation-links1.css",
+        "components/statistic.css",
+        "components/testimonial-card1.css",
+        "home.css",
+    ],
+}
+
+DIST_FOLDER = "dist"
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# strings are matched first such that they are kept as is
+_CSS_TOKENS = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)|(\s+)""", re.DOTALL)
+_CSS_PUNCTUATION = re.compile(r"""\s*;\s*}\s*|\s*([{};,])\s*|:\s+""")
+
+
+def minify_css(css):
+    """:return: the stylesheet without comments and insignificant whitespace"""
+    strings = []
+
+    def replace_token(match):
+        string, comment, _ = match.groups()
+        if string is not None:
+            strings.append(string)
+            return f"\0{len(strings) - 1}\0"
+        return "" if comment is not None else " "
+
+    css = _CSS_TOKENS.sub(replace_token, css)
+    # the last declaration of a block needs no semicolon
+    css = _CSS_PUNCTUATION.sub(lambda match: match.group(1) or ("}" if "}" in match.group(0) else ":"), css).strip()
+    return re.sub(r"\0(\d+)\0", lambda match: strings[int(match.group(1))], css)
+
+
+def _bundle(static_folder, name, sources):
+    """:return: the fingerprinted path of a bundle relative to the static folder, and its content"""
+    contents = []
+    for source in sources:
+        with open(os.path.join(static_folder, source), encoding="utf-8") as stylesheet:
+            contents.append(minify_css(stylesheet.read()))
+    content = "\n".join(contents).encode("utf-8")
+
+    stem, extension = os.path.splitext(name)
+    return f"{DIST_FOLDER}/{stem}.{hashlib.sha256(content).hexdigest()[:12]}{extension}", content
+
+
+def build_bundles(static_folder, bundles=None):
+    """
+    Writes the bundles that are not already built into the dist folder of a static folder
+    :return: the manifest of the bundles, mapping the name of each bundle to its path relative to the static folder
+    """
+    manifest = {}
+    os.makedirs(os.path.join(static_folder, DIST_FOLDER), exist_ok=True)
+    for name, sources in (bundles or BUNDLES).items():
+        path, content = _bundle(static_folder, name, sources)
+        # the content of a fingerprinted file never changes, one that exists is up to date
+        if not os.path.exists(os.path.join(static_folder, path)):
+            write_atomically(os.path.join(static_folder, path), content)
+        manifest[name] = path
+    return manifest
+
+
+def linked_stylesheets(static_folder, bundles=None):
+    """
+    Reads the bundles without writing any
+    :return: the stylesheets linked for each bundle, its fingerprinted path if it is built, otherwise its sources
+    """
+    manifest = {}
+    for name, sources in (bundles or BUNDLES).items():
+        path, _ = _bundle(static_folder, name, sources)
+        manifest[name] = [path] if os.path.exists(os.path.join(static_folder, path)) else list(sources)
+    return manifest
+
+
+class Assets:
+    """The flask extension building and linking the fingerprinted bundles"""
+
+    def init_app(self, app):
+        """builds the bundles at startup and registers the `asset_urls` template global"""
+        app.extensions["assets"] = self.build(app.static_folder)
+        app.add_template_global(self.asset_urls)
+        app.after_request(self.cache_fingerprinted)
+
+    @staticmethod
+    def build(static_folder):
+        """:return: the stylesheets linked for each bundle, the bundles are built unless the folder is read-only"""
+        try:
+            return {name: [path] for name, path in build_bundles(static_folder).items()}
+        except OSError as e:
+            # e.g. a read-only deployment, the bundles written by `flask build-assets` at build are linked
+            logger.warning(f"could not build the stylesheet bundles: {e}")
+            return linked_stylesheets(static_folder)
+
+    def asset_urls(self, name, **values):
+        """:return: the urls of the stylesheets of the bundle `name`, e.g. `asset_urls("homepage.css")`"""
+        if current_app.debug:
+            current_app.extensions["assets"] = self.build(current_app.static_folder)
+        return [url_for("static", filename=path, **values) for path in current_app.extensions["assets"][name]]
+
+    @staticmethod
+    def cache_fingerprinted(response):
+        """lets clients cache the fingerprinted bundles for a year without revalidating them"""
+        filename = request.view_args.get("filename", "") if request.endpoint == "static" else ""
+        if response.status_code == 200 and filename.startswith(f"{DIST_FOLDER}/"):
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        return response
+
+
+assets = Assets()
@@ -0,0 +1,271 @@
+"""
+The cache backends of the app, selected with `CACHE_BACKEND`
+- `file` (default): a local sqlite file shared by the workers of a single host, entries are pickled
+- `local`: an in-process LRU with a TTL, each worker holds its own entries
+
+Entries are keyed on the data version they were built from (see `services.versions`) rather than being deleted on
+write, so a backend only needs to bound its memory; stale entries age out of the LRU or expire.
+
+Entries cached with `get_or_set` may instead be tagged, e.g. `student:1`. Each tag holds a token in the backend and an
+entry records the tokens of its tags when it is built; `invalidate` replaces the token of a tag, such that every entry
+built before is stale. Tags are shared by the workers of the `file` backend, whereas a `local` backend only sees the
+invalidations of its own worker, so it is refused when gunicorn runs more than one (`WEB_CONCURRENCY`).
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from flask import current_app
+
+
+class LocalCache:
+    """
+    A thread safe in-process LRU cache whose entries expire
+    :param max_entries: the number of entries held before the least recently used is evicted
+    :param ttl: the default seconds an entry is held for, None holds entries until they are evicted
+    """
+
+    def __init__(self, max_entries=1024, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """:return: the value of an unexpired entry, None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        """caches a value only if the key holds no unexpired entry, :return: True if the value was cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                return False
+
+            self._set(key, value, ttl)
+            return True
+
+    def _set(self, key, value, ttl):
+        """caches a value, the lock must be held"""
+        ttl = ttl if ttl is not None else self.ttl
+        self._entries[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FileCache:
+    """
+    A cache stored in a local sqlite file, shared by the workers of a single host
+    :param path: the path of the sqlite file
+    :param max_entries: the number of entries held before the least recently written are evicted
+    :param ttl: the default seconds an entry is held for, None holds entries until they are evicted
+    """
+
+    def __init__(self, path, max_entries=1024, ttl=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+
+    def _connection(self):
+        """:return: the sqlite connection of the calling thread"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+            )
+            .fetchone()
+        )
+        return pickle.loads(row[0]) if row is not None else None
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, pickle.dumps(value), time.time() + ttl if ttl is not None else None),
+        )
+        # evict the expired entries then the oldest, rowids grow with each write
+        connection.execute(
+            "DELETE FROM cache WHERE expires_at <= ? OR rowid <= (SELECT MAX(rowid) FROM cache) - ?",
+            (time.time(), self.max_entries),
+        )
+
+    def add(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        connection = self._connection()
+        connection.execute("DELETE FROM cache WHERE key = ? AND expires_at <= ?", (key, time.time()))
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, pickle.dumps(value), time.time() + ttl if ttl is not None else None),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache")
+
+
+class Cache:
+    """The flask extension holding the cache backend of an app"""
+
+    def init_app(self, app):
+        """
+        configures the cache backend of the app with the following config:
+        CACHE_BACKEND: one of `file` `local` (default `file`, such that a page is rendered once for every worker),
+            `local` is refused with more than one `WEB_CONCURRENCY` worker
+        CACHE_FILE: the sqlite file used by the `file` backend
+        CACHE_MAX_ENTRIES: the number of entries held before the least recently used are evicted
+        CACHE_DEFAULT_TTL: the seconds an entry is held for, None holds entries until they are evicted
+        CACHE_LOCK_TIMEOUT: the seconds `get_or_set` waits for another request computing the same entry
+        RESPONSE_CACHE: whether the responses of views decorated with `cached_response` are cached (default True)
+        RESPONSE_CACHE_TTL: the seconds a response is held for, bounding how stale the `local` backend can be
+        """
+        app.config.setdefault("CACHE_BACKEND", "file")
+        app.config.setdefault("CACHE_FILE", os.path.join(app.instance_path, "cache.db"))
+        app.config.setdefault("CACHE_MAX_ENTRIES", 1024)
+        app.config.setdefault("CACHE_DEFAULT_TTL", 3600)
+        app.config.setdefault("CACHE_LOCK_TIMEOUT", 5)
+        app.config.setdefault("RESPONSE_CACHE", True)
+        app.config.setdefault("RESPONSE_CACHE_TTL", 60)
+
+        options = {"max_entries": app.config["CACHE_MAX_ENTRIES"], "ttl": app.config["CACHE_DEFAULT_TTL"]}
+        if app.config["CACHE_BACKEND"] == "local":
+            # an invalidation only reaches the worker handling the write, the others would serve its stale entries
+            if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+                raise ValueError("CACHE_BACKEND `local` is not shared between the WEB_CONCURRENCY workers, use `file`")
+            app.extensions["cache"] = LocalCache(**options)
+        elif app.config["CACHE_BACKEND"] == "file":
+            os.makedirs(os.path.dirname(app.config["CACHE_FILE"]), exist_ok=True)
+            app.extensions["cache"] = FileCache(app.config["CACHE_FILE"], **options)
+        else:
+            raise ValueError(f"unknown CACHE_BACKEND: {app.config['CACHE_BACKEND']}")
+
+    @property
+    def backend(self):
+        return current_app.extensions["cache"]
+
+    def get(self, key):
+        """:return: the cached value of a key, None on a miss"""
+        return self.backend.get(key)
+
+    def set(self, key, value, ttl=None):
+        """caches a value for `ttl` seconds (defaults to `CACHE_DEFAULT_TTL`)"""
+        self.backend.set(key, value, ttl)
+
+    def delete(self, key):
+        self.backend.delete(key)
+
+    def _tokens(self, tags):
+        """:return: the current token of each tag, creating the tokens of new (or evicted) tags"""
+        tokens = {}
+        for tag in tags:
+            token = self.backend.get(f"tag:{tag}")
+            if token is None:
+                token = uuid.uuid4().hex
+                if not self.backend.add(f"tag:{tag}", token):
+                    token = self.backend.get(f"tag:{tag}")
+            tokens[tag] = token
+        return tokens
+
+    def _fresh_value(self, key):
+        """:return: the tagged entry of a key if none of its tags were invalidated since it was built"""
+        entry = self.backend.get(key)
+        if entry is None:
+            return None
+
+        _, tokens = entry
+        if any(self.backend.get(f"tag:{tag}") != token for tag, token in tokens.items()):
+            return None
+        return entry
+
+    def get_or_set(self, key, compute, ttl=None, tags=()):
+        """
+        Reads through the cache; on a miss `compute` is called and its value cached with the given tags. Only one
+        request computes a missing key at a time, the others wait for its value for up to `CACHE_LOCK_TIMEOUT` seconds
+        before computing it themselves.
+        :param key: the key of the entry
+        :param compute: a callable returning the value of the entry
+        :param ttl: the seconds the entry is held for (defaults to `CACHE_DEFAULT_TTL`)
+        :param tags: the tags invalidating the entry
+        :return: the cached or computed value
+        """
+        entry = self._fresh_value(key)
+        if entry is not None:
+            return entry[0]
+
+        lock_timeout = current_app.config["CACHE_LOCK_TIMEOUT"]
+        deadline = time.monotonic() + lock_timeout
+        locked = self.backend.add(f"lock:{key}", True, ttl=lock_timeout)
+        waited = not locked
+        while not locked and time.monotonic() < deadline:
+            time.sleep(0.01)
+            entry = self._fresh_value(key)
+            if entry is not None:
+                return entry[0]
+            locked = self.backend.add(f"lock:{key}", True, ttl=lock_timeout)
+
+        try:
+            # the request holding the lock may have cached the entry and released the lock since the entry was read
+            entry = self._fresh_value(key) if waited else None
+            if entry is not None:
+                return entry[0]
+
+            # the tokens are read before computing, an invalidation whilst computing leaves the entry stale
+            tokens = self._tokens(tags)
+            value = compute()
+            self.backend.set(key, (value, tokens), ttl)
+            return value
+        finally:
+            if locked:
+                self.backend.delete(f"lock:{key}")
+
+    def invalidate(self, *tags):
+        """marks the entries cached with any of the tags as stale"""
+        for tag in tags:
+            self.backend.set(f"tag:{tag}", uuid.uuid4().hex)
+
+
+cache = Cache()
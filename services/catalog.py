@@ -0,0 +1,127 @@
+"""
+A process-wide read-through cache of the course catalog; the courses and their registers. The catalog changes rarely
+but is read by most pages, so each worker loads it once, serves reads from memory and only checks the `catalog`
+version (a primary key lookup, see `services.versions`) on each read. Writes to a course or a register bump the version
+in their transaction and the next read of every worker reloads the catalog.
+
+The catalog is held as the dumped `CourseSchema` of each course rather than as models, such that it is never bound to
+the session of a request. A catalog larger than `CATALOG_MAX_ENTRIES` is not held; reads fall back to the database.
+"""
+
+import threading
+from collections import Counter
+from dataclasses import dataclass
+
+from flask import current_app
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from db import db
+from models import CourseModel, CourseRegisterModel
+from schemas import CourseSchema
+from services.versions import CATALOG, get_version
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """The catalog at a version, `courses` are ordered by id and `by_id` indexes them"""
+
+    version: int
+    courses: list
+    by_id: dict
+
+
+class _CatalogState:
+    """The snapshot held by a worker and its metrics"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.snapshot = None
+        # the version at which the catalog was too large to hold, it is not loaded again until the version changes
+        self.oversized_version = None
+        self.metrics = Counter(hits=0, misses=0, oversized=0)
+        self.lock = threading.Lock()
+
+    def count(self, metric):
+        with self.lock:
+            self.metrics[metric] += 1
+
+
+def _load(version, max_entries):
+    """:return: a snapshot of the catalog, None if it has more than `max_entries` courses and registers"""
+    entries = db.session.scalar(
+        select(
+            select(func.count()).select_from(CourseModel).scalar_subquery()
+            + select(func.count()).select_from(CourseRegisterModel).scalar_subquery()
+        )
+    )
+    if entries > max_entries:
+        return None
+
+    courses = CourseModel.query.options(selectinload(CourseModel.registers)).order_by(CourseModel.id).all()
+    dumped = CourseSchema(many=True).dump(courses)
+    return CatalogSnapshot(version=version, courses=dumped, by_id={course["id"]: course for course in dumped})
+
+
+class Catalog:
+    """The flask extension holding the catalog cache of a worker"""
+
+    def init_app(self, app):
+        """
+        configures the catalog cache with the following config:
+        CATALOG_CACHE: whether the catalog is cached (default True)
+        CATALOG_MAX_ENTRIES: the number of courses and registers held, a larger catalog is read from the database
+        CATALOG_DEBUG_ENDPOINT: whether the `/debug/catalog` endpoint is served (default `app.debug`)
+        """
+        app.config.setdefault("CATALOG_CACHE", True)
+        app.config.setdefault("CATALOG_MAX_ENTRIES", 10000)
+        app.config.setdefault("CATALOG_DEBUG_ENDPOINT", app.debug)
+        if app.config["CATALOG_CACHE"]:
+            app.extensions["catalog"] = _CatalogState(app.config["CATALOG_MAX_ENTRIES"])
+
+    @property
+    def _state(self):
+        return current_app.extensions.get("catalog")
+
+    def snapshot(self):
+        """
+        :return: the current CatalogSnapshot, loaded if the catalog changed since it was last read. None if the
+            catalog is not cached, the caller then reads from the database
+        """
+        state = self._state
+        if state is None:
+            return None
+
+        version = get_version(CATALOG)
+        snapshot = state.snapshot
+        if snapshot is not None and snapshot.version == version:
+            state.count("hits")
+            return snapshot
+        if state.oversized_version == version:
+            state.count("oversized")
+            return None
+
+        state.count("misses")
+        snapshot = _load(version, state.max_entries)
+        if snapshot is None:
+            state.oversized_version = version
+            return None
+
+        with state.lock:
+            # a concurrent request may have loaded a later version whilst this one was loading
+            if state.snapshot is None or state.snapshot.version <= version:
+                state.snapshot = snapshot
+        return snapshot
+
+    def metrics(self):
+        """:return: the hits, misses and size of the catalog cache of this worker"""
+        state = self._state
+        snapshot = state.snapshot
+        return {
+            **state.metrics,
+            "version": snapshot.version if snapshot is not None else None,
+            "courses": len(snapshot.courses) if snapshot is not None else 0,
+        }
+
+
+catalog = Catalog()
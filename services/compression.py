@@ -0,0 +1,151 @@
+"""
+Content negotiated compression of the responses. Dynamic responses (JSON and rendered pages) larger than
+`COMPRESS_MIN_SIZE` are compressed with brotli or gzip, whichever the client prefers, when they are sent. Static files
+are compressed once; `precompress_static` writes a `.br` and a `.gz` variant beside each file under the static folder
+(at startup, or at build time with `flask compress-static`) and the static route serves the variant the client accepts,
+so serving a static file costs no compression.
+
+A compressed response carries `Vary: Accept-Encoding` and its ETag is made weak, as the bytes of the representation
+depend on the encoding; weak ETags still validate the conditional GETs of the resources.
+"""
+
+import gzip
+import logging
+import mimetypes
+import os
+
+import brotli
+from flask import current_app, request, send_from_directory
+from werkzeug.security import safe_join
+
+logger = logging.getLogger(__name__)
+
+# the encodings in order of preference, with the suffix of their precompressed static variant
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+def _compress(data, encoding, config):
+    if encoding == "br":
+        return brotli.compress(data, quality=config["COMPRESS_BROTLI_LEVEL"])
+    return gzip.compress(data, compresslevel=config["COMPRESS_GZIP_LEVEL"], mtime=0)
+
+
+def write_atomically(path, data):
+    """writes a file such that concurrent readers (e.g. other workers starting up) never read it partially written"""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(data)
+    os.replace(temporary, path)
+
+
+def precompress_static(static_folder, config):
+    """
+    Writes the compressed variants of the compressible files of a static folder, skipping those that are up to date
+    :return: the number of variants written
+    """
+    written = 0
+    for root, _, filenames in os.walk(static_folder):
+        for filename in filenames:
+            if filename.endswith((*ENCODINGS.values(), ".tmp")):
+                continue
+            path = os.path.join(root, filename)
+            if mimetypes.guess_type(path)[0] not in config["COMPRESS_MIMETYPES"]:
+                continue
+
+            with open(path, "rb") as source:
+                data = None
+                for encoding, suffix in ENCODINGS.items():
+                    variant = path + suffix
+                    if os.path.exists(variant) and os.path.getmtime(variant) >= os.path.getmtime(path):
+                        continue
+                    data = data if data is not None else source.read()
+                    write_atomically(variant, _compress(data, encoding, config))
+                    written += 1
+    return written
+
+
+class Compression:
+    """The flask extension compressing responses"""
+
+    def init_app(self, app):
+        """
+        compresses the responses of the app with the following config:
+        COMPRESS_MIN_SIZE: the size in bytes below which dynamic responses are sent uncompressed (default 500)
+        COMPRESS_GZIP_LEVEL: the gzip compression level of dynamic responses and static files, 1 to 9 (default 6)
+        COMPRESS_BROTLI_LEVEL: the brotli quality of dynamic responses and static files, 0 to 11 (default 5)
+        COMPRESS_MIMETYPES: the mimetypes that are compressed
+        COMPRESS_STATIC: whether the static files are precompressed at startup and served precompressed (default True)
+        """
+        app.config.setdefault("COMPRESS_MIN_SIZE", 500)
+        app.config.setdefault("COMPRESS_GZIP_LEVEL", 6)
+        app.config.setdefault("COMPRESS_BROTLI_LEVEL", 5)
+        app.config.setdefault(
+            "COMPRESS_MIMETYPES",
+            {"application/json", "application/x-ndjson", "text/html", "text/css", "text/javascript"},
+        )
+        app.config.setdefault("COMPRESS_STATIC", True)
+        app.after_request(self.compress_response)
+
+        if app.config["COMPRESS_STATIC"] and app.has_static_folder:
+            try:
+                precompress_static(app.static_folder, app.config)
+            except OSError as e:
+                # e.g. a read-only deployment, the variants written by `flask compress-static` at build are served
+                logger.warning(f"could not precompress the static files: {e}")
+            app.view_functions["static"] = self.send_static_file
+
+    @staticmethod
+    def _accepted_encoding(encodings):
+        return request.accept_encodings.best_match(encodings)
+
+    def compress_response(self, response):
+        """compresses a dynamic response if the client accepts a compressed encoding"""
+        config = current_app.config
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in config["COMPRESS_MIMETYPES"]
+            or (response.content_length or 0) < config["COMPRESS_MIN_SIZE"]
+        ):
+            return response
+
+        # the response is compressed or not depending on the request
+        response.vary.add("Accept-Encoding")
+        encoding = self._accepted_encoding(list(ENCODINGS))
+        if encoding is None:
+            return response
+
+        response.set_data(_compress(response.get_data(), encoding, config))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag is not None and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def send_static_file(self, filename):
+        """the static route of the app, serving the precompressed variant of a file accepted by the client"""
+        path = safe_join(current_app.static_folder, filename)
+        mimetype = mimetypes.guess_type(filename)[0]
+        if path is None or mimetype not in current_app.config["COMPRESS_MIMETYPES"]:
+            return current_app.send_static_file(filename)
+
+        available = [encoding for encoding, suffix in ENCODINGS.items() if os.path.isfile(path + suffix)]
+        encoding = self._accepted_encoding(available)
+        if encoding is None:
+            response = current_app.send_static_file(filename)
+        else:
+            response = send_from_directory(
+                current_app.static_folder,
+                filename + ENCODINGS[encoding],
+                mimetype=mimetype,
+                max_age=current_app.get_send_file_max_age(filename),
+            )
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        return response
+
+
+compression = Compression()
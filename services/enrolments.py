@@ -0,0 +1,147 @@
+from sqlalchemy import delete, select
+
+from db import conflict_insert, db
+from models import CourseModel, CourseRegisterModel, StudentModel, StudentRegister, TutorModel, TutorRegister
+
+# the association table linking each user type to their course registers
+REGISTER_LINKS = {
+    "student": (StudentRegister, StudentRegister.student_id),
+    "tutor": (TutorRegister, TutorRegister.tutor_id),
+}
+
+
+def _registers_of(user_type, uid):
+    """:return: a subquery selecting the ids of the course registers a user is enrolled on"""
+    link, user_id = REGISTER_LINKS[user_type]
+    return select(link.course_register_id).where(user_id == uid)
+
+
+def counterparts_query(user_type, uid):
+    """
+    Builds a query for the people a user shares a course register with; the tutors of a student or the students of a
+    tutor. Filtering with `IN` subqueries rather than joining deduplicates the people in the database.
+    :param user_type: one of `student` `tutor`, the type of the calling user
+    :param uid: the db id of the calling user
+    :return: a query of `TutorModel` for a student or `StudentModel` for a tutor
+    """
+    registers = _registers_of(user_type, uid)
+    if user_type == "student":
+        tutor_ids = select(TutorRegister.tutor_id).where(TutorRegister.course_register_id.in_(registers))
+        return TutorModel.query.filter(TutorModel.id.in_(tutor_ids))
+
+    student_ids = select(StudentRegister.student_id).where(StudentRegister.course_register_id.in_(registers))
+    return StudentModel.query.filter(StudentModel.id.in_(student_ids))
+
+
+def courses_query(user_type, uid):
+    """
+    Builds a query for the distinct courses a user is enrolled on through their course registers
+    :param user_type: one of `student` `tutor`, the type of the calling user
+    :param uid: the db id of the calling user
+    :return: a query of `CourseModel`
+    """
+    course_ids = select(CourseRegisterModel.course_id).where(CourseRegisterModel.id.in_(_registers_of(user_type, uid)))
+    return CourseModel.query.filter(CourseModel.id.in_(course_ids))
+
+
+# the model of each user type
+USER_MODELS = {"student": StudentModel, "tutor": TutorModel}
+
+
+def _insert_links(user_type, uids, course_register_id):
+    """
+    Inserts the links of users to a course register in one statement, links that already exist are left untouched by
+    the unique constraint of the association table rather than read beforehand
+    :return: the ids of the users whose link was inserted
+    """
+    link, user_id = REGISTER_LINKS[user_type]
+    statement = (
+        conflict_insert(link)
+        .values([{user_id.key: uid, "course_register_id": course_register_id} for uid in uids])
+        .on_conflict_do_nothing(index_elements=[user_id.key, "course_register_id"])
+        .returning(user_id)
+    )
+    return set(db.session.scalars(statement))
+
+
+def _delete_links(user_type, uids, course_register_id):
+    """
+    Deletes the links of users to a course register in one statement
+    :return: the ids of the users whose link was deleted
+    """
+    link, user_id = REGISTER_LINKS[user_type]
+    statement = delete(link).where(link.course_register_id == course_register_id, user_id.in_(uids)).returning(user_id)
+    return set(db.session.scalars(statement))
+
+
+def link(user_type, uid, course_register_id):
+    """
+    Enrols a user on a course register without loading the registers they are already enrolled on. The caller is
+    responsible for committing the transaction, and for checking the user and course register exist.
+    :param user_type: one of `student` `tutor`
+    :param uid: the db id of the user
+    :param course_register_id: the db id of the course register
+    :return: True if the user was enrolled, False if they were already enrolled
+    """
+    return bool(_insert_links(user_type, [uid], course_register_id))
+
+
+def unlink(user_type, uid, course_register_id):
+    """
+    Removes a user from a course register without loading the registers they are enrolled on. The caller is
+    responsible for committing the transaction.
+    :param user_type: one of `student` `tutor`
+    :param uid: the db id of the user
+    :param course_register_id: the db id of the course register
+    :return: True if the user was removed, False if they were not enrolled
+    """
+    return bool(_delete_links(user_type, [uid], course_register_id))
+
+
+def _outcomes(uids, outcome_of):
+    """:return: the outcome of each distinct id, in the order requested"""
+    return [{"id": uid, "outcome": outcome_of(uid)} for uid in dict.fromkeys(uids)]
+
+
+def _existing_users(user_type, uids):
+    model = USER_MODELS[user_type]
+    return set(db.session.scalars(select(model.id).where(model.id.in_(uids))))
+
+
+def enrol(user_type, uids, course_register_id):
+    """
+    Enrols users on a course register, inserting the links of every user in one statement. The caller is responsible
+    for committing the transaction.
+    :param user_type: one of `student` `tutor`
+    :param uids: the db ids of the users to enrol
+    :param course_register_id: the db id of the course register
+    :return: the outcome of each id; one of `enrolled` `already_enrolled` `not_found`
+    """
+    existing = _existing_users(user_type, uids) if uids else set()
+    enrolled = _insert_links(user_type, list(existing), course_register_id) if existing else set()
+
+    return _outcomes(
+        uids,
+        lambda uid: "not_found" if uid not in existing else "enrolled" if uid in enrolled else "already_enrolled",
+    )
+
+
+def unenrol(user_type, uids, course_register_id):
+    """
+    Removes users from a course register, deleting their links in one statement. The caller is responsible for
+    committing the transaction.
+    :param user_type: one of `student` `tutor`
+    :param uids: the db ids of the users to remove
+    :param course_register_id: the db id of the course register
+    :return: the outcome of each id; one of `unenrolled` `not_enrolled` `not_found`
+    """
+    if not uids:
+        return []
+
+    existing = _existing_users(user_type, uids)
+    unenrolled = _delete_links(user_type, uids, course_register_id)
+
+    return _outcomes(
+        uids,
+        lambda uid: "not_found" if uid not in existing else "unenrolled" if uid in unenrolled else "not_enrolled",
+    )
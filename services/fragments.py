@@ -0,0 +1,68 @@
+"""
+A fragment cache for the html pages. Most of a page is the same for every user, e.g. the counts of the homepage, so
+the shared sections are wrapped in a `cache` tag and rendered once, whilst the sections personal to the user are
+rendered on every request and the page stitched together around the cached fragments:
+
+    {% cache "homepage:stats:" ~ version, ["students", "tutors", "courses", "course_registers"] %}
+        ...
+    {% endcache %}
+
+The first argument is the key of the fragment and the second the tags it depends on, e.g. `courses` or `student:1`;
+the resource handlers writing an entity invalidate its tags (see `Cache.invalidate`). A fragment counting every table
+is also keyed on the data version (see `services.versions`), which the writes outside the handlers bump too. A
+fragment without a key (None or undefined) is rendered without being cached, such that a template shared by personal
+and shared pages only caches the latter. As with any section of a template, values are only loaded when a fragment
+reads them; a view passes a callable for data it need not load when the fragment is cached.
+"""
+
+from flask import current_app
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+from services.caching import cache
+
+
+class FragmentCacheExtension(Extension):
+    """The jinja extension adding the `{% cache key, tags %}...{% endcache %}` tag"""
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        args.append(parser.parse_expression() if parser.stream.skip_if("comma") else nodes.Const(()))
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(self.call_method("_render_fragment", args), [], [], body).set_lineno(lineno)
+
+    @staticmethod
+    def _render_fragment(key, dependencies, caller):
+        """:return: the cached fragment of a key, rendering it on a miss"""
+        config = current_app.config
+        if not key or not config["FRAGMENT_CACHE"]:
+            return caller()
+
+        ttl = config["FRAGMENT_CACHE_TTL"]
+        if ttl is None and config["CACHE_BACKEND"] == "local":
+            # the other workers do not see the invalidations of this one
+            ttl = config["FRAGMENT_CACHE_LOCAL_TTL"]
+        return cache.get_or_set(f"fragment:{key}", caller, ttl=ttl, tags=list(dependencies))
+
+
+class FragmentCache:
+    """The flask extension adding the `cache` tag to the templates of the app"""
+
+    def init_app(self, app):
+        """
+        adds the `cache` tag to the jinja environment, configured with the following config:
+        FRAGMENT_CACHE: whether the fragments are cached (default True), when False the tag renders its body
+        FRAGMENT_CACHE_TTL: the seconds a fragment is held for (defaults to `CACHE_DEFAULT_TTL`)
+        FRAGMENT_CACHE_LOCAL_TTL: the seconds a fragment is held for by a `local` cache backend when no
+            `FRAGMENT_CACHE_TTL` is set (default 5), bounding how long another worker serves it stale
+        """
+        app.config.setdefault("FRAGMENT_CACHE", True)
+        app.config.setdefault("FRAGMENT_CACHE_TTL", None)
+        app.config.setdefault("FRAGMENT_CACHE_LOCAL_TTL", 5)
+        app.jinja_env.add_extension(FragmentCacheExtension)
+
+
+fragment_cache = FragmentCache()
@@ -0,0 +1,134 @@
+"""
+Password hashing offloaded to a bounded process pool. Hashing is deliberately CPU heavy; running it on the request
+thread lets a burst of logins block every other request served by the worker. The pool sizes authentication capacity
+separately from general API capacity, and requests beyond the configured queue depth are rejected with a 503 rather
+than queueing without bound.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+from flask_smorest import abort
+from passlib.context import CryptContext
+from passlib.hash import pbkdf2_sha256
+
+
+def default_workers():
+    """
+    :return: the default number of hashing processes of an app; each of the `WEB_CONCURRENCY` web workers (the worker
+        count read by gunicorn) runs its own pool, so the cores are shared between them rather than oversubscribed
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, int(os.getenv("WEB_CONCURRENCY", "1"))))
+
+
+def _hash_password(password, rounds):
+    """hashes a password with the configured work factor (runs in the process pool)"""
+    return pbkdf2_sha256.using(rounds=rounds).hash(password)
+
+
+def _verify_password(password, password_hash, rounds):
+    """
+    verifies a password against its hash (runs in the process pool)
+    :return: whether the password is valid and a new hash if the stored hash does not use the configured work factor
+    """
+    context = CryptContext(
+        schemes=["pbkdf2_sha256"],
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=rounds,
+        pbkdf2_sha256__max_rounds=rounds,
+    )
+    return context.verify_and_update(password, password_hash)
+
+
+class HashingPool:
+    """
+    A process pool with a bounded number of pending hashing jobs
+    :param workers: the number of processes, 0 hashes on the calling thread
+    :param max_pending: the maximum number of jobs running or queued before requests are rejected
+    :param retry_after: the seconds a rejected client is asked to wait before retrying
+    """
+
+    def __init__(self, workers, max_pending, retry_after):
+        self.workers = workers
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        """the executor is created on first use such that each gunicorn worker forks its own pool"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def run(self, func, *args):
+        """runs a hashing job in the pool, aborting with a 503 when the pool is saturated"""
+        if self.workers == 0:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            abort(
+                503,
+                message="too many authentication requests, please retry later",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        try:
+            return self._get_executor().submit(func, *args).result()
+        except BrokenProcessPool:
+            # a pool process died; replace the pool for subsequent requests
+            with self._lock:
+                self._executor = None
+            raise
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+class PasswordHasher:
+    """The flask extension used to hash and verify passwords"""
+
+    def init_app(self, app):
+        """
+        configures the hashing pool of the app with the following config:
+        PASSWORD_HASH_ROUNDS: the pbkdf2_sha256 work factor of new hashes, existing hashes are upgraded on login
+        PASSWORD_HASH_WORKERS: the number of processes in the pool, 0 hashes on the request thread (default the cores
+            divided between the `WEB_CONCURRENCY` web workers, at least 1)
+        PASSWORD_HASH_MAX_PENDING: the number of hashing jobs running or queued before requests are rejected with 503
+        PASSWORD_HASH_RETRY_AFTER: the `Retry-After` seconds sent with a 503
+        """
+        app.config.setdefault("PASSWORD_HASH_ROUNDS", pbkdf2_sha256.default_rounds)
+        app.config.setdefault("PASSWORD_HASH_WORKERS", default_workers())
+        app.config.setdefault("PASSWORD_HASH_MAX_PENDING", app.config["PASSWORD_HASH_WORKERS"] * 8)
+        app.config.setdefault("PASSWORD_HASH_RETRY_AFTER", 1)
+        app.extensions["password_hasher"] = HashingPool(
+            workers=app.config["PASSWORD_HASH_WORKERS"],
+            max_pending=max(1, app.config["PASSWORD_HASH_MAX_PENDING"]),
+            retry_after=app.config["PASSWORD_HASH_RETRY_AFTER"],
+        )
+
+    @property
+    def pool(self):
+        return current_app.extensions["password_hasher"]
+
+    def hash(self, password):
+        """:return: the hash of a password using the configured work factor"""
+        return self.pool.run(_hash_password, password, current_app.config["PASSWORD_HASH_ROUNDS"])
+
+    def verify(self, password, password_hash):
+        """
+        :return: whether the password matches the hash, and a replacement hash if the stored hash was created with a
+            different work factor to the one configured (None otherwise)
+        """
+        return self.pool.run(_verify_password, password, password_hash, current_app.config["PASSWORD_HASH_ROUNDS"])
+
+
+password_hasher = PasswordHasher()
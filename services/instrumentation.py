@@ -0,0 +1,180 @@
+"""
+Per-request SQL instrumentation. Listeners on the engine events of `db` record the number of statements a request
+executes, the time spent in the database and statements that are repeated with different parameters (the signature of
+an N+1 query). Each request is reported as
+- a `Server-Timing` header, shown by the network panel of the browser dev tools
+- a structured (json) log line on the `services.instrumentation` logger
+- an entry in the recent request history served by the `/debug/sql` endpoint
+
+Views declare the number of statements they are expected to run with `query_budget`. A view exceeding its budget is
+logged as a warning, or fails the request with `QueryBudgetExceeded` when `SQL_QUERY_BUDGET_STRICT` is set (as the
+tests do).
+"""
+
+import json
+import logging
+import re
+import time
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+
+from db import db
+
+logger = logging.getLogger(__name__)
+
+# bind parameters and literals are collapsed such that statements differing only by their values share a pattern
+_PARAMETER_LIST = re.compile(r"\(\s*(?:%\(\w+\)s|\?|:\w+)(?:\s*,\s*(?:%\(\w+\)s|\?|:\w+))*\s*\)")
+_PARAMETER = re.compile(r"%\(\w+\)s|\?|:\w+|'(?:[^']|'')*'|\b\d+\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_pattern(statement):
+    """:return: the statement with its parameters and literals replaced by `?`"""
+    pattern = _PARAMETER_LIST.sub("(?)", statement)
+    pattern = _PARAMETER.sub("?", pattern)
+    return _WHITESPACE.sub(" ", pattern).strip()
+
+
+class QueryBudgetExceeded(Exception):
+    """raised in strict mode when a view runs more statements than its declared budget"""
+
+
+@dataclass
+class RequestStats:
+    """The SQL statements executed whilst handling a request"""
+
+    method: str
+    path: str
+    endpoint: str
+    statements: int = 0
+    db_ms: float = 0.0
+    over_budget: list = field(default_factory=list)
+    patterns: Counter = field(default_factory=Counter)
+
+    def record(self, statement, duration):
+        self.statements += 1
+        self.db_ms += duration * 1000
+        self.patterns[statement_pattern(statement)] += 1
+
+    def repeated(self, threshold):
+        """:return: the statement patterns executed at least `threshold` times"""
+        return [
+            {"statement": pattern, "count": count}
+            for pattern, count in self.patterns.most_common()
+            if count >= threshold
+        ]
+
+    def summary(self, status, threshold):
+        summary = asdict(self)
+        del summary["patterns"]
+        summary["db_ms"] = round(self.db_ms, 2)
+        summary["status"] = status
+        summary["repeated"] = self.repeated(threshold)
+        return summary
+
+
+def query_budget(statements):
+    """
+    decorator declaring the maximum number of sql statements a view is expected to execute, statements run by the
+    decorators it wraps (e.g. serialising the response) count towards the budget
+    :param statements: the budget of the view
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            stats = g.get("sql_stats")
+            if stats is None:
+                return func(*args, **kwargs)
+
+            started = stats.statements
+            result = func(*args, **kwargs)
+            executed = stats.statements - started
+            if executed > statements:
+                stats.over_budget.append({"view": func.__qualname__, "statements": executed, "budget": statements})
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+class SqlInstrumentation:
+    """The flask extension instrumenting the sql statements executed by each request"""
+
+    def init_app(self, app):
+        """
+        hooks the instrumentation into the engine of `db` with the following config:
+        SQL_INSTRUMENTATION: whether statements are recorded (default True)
+        SQL_REPEATED_STATEMENT_THRESHOLD: the executions of a statement pattern reported as a possible N+1 query
+        SQL_QUERY_BUDGET_STRICT: raise `QueryBudgetExceeded` rather than log a warning when a budget is exceeded
+        SQL_DEBUG_ENDPOINT: whether the `/debug/sql` endpoint is served (default `app.debug`)
+        SQL_DEBUG_HISTORY: the number of recent requests kept for the debug endpoint
+        """
+        app.config.setdefault("SQL_INSTRUMENTATION", True)
+        app.config.setdefault("SQL_REPEATED_STATEMENT_THRESHOLD", 3)
+        app.config.setdefault("SQL_QUERY_BUDGET_STRICT", False)
+        app.config.setdefault("SQL_DEBUG_ENDPOINT", app.debug)
+        app.config.setdefault("SQL_DEBUG_HISTORY", 100)
+        if not app.config["SQL_INSTRUMENTATION"]:
+            return
+
+        app.extensions["sql_instrumentation"] = deque(maxlen=app.config["SQL_DEBUG_HISTORY"])
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    @property
+    def history(self):
+        """:return: the summaries of the most recent requests served by this worker, oldest first"""
+        return current_app.extensions["sql_instrumentation"]
+
+    @staticmethod
+    def _current_stats():
+        return g.get("sql_stats") if has_app_context() else None
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self._current_stats() is not None:
+            conn.info.setdefault("sql_started_at", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stats = self._current_stats()
+        if stats is not None and conn.info.get("sql_started_at"):
+            stats.record(statement, time.perf_counter() - conn.info["sql_started_at"].pop())
+
+    @staticmethod
+    def _start_request():
+        if request.endpoint == "static":
+            return
+
+        g.sql_stats = RequestStats(method=request.method, path=request.path, endpoint=request.endpoint)
+
+    def _finish_request(self, response):
+        stats = g.pop("sql_stats", None)
+        if stats is None:
+            return response
+
+        summary = stats.summary(response.status_code, current_app.config["SQL_REPEATED_STATEMENT_THRESHOLD"])
+        response.headers.add("Server-Timing", f'db;dur={summary["db_ms"]};desc="{stats.statements} statements"')
+        self.history.append(summary)
+        logger.info(json.dumps(summary))
+        if summary["repeated"]:
+            logger.warning("possible N+1 query in %s: %s", stats.endpoint, json.dumps(summary["repeated"]))
+
+        for view in stats.over_budget:
+            message = f"{view['view']} executed {view['statements']} sql statements, its budget is {view['budget']}"
+            if current_app.config["SQL_QUERY_BUDGET_STRICT"]:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+
+sql_instrumentation = SqlInstrumentation()
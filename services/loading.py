@@ -0,0 +1,98 @@
+from marshmallow import fields as ma_fields
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+
+class LoadStrategy:
+    """
+    Declares the relationships that the schema of an endpoint will dump, such that they are eagerly loaded alongside
+    the queried rows rather than lazily loaded one row at a time whilst serialising (the N+1 problem).
+
+    Many-to-one relationships are joined into the query; collections are loaded with one additional `SELECT ... IN`
+    per relationship. A list request therefore issues a fixed number of statements whatever the number of rows.
+    """
+
+    def __init__(self, *relationships):
+        """
+        :param relationships: the relationship attributes dumped by the schema e.g. `CourseRegisterModel.students`
+        """
+        self.relationships = relationships
+
+    @staticmethod
+    def loader(relationship):
+        """:return: the eager loader option of a relationship"""
+        return selectinload(relationship) if relationship.property.uselist else joinedload(relationship)
+
+    def options(self):
+        """:return: the loader options for the declared relationships"""
+        return [self.loader(relationship) for relationship in self.relationships]
+
+    def apply(self, query):
+        """applies the loader options to a query or select statement"""
+        return query.options(*self.options())
+
+
+def _nested_schema(field):
+    """:return: the schema nested by a `Nested` or `List(Nested)` field"""
+    if isinstance(field, ma_fields.List):
+        field = field.inner
+    return field.schema
+
+
+def _column_attributes(model, names):
+    """:return: the column attributes of the model named in `names`, other names (e.g. relationships) are ignored"""
+    columns = inspect(model).column_attrs
+    return [getattr(model, name) for name in names if name in columns]
+
+
+class Fieldset:
+    """
+    The fields of a schema requested by a client (a sparse fieldset), used to restrict both what the schema dumps and
+    which columns and relationships are loaded to dump it
+    :param schema: the marshmallow schema class of the endpoint
+    :param load_strategy: the LoadStrategy of the relationships the schema dumps
+    :param fields: the names of the (non relationship) fields to dump, None dumps every field
+    :param include: the names of the relationships to dump, None dumps every relationship of the load strategy
+    """
+
+    def __init__(self, schema, load_strategy, fields=None, include=None):
+        self.schema_class = schema
+        self.load_strategy = load_strategy
+        self.relationships = {relationship.key: relationship for relationship in load_strategy.relationships}
+        self.fields = fields
+        self.include = include if include is not None else list(self.relationships)
+        self.is_sparse = fields is not None or include is not None
+        self.schema = schema(only=self.only()) if self.is_sparse else schema()
+
+    @classmethod
+    def field_names(cls, schema, load_strategy):
+        """:return: the names of the fields and of the relationships a client may request of the schema"""
+        relationships = {relationship.key for relationship in load_strategy.relationships}
+        dump_fields = list(schema().dump_fields)
+        return (
+            [name for name in dump_fields if name not in relationships],
+            [name for name in dump_fields if name in relationships],
+        )
+
+    def only(self):
+        """:return: the `only` argument of the schema"""
+        fields = self.fields if self.fields is not None else self.field_names(self.schema_class, self.load_strategy)[0]
+        return (*fields, *self.include)
+
+    def options(self):
+        """:return: loader options loading only the requested columns and relationships (and their dumped columns)"""
+        options = []
+        for name in self.include:
+            relationship = self.relationships[name]
+            nested_fields = _nested_schema(self.schema.fields[name]).dump_fields
+            nested_columns = _column_attributes(relationship.property.mapper.class_, nested_fields)
+            options.append(self.load_strategy.loader(relationship).load_only(*nested_columns))
+        return options
+
+    def apply(self, query):
+        """applies the loader options to a query, restricting the columns of the queried model if fields were given"""
+        if self.fields is not None:
+            model = query.column_descriptions[0]["entity"]
+            # the primary key is always loaded, it identifies the row and is the key of the keyset pagination
+            query = query.options(load_only(*_column_attributes(model, ["id", *self.fields])))
+        return query.options(*self.options())
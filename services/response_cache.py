@@ -0,0 +1,57 @@
+"""
+A response cache for the GET views of the resources. The response of a decorated view is cached per view, view
+arguments and query string, and tagged with the entities it serialises; the handlers writing those entities invalidate
+their tags (see `Cache.invalidate`). Entries are stored in the backend of `services.caching.cache`, selected with
+`CACHE_BACKEND`.
+"""
+
+import inspect
+import json
+from functools import wraps
+
+from flask import current_app, request
+
+from services.caching import cache
+
+
+def cached_response(*tags, ttl=None):
+    """
+    Decorator caching the response of a view, it must decorate the view above `blp.response` such that the serialised
+    response is cached. Concurrent misses of a key are computed once (see `Cache.get_or_set`).
+    :param tags: the invalidation tags of the response, formatted with the view arguments e.g. `"student:{student_id}"`
+    :param ttl: the seconds a response is held for (defaults to `RESPONSE_CACHE_TTL`)
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not current_app.config["RESPONSE_CACHE"] or request.method != "GET":
+                return func(*args, **kwargs)
+
+            # views are also called directly with positional arguments, e.g. `Student.get(uid)` by the html routes
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            arguments.pop("self", None)
+            # the query string is part of the key, the views parse it for sparse fieldsets
+            key = "response:{}:{}:{}".format(
+                func.__qualname__,
+                json.dumps(arguments, sort_keys=True, default=str),
+                json.dumps(sorted(request.args.items(multi=True))),
+            )
+
+            def compute():
+                response = current_app.make_response(func(*args, **kwargs))
+                return response.get_data(), response.status_code, list(response.headers.items())
+
+            body, status, headers = cache.get_or_set(
+                key,
+                compute,
+                ttl=ttl if ttl is not None else current_app.config["RESPONSE_CACHE_TTL"],
+                tags=[tag.format(**arguments) for tag in tags],
+            )
+            return current_app.response_class(body, status=status, headers=headers)
+
+        return wrapper
+
+    return decorator
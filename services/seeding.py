@@ -0,0 +1,150 @@
+"""
+Synthetic data at production scale, used to reproduce load locally (see `flask seed` and `benchmarks.load`). Rows are
+inserted in batches with executemany rather than through the ORM unit of work, and every seeded user shares one
+password hash; hashing a password per user would dominate the time taken to seed.
+"""
+
+import random
+from dataclasses import dataclass
+
+from sqlalchemy import insert
+
+from db import db
+from models import CourseModel, CourseRegisterModel, StudentModel, StudentRegister, TutorModel, TutorRegister
+from services.hashing import password_hasher
+
+FIRST_NAMES = [
+    "Oliver", "Amelia", "George", "Isla", "Harry", "Ava", "Noah", "Mia", "Jack", "Ivy", "Leo", "Lily", "Arthur",
+    "Freya", "Muhammad", "Florence", "Oscar", "Willow", "Charlie", "Grace", "Jacob", "Sophia", "Thomas", "Ella",
+    "Henry", "Rosie", "William", "Evie", "Alfie", "Poppy", "Priya", "Chen", "Tomasz", "Aisha", "Kwame", "Sofia",
+]  # fmt: skip
+LAST_NAMES = [
+    "Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Johnson", "Davies", "Patel", "Robinson", "Wright",
+    "Thompson", "Evans", "Walker", "White", "Roberts", "Green", "Hall", "Wood", "Jackson", "Clarke", "Khan", "Singh",
+    "Nowak", "Okafor", "Li", "Murphy", "Hughes", "Edwards", "Phillips",
+]  # fmt: skip
+SUBJECTS = {
+    "11+ exam": ["Verbal Reasoning", "Non-Verbal Reasoning", "English", "Maths"],
+    "GCSE": ["Maths", "English Language", "English Literature", "Biology", "Chemistry", "Physics", "French", "History"],
+    "A level": ["Maths", "Further Maths", "Economics", "Chemistry", "Physics", "Computer Science"],
+}
+TEST_PROVIDERS = ["GL Assessment", "CEM", "ISEB", "AQA", "Edexcel", "OCR"]
+TERMS = ["Autumn", "Spring", "Summer"]
+
+
+@dataclass
+class SeedCounts:
+    """The number of rows inserted into each table"""
+
+    students: int = 0
+    tutors: int = 0
+    courses: int = 0
+    registers: int = 0
+    student_enrolments: int = 0
+    tutor_enrolments: int = 0
+
+
+def _insert(model, rows, batch_size):
+    """:return: the ids of the inserted rows"""
+    ids = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start : start + batch_size]
+        ids.extend(db.session.scalars(insert(model).returning(model.id), batch))
+    return ids
+
+
+def _people(rng, count, prefix, role, password_hash):
+    people = []
+    for i in range(count):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        username = f"{prefix}-{role}-{i}"
+        people.append(
+            {
+                "name": f"{first_name} {last_name}",
+                "email": f"{username}@example.com",
+                "age": rng.randint(9, 17) if role == "student" else rng.randint(21, 70),
+                "summary": f"{first_name} is a {role} seeded for load testing",
+                "username": username,
+                "password": password_hash,
+            }
+        )
+    return people
+
+
+def seed(
+    students,
+    tutors,
+    registers,
+    courses=None,
+    enrolments=3,
+    tutors_per_register=2,
+    prefix="seed",
+    password="password",
+    random_seed=None,
+    batch_size=1000,
+):
+    """
+    bulk inserts related synthetic data into the database bound to `db` (must be called within an app context)
+    :param students: the number of students, with usernames `<prefix>-student-<n>`
+    :param tutors: the number of tutors, with usernames `<prefix>-tutor-<n>`
+    :param registers: the number of course registers, spread across the courses
+    :param courses: the number of courses, defaults to one for every 10 registers
+    :param enrolments: the number of registers each student is enrolled on
+    :param tutors_per_register: the number of tutors teaching each register
+    :param prefix: distinguishes the usernames, emails and course names of separate seeding runs
+    :param password: the password of every seeded user
+    :param random_seed: seeds the random generator such that runs are reproducible
+    :return: a SeedCounts instance
+    """
+    rng = random.Random(random_seed)
+    courses = courses if courses is not None else max(1, registers // 10)
+    if registers and not courses:
+        raise ValueError("registers must belong to a course")
+
+    password_hash = password_hasher.hash(password)
+    student_ids = _insert(StudentModel, _people(rng, students, prefix, "student", password_hash), batch_size)
+    tutor_ids = _insert(TutorModel, _people(rng, tutors, prefix, "tutor", password_hash), batch_size)
+
+    course_rows = []
+    for i in range(courses):
+        subject_type = rng.choice(list(SUBJECTS))
+        course_rows.append(
+            {
+                "name": f"{prefix} {rng.choice(SUBJECTS[subject_type])} {i}",
+                "subject_type": subject_type,
+                "test_providers": rng.choice(TEST_PROVIDERS),
+                "summary": f"{subject_type} preparation",
+            }
+        )
+    course_ids = _insert(CourseModel, course_rows, batch_size)
+
+    register_rows = [
+        {"name": f"{rng.choice(TERMS)} {2020 + i % 7} group {i}", "course_id": rng.choice(course_ids)}
+        for i in range(registers)
+    ]
+    register_ids = _insert(CourseRegisterModel, register_rows, batch_size)
+
+    student_enrolments = []
+    if register_ids:
+        for student_id in student_ids:
+            for register_id in rng.sample(register_ids, min(enrolments, len(register_ids))):
+                student_enrolments.append({"student_id": student_id, "course_register_id": register_id})
+
+    tutor_enrolments = []
+    if tutor_ids:
+        for register_id in register_ids:
+            for tutor_id in rng.sample(tutor_ids, min(tutors_per_register, len(tutor_ids))):
+                tutor_enrolments.append({"tutor_id": tutor_id, "course_register_id": register_id})
+
+    _insert(StudentRegister, student_enrolments, batch_size)
+    _insert(TutorRegister, tutor_enrolments, batch_size)
+    db.session.commit()
+
+    return SeedCounts(
+        students=len(student_ids),
+        tutors=len(tutor_ids),
+        courses=len(course_ids),
+        registers=len(register_ids),
+        student_enrolments=len(student_enrolments),
+        tutor_enrolments=len(tutor_enrolments),
+    )
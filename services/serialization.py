@@ -0,0 +1,145 @@
+"""
+Compiled serializers for the hot collection endpoints. Marshmallow's `Schema.dump` resolves the accessor, the default
+and the `_serialize` of every field for every row; `compile_schema` resolves them once, when the views are declared,
+into a plan of `(attribute, key, default, convert)` per field and dumps a row by walking that plan. The schemas in
+`schemas.py` stay the source of truth: a schema using anything the compiler does not reproduce exactly (dump hooks, a
+custom accessor or a field type not listed in `_converter`) is dumped by marshmallow itself.
+
+`FastJSONProvider` encodes the responses of the blueprints using compiled serializers with orjson. Its output is the
+same as the default provider's; a document orjson would encode differently (non-ascii text, keys that are not strings,
+or indented output in debug mode) is encoded by the default provider instead. The exception is the exponent notation of
+very large and very small floats, which none of the schemas dump.
+"""
+
+import orjson
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import Schema, fields, missing
+from marshmallow.utils import ensure_text_type
+
+# datetimes and dataclasses are passed to the `default` of flask, which formats them differently to orjson
+_ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_SORT_KEYS
+_COMPACT_SEPARATORS = {"separators": (",", ":")}
+
+
+def _get_item_or_attribute(obj, key, default):
+    """the accessor of marshmallow (`marshmallow.utils.get_value`) for a key without dots"""
+    try:
+        return obj[key]
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return getattr(obj, key, default)
+
+
+def _string(value):
+    if value is None or type(value) is str:
+        return value
+    return ensure_text_type(value)
+
+
+def _raw(value):
+    return value
+
+
+def _converter(field):
+    """:return: a function formatting a value as `field._serialize` does, None if the field is not compiled"""
+    field_class = type(field)
+    if field_class._serialize is fields.Field._serialize:
+        return _raw
+
+    if field_class._serialize is fields.String._serialize:
+        return _string
+
+    if (
+        field_class._serialize is fields.Number._serialize
+        and field_class._format_num is fields.Number._format_num
+        and not field.as_string
+    ):
+        num_type = field.num_type
+        return lambda value: None if value is None else num_type(value)
+
+    if field_class._serialize is fields.Nested._serialize:
+        dump = compile_schema(field.schema)
+        many = field.schema.many or field.many
+        return lambda value: None if value is None else dump(value, many=many)
+
+    if field_class._serialize is fields.List._serialize:
+        inner = _converter(field.inner)
+        if inner is None:
+            return None
+        return lambda value: None if value is None else [inner(each) for each in value]
+
+    return None
+
+
+def compile_schema(schema):
+    """
+    Compiles the dump of a schema instance.
+    :param schema: a marshmallow schema instance, its `only`, `exclude` and `many` are compiled in
+    :return: a function with the signature and output of `schema.dump`
+    """
+    has_hooks = schema._has_processors("pre_dump") or schema._has_processors("post_dump")
+    if has_hooks or type(schema).get_attribute is not Schema.get_attribute:
+        return schema.dump
+
+    plan = []
+    for name, field in schema.dump_fields.items():
+        attribute = field.attribute or name
+        convert = _converter(field)
+        if convert is None or type(field).get_value is not fields.Field.get_value or "." in attribute:
+            return schema.dump
+        key = field.data_key if field.data_key is not None else name
+        plan.append((attribute, key, field.dump_default, convert))
+
+    dict_class = schema.dict_class
+    schema_many = schema.many
+
+    def dump_one(obj):
+        # models are read by attribute, dicts (e.g. the catalog) by key
+        get = _get_item_or_attribute if hasattr(obj, "__getitem__") else getattr
+        result = dict_class()
+        for attribute, key, default, convert in plan:
+            value = get(obj, attribute, missing)
+            if value is missing:
+                value = default() if callable(default) else default
+                if value is missing:
+                    continue
+            result[key] = convert(value)
+        return result
+
+    def dump(obj, *, many=None):
+        many = schema_many if many is None else bool(many)
+        if many and obj is not None:
+            return [dump_one(item) for item in obj]
+        return dump_one(obj)
+
+    return dump
+
+
+class CompiledSchema:
+    """A schema instance paired with its compiled dump, it is passed to `blp.response` in place of the schema"""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.many = schema.many
+        self.dump = compile_schema(schema)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """The default JSON provider of flask, encoding with orjson for the blueprints using compiled serializers"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs != _COMPACT_SEPARATORS or not self.sort_keys or not self._compiled_blueprint():
+            return super().dumps(obj, **kwargs)
+
+        try:
+            encoded = orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. keys that are not strings, which the json module converts
+            return super().dumps(obj, **kwargs)
+        if self.ensure_ascii and not encoded.isascii():
+            return super().dumps(obj, **kwargs)
+        return encoded.decode()
+
+    def _compiled_blueprint(self):
+        blueprint = self._app.blueprints.get(request.blueprint) if request else None
+        return getattr(blueprint, "compiled_serializers", False)
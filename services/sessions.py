@@ -0,0 +1,100 @@
+"""
+Silent refresh of the access token of a cookie session. An access token is replaced once it enters the final
+`JWT_REFRESH_WINDOW` of its lifetime; each access token is refreshed at most once, across every worker, by atomically
+claiming its JTI in a table shared by the workers (the same backends used by the blocklist). The new token expires a
+full `JWT_ACCESS_TOKEN_EXPIRES` later, so a session is refreshed at most once per window however many requests it
+makes.
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+from flask import current_app, request
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_request_location, set_access_cookies
+
+from blocklist import create_token_set, init_token_set_config
+from models import RefreshedTokenModel
+
+
+class RefreshClaims:
+    """
+    The access tokens that have already been refreshed
+    :param token_set: the TokenSet shared between workers
+    :param purge_seconds: how often the claims of expired tokens are purged
+    """
+
+    def __init__(self, token_set, purge_seconds=3600):
+        self.token_set = token_set
+        self.purge_seconds = purge_seconds
+        self._lock = threading.Lock()
+        self._purged_at = time.monotonic()
+
+    def claim(self, jti, expires_at):
+        """:return: True if this is the first claim to refresh the token by any worker"""
+        with self._lock:
+            if time.monotonic() - self._purged_at >= self.purge_seconds:
+                self.token_set.purge_expired()
+                self._purged_at = time.monotonic()
+
+        return self.token_set.add(jti, expires_at)
+
+
+class SessionRefresher:
+    """The flask extension silently refreshing the access token cookie of a session before it expires"""
+
+    def init_app(self, app):
+        """
+        registers the refresh with the app, configured with the following config:
+        JWT_REFRESH_WINDOW: the timedelta before expiry within which an access token is refreshed
+        JWT_REVOCATION_BACKEND and JWT_REVOCATION_FILE: the backend shared between workers, as used by the blocklist
+        """
+        init_token_set_config(app)
+        app.config.setdefault("JWT_REFRESH_WINDOW", timedelta(minutes=15))
+        app.extensions["session_refresher"] = RefreshClaims(
+            create_token_set(app, RefreshedTokenModel, table="refreshed_tokens")
+        )
+        app.after_request(self.refresh_expiring_jwt)
+
+    @property
+    def claims(self):
+        return current_app.extensions["session_refresher"]
+
+    @staticmethod
+    def _sets_access_cookie(response):
+        """:return: True if the response already sets (or unsets) the access cookie e.g. on login and logout"""
+        cookie_name = current_app.config["JWT_ACCESS_COOKIE_NAME"]
+        return any(cookie.startswith(f"{cookie_name}=") for cookie in response.headers.getlist("Set-Cookie"))
+
+    def refresh_expiring_jwt(self, response):
+        """sets a new access token cookie on the response if the access token of the request is about to expire"""
+        if request.endpoint == "static" or current_app.config["JWT_ACCESS_COOKIE_NAME"] not in request.cookies:
+            return response
+
+        try:
+            jwt_payload = get_jwt()
+        except RuntimeError:
+            # the endpoint did not verify a jwt
+            return response
+
+        if not jwt_payload or jwt_payload["type"] != "access" or get_jwt_request_location() != "cookies":
+            return response
+
+        refresh_window = current_app.config["JWT_REFRESH_WINDOW"].total_seconds()
+        if jwt_payload["exp"] - time.time() > refresh_window or self._sets_access_cookie(response):
+            return response
+
+        if not self.claims.claim(jwt_payload["jti"], jwt_payload["exp"]):
+            # another request (possibly on another worker) has already refreshed this token
+            return response
+
+        access_token = create_access_token(
+            identity=jwt_payload["sub"],
+            fresh=False,
+            additional_claims={"user_type": jwt_payload.get("user_type")},
+        )
+        set_access_cookies(response, access_token)
+        return response
+
+
+session_refresher = SessionRefresher()
@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+
+from db import db
+from models import CourseModel, CourseRegisterModel, StudentModel, TutorModel
+
+
+@dataclass
+class HomepageStats:
+    """The headline numbers displayed on the homepage"""
+
+    students: int
+    tutors: int
+    courses: int
+    events: int
+
+
+def _count(model):
+    """builds a `SELECT COUNT(*)` scalar subquery for the table backing `model`"""
+    return select(func.count()).select_from(model).scalar_subquery()
+
+
+def get_homepage_stats():
+    """
+    Counts the rows of the four tables shown on the homepage. The counts are gathered as scalar subqueries of a single
+    SELECT such that the database is only hit once and no rows are loaded or serialised.
+    :return: a HomepageStats instance
+    """
+    row = db.session.execute(
+        select(
+            _count(StudentModel).label("students"),
+            _count(TutorModel).label("tutors"),
+            _count(CourseModel).label("courses"),
+            _count(CourseRegisterModel).label("events"),
+        )
+    ).one()
+    return HomepageStats(students=row.students, tutors=row.tutors, courses=row.courses, events=row.events)
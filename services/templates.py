@@ -0,0 +1,72 @@
+"""
+A persistent bytecode cache of the jinja templates. Jinja compiles a template to python bytecode the first time each
+worker renders it; with the bytecode cache the compiled templates are written to `TEMPLATE_CACHE_DIR` and loaded by
+every later worker, so `flask templates compile` precompiles every template once at build time and a new worker renders
+its first page as fast as its hundredth. A cached template is recompiled when its source changes.
+
+With `TEMPLATE_PRECOMPILED_ONLY` a worker refuses to compile templates at runtime, such that a deploy missing the
+precompiled templates (or with templates changed since they were compiled) fails loudly rather than slowly.
+"""
+
+import os
+
+from jinja2 import FileSystemBytecodeCache
+
+
+class TemplateNotPrecompiled(Exception):
+    """raised with `TEMPLATE_PRECOMPILED_ONLY` when a template is rendered that was not precompiled"""
+
+
+class PrecompiledBytecodeCache(FileSystemBytecodeCache):
+    """
+    A jinja bytecode cache stored in a directory, optionally refusing to compile templates missing from it
+    :param directory: the directory the compiled templates are stored in
+    :param precompiled_only: whether a template missing from the cache raises TemplateNotPrecompiled
+    """
+
+    def __init__(self, directory, precompiled_only=False):
+        super().__init__(directory)
+        self.precompiled_only = precompiled_only
+
+    def get_bucket(self, environment, name, filename, source):
+        bucket = super().get_bucket(environment, name, filename, source)
+        if bucket.code is None and self.precompiled_only:
+            raise TemplateNotPrecompiled(f"the template {name} is not precompiled, run `flask templates compile`")
+        return bucket
+
+
+class TemplateCache:
+    """The flask extension caching the compiled templates of the app"""
+
+    def init_app(self, app):
+        """
+        sets the bytecode cache of the jinja environment, configured with the following config:
+        TEMPLATE_CACHE_DIR: the directory of the compiled templates (default `<instance path>/jinja_cache`)
+        TEMPLATE_PRECOMPILED_ONLY: whether templates are only rendered if precompiled (default the environment variable
+            of the same name is `1`, set in the docker image)
+        """
+        app.config.setdefault("TEMPLATE_CACHE_DIR", os.path.join(app.instance_path, "jinja_cache"))
+        app.config.setdefault("TEMPLATE_PRECOMPILED_ONLY", os.getenv("TEMPLATE_PRECOMPILED_ONLY") == "1")
+        os.makedirs(app.config["TEMPLATE_CACHE_DIR"], exist_ok=True)
+        app.jinja_env.bytecode_cache = PrecompiledBytecodeCache(
+            app.config["TEMPLATE_CACHE_DIR"], precompiled_only=app.config["TEMPLATE_PRECOMPILED_ONLY"]
+        )
+
+    @staticmethod
+    def compile(app):
+        """
+        compiles every template of the app into the bytecode cache
+        :return: the names of the templates compiled
+        """
+        cache = app.jinja_env.bytecode_cache
+        precompiled_only, cache.precompiled_only = cache.precompiled_only, False
+        try:
+            names = app.jinja_env.list_templates()
+            for name in names:
+                app.jinja_env.get_template(name)
+        finally:
+            cache.precompiled_only = precompiled_only
+        return names
+
+
+template_cache = TemplateCache()
@@ -0,0 +1,41 @@
+"""
+The upserts of the PUT handlers. An existing row is updated by a single `UPDATE ... RETURNING`. A missing row takes
+two statements: the `UPDATE` matching no row, then an `INSERT ... ON CONFLICT DO UPDATE ... RETURNING`, such that two
+PUTs creating the same id do not race (the second updates the row created by the first). Each statement bumps the
+versions of the table (see `services.versions`). The returned columns are dumped by the plain response schema as they
+are, rather than reloading the row, which a commit would otherwise expire; the relationships are not returned.
+
+An `INSERT ... ON CONFLICT` alone is not enough for partial updates; the proposed row is checked against the not null
+constraints of the table before the conflict is detected.
+"""
+
+from sqlalchemy import func, update
+
+from db import conflict_insert, db
+
+
+def upsert(model, entity_id, data):
+    """
+    Updates the row of `model` with the primary key `entity_id` with `data`, creating it if it does not exist. The
+    statements are executed in the current transaction, the caller commits.
+    :param model: the model of the table, e.g. `StudentModel`
+    :param entity_id: the id of the row
+    :param data: the validated payload of the update schema of the model
+    :return: a tuple of the columns of the row (as a dict) and whether it was created
+    """
+    columns = [getattr(model, attribute.key) for attribute in model.__mapper__.column_attrs]
+    # an empty payload still touches the row, as any other PUT
+    values = data or {"updated_at": func.now()}
+
+    row = db.session.execute(update(model).where(model.id == entity_id).values(values).returning(*columns)).first()
+    if row is not None:
+        return row._asdict(), False
+
+    row = db.session.execute(
+        conflict_insert(model)
+        .values(id=entity_id, **data)
+        # the `onupdate` of `updated_at` is not applied to the `SET` of a conflict
+        .on_conflict_do_update(index_elements=[model.id], set_={**values, "updated_at": func.now()})
+        .returning(*columns)
+    ).one()
+    return row._asdict(), True
@@ -0,0 +1,49 @@
+"""
+The validators of the conditional GETs of the collection endpoints. Each table has a version bumped in the same
+transaction as every insert, update and delete of its rows (see `services.versions`), so the versions of the tables a
+collection is read from change with every write to it, however close together the writes are. They are read by
+primary key from the `CacheVersions` table, which is far cheaper than loading and serialising the collection.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+
+from db import db
+from models import CacheVersionModel
+from services.versions import table_key
+
+
+@dataclass(frozen=True)
+class TableValidator:
+    """The version of a table and the time it was last written, 0 and None for a table that was never written"""
+
+    table: str
+    version: int
+    updated_at: Optional[datetime]
+
+
+def get_validators(*models):
+    """
+    Reads the validators of the tables backing `models` with a single SELECT
+    :return: a TableValidator per model, in the order of `models`
+    """
+    keys = [table_key(model) for model in models]
+    rows = {
+        row.key: row
+        for row in db.session.execute(
+            select(CacheVersionModel.key, CacheVersionModel.version, CacheVersionModel.updated_at).where(
+                CacheVersionModel.key.in_(keys)
+            )
+        )
+    }
+    return [
+        TableValidator(
+            table=model.__tablename__,
+            version=rows[key].version if key in rows else 0,
+            updated_at=rows[key].updated_at if key in rows else None,
+        )
+        for model, key in zip(models, keys)
+    ]
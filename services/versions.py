@@ -0,0 +1,131 @@
+"""
+Data versions for cache invalidation. Each version is a counter in the `CacheVersions` table, shared by every worker,
+that is bumped once a write to the models it covers is committed; a cache entry keyed on the version it was built from
+is not served after the data changes. Writes are detected by session hooks, covering both the ORM unit of work
+(`db.session.add`/`delete` and relationship changes) and bulk `insert`/`update`/`delete` statements, so write handlers
+do not need to bump versions themselves.
+
+The keys written by a transaction are collected in the session and bumped together, in sorted order, by a short
+transaction of their own after the commit, rather than by the write transaction. A version row is then only locked for
+the bump, so write transactions sharing a key (every write bumps `DATA`) neither wait on each other until they commit
+nor deadlock by locking the keys in a different order. A reader between the commit and the bump may still be served
+the entry of the previous version; an entry built from the new rows under the previous version is stale once bumped.
+
+Besides the shared keys below, each table has a version of its own (see `table_key`) validating the conditional GETs
+of the collections read from it (see `services.validators`).
+"""
+
+from sqlalchemy import event, func, inspect, select
+
+from db import conflict_insert, db
+from models import (
+    CacheVersionModel,
+    CourseModel,
+    CourseRegisterModel,
+    StudentModel,
+    StudentRegister,
+    TutorModel,
+    TutorRegister,
+)
+
+# the students, tutors, courses and course registers shown by the pages
+DATA = "data"
+# the courses and their registers held by the catalog cache (see `services.catalog`)
+CATALOG = "catalog"
+
+
+def table_key(model):
+    """:return: the version key of the table backing `model`, bumped by every write to the table"""
+    return f"table:{model.__tablename__}"
+
+
+# the version keys bumped by a write to each model
+VERSION_KEYS = {
+    model: keys | {table_key(model)}
+    for model, keys in {
+        StudentModel: {DATA},
+        TutorModel: {DATA},
+        CourseModel: {DATA, CATALOG},
+        CourseRegisterModel: {DATA, CATALOG},
+        StudentRegister: {DATA},
+        TutorRegister: {DATA},
+    }.items()
+}
+
+
+# the columns that are never serialised, e.g. the password rehashed on login, a write only to them leaves every version
+UNVERSIONED_ATTRIBUTES = {"password"}
+
+
+def get_version(key):
+    """:return: the current version of a key, 0 if it has never been bumped"""
+    return db.session.scalar(select(CacheVersionModel.version).where(CacheVersionModel.key == key)) or 0
+
+
+def bump_statement(keys):
+    """:return: the statement incrementing the version of each key"""
+    table = CacheVersionModel.__table__
+    return (
+        conflict_insert(table)
+        .values([{"key": key, "version": 1, "updated_at": func.now()} for key in sorted(keys)])
+        .on_conflict_do_update(index_elements=["key"], set_={"version": table.c.version + 1, "updated_at": func.now()})
+    )
+
+
+def bump(*keys):
+    """increments the version of each key once the current transaction is committed"""
+    _pending(db.session).update(keys)
+
+
+def _pending(session):
+    """:return: the keys to bump when the transaction of the session is committed"""
+    return session.info.setdefault("version_keys", set())
+
+
+def _keys_of(instances):
+    keys = set()
+    for instance in instances:
+        keys |= VERSION_KEYS.get(type(instance), set())
+    return keys
+
+
+def _versioned(instances):
+    """:return: the modified instances with a change to an attribute outside `UNVERSIONED_ATTRIBUTES`"""
+    return [
+        instance
+        for instance in instances
+        if any(
+            attribute.history.has_changes()
+            for attribute in inspect(instance).attrs
+            if attribute.key not in UNVERSIONED_ATTRIBUTES
+        )
+    ]
+
+
+@event.listens_for(db.session, "after_flush")
+def _bump_flushed(session, flush_context):
+    _pending(session).update(_keys_of(session.new) | _keys_of(_versioned(session.dirty)) | _keys_of(session.deleted))
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _bump_executed(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        _pending(orm_execute_state.session).update(VERSION_KEYS.get(mapper.class_, set()))
+
+
+@event.listens_for(db.session, "after_commit")
+def _bump_committed(session):
+    keys = session.info.pop("version_keys", None)
+    if keys:
+        # the session can not execute statements once committed, the bump is a transaction of its own
+        with session.get_bind().begin() as connection:
+            connection.execute(bump_statement(keys))
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("version_keys", None)
@@ -7,10 +7,11 @@ from flask_jwt_extended import create_access_token
 from app import create_app
 from db import db
 from models import CourseModel, CourseRegisterModel, StudentModel, TutorModel
+from services import cache
 
 
 @pytest.fixture(scope="function")
-def app():
+def app(tmp_path_factory):
     """
     This is a fixture implemented in conftest to setup a fake postgres database for testing purposes
     It is generally good practice to set up fake databases for testing pipelines that have sufficient setup/teardown
@@ -29,9 +30,14 @@ def app():
     app.config.update(
         {
             "TESTING": True,
+            "SQL_QUERY_BUDGET_STRICT": True,
         }
     )
 
+    # each test starts with an empty cache
+    app.config["CACHE_FILE"] = str(tmp_path_factory.mktemp("cache") / "cache.db")
+    cache.init_app(app)
+
     with app.app_context():
         db.create_all()
 
@@ -51,6 +57,22 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture(scope="function")
+def statement_counter(app):
+    """A fixture used to record the sql statements executed against the testing database whilst in scope"""
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+
+    db.event.listen(engine, "before_cursor_execute", record_statement)
+    yield statements
+    db.event.remove(engine, "before_cursor_execute", record_statement)
+
+
 @pytest.fixture(scope="function")
 def admin_authed_header(app):
     """A fixture used to generate an admin authed header for accessing jwt enabled endpoints as the admin user"""
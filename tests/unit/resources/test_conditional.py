@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import update
+from werkzeug.http import http_date
+
+from db import db
+from models import TutorModel
+
+
+@pytest.mark.parametrize(
+    "path", ["/students", "/tutors", "/courses", "/course_registers", "/courses/1/course_registers"]
+)
+def test_not_modified_without_serialising(populate_db_with_stub_data, client, statement_counter, path):
+    """This test checks that a revalidated collection is answered 304 after the single validator query"""
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.last_modified is not None
+
+    statement_counter.clear()
+    revalidated = client.get(path, headers={"If-None-Match": response.headers["ETag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert revalidated.headers["ETag"] == response.headers["ETag"]
+    assert len(statement_counter) == 1
+
+
+def test_writes_change_etag(populate_db_with_stub_data, app, client):
+    """This test checks that inserting, updating, deleting and linking rows modifies the collections read from them"""
+    etag = client.get("/tutors").headers["ETag"]
+
+    client.put("/tutors/1", json={"summary": "updated"})
+    assert client.get("/tutors", headers={"If-None-Match": etag}).status_code == 200
+    etag = client.get("/tutors").headers["ETag"]
+
+    client.post("/tutors/1/course_registers/1")
+    assert client.get("/tutors", headers={"If-None-Match": etag}).status_code == 200
+    etag = client.get("/tutors").headers["ETag"]
+
+    with app.app_context():
+        db.session.add(TutorModel(id=2, name="jane", email="jane@example.com", age=30, username="jane", password="pw"))
+        db.session.commit()
+    assert client.get("/tutors", headers={"If-None-Match": etag}).status_code == 200
+    etag = client.get("/tutors").headers["ETag"]
+
+    with app.app_context():
+        db.session.delete(db.session.get(TutorModel, 2))
+        db.session.commit()
+    assert client.get("/tutors", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_write_not_moving_updated_at_changes_etag(populate_db_with_stub_data, app, client):
+    """
+    This test checks that a write leaving the row counts and latest `updated_at` of a table as they were, e.g. by a
+    transaction that started before the latest write, still modifies the collection
+    """
+    etag = client.get("/tutors").headers["ETag"]
+    with app.app_context():
+        db.session.execute(update(TutorModel).values(name="jane", updated_at=TutorModel.updated_at))
+        db.session.commit()
+
+    assert client.get("/tutors", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_etag_varies_with_query(populate_db_with_stub_data, client):
+    """This test checks that each page and fieldset of a collection is validated separately"""
+    etag = client.get("/students").headers["ETag"]
+    assert client.get("/students", query_string={"limit": 1}).headers["ETag"] != etag
+    assert client.get("/students", query_string={"fields": "name"}, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_modified_since(populate_db_with_stub_data, client):
+    """This test checks that `If-Modified-Since` is answered from the latest write to the collection"""
+    last_modified = client.get("/courses").last_modified
+
+    assert client.get("/courses", headers={"If-Modified-Since": http_date(last_modified)}).status_code == 304
+    earlier = http_date(last_modified - timedelta(seconds=1))
+    assert client.get("/courses", headers={"If-Modified-Since": earlier}).status_code == 200
+
+
+def test_conditional_get_documented(client):
+    """This test checks that the conditional collections document the `If-None-Match` header and the 304 response"""
+    operation = client.get("/openapi.json").json["paths"]["/students"]["get"]
+    assert "304" in operation["responses"]
+    assert {"$ref": "#/components/parameters/IF_NONE_MATCH"} in operation["parameters"]
@@ -2,6 +2,9 @@ from collections import namedtuple
 
 import pytest
 
+from db import db
+from models import CourseModel, CourseRegisterModel, StudentModel, TutorModel
+
 StubData = namedtuple("StubData", "course register student tutor")
 
 
@@ -82,17 +85,12 @@ def test_roundtrip_subscribe_unsubscribe_student(populate_db_with_stub_data, cli
 
 def test_roundtrip_subscribe_unsubscribe_tutor_bug(populate_db_with_stub_data, client):
     """
-    This test roundrips a tutor. There is one inconsistency and one error in this test:
+    This test roundrips a tutor. There is one inconsistency in this test:
     Inconsistency
     1. The get method raises 401 instead of returning an empty list of registers from the query.
-    error:
-    1. A typo in the unsubscribe method (delete request) queries the `StudentModel` as opposed to the
-       `TutorModel`. This causes an empty list to be returned and thus the tutor.registers.remove(course_register)
-       operation raises a ValueError
 
     Actions:
     look to standardise the api; choose beteween raising an error and returning an empty list
-    fix the `delete` endpoint to query the right model
     """
     tutor_id = populate_db_with_stub_data.tutor["id"]
     course_register_id = populate_db_with_stub_data.register["id"]
@@ -105,8 +103,12 @@ def test_roundtrip_subscribe_unsubscribe_tutor_bug(populate_db_with_stub_data, c
     populated_response = client.get(f"tutors/{tutor_id}/course_registers")
     assert len(populated_response.json) == 1
     assert populated_response.json[0]["id"] == course_register_id
-    with pytest.raises(ValueError):
-        client.delete(f"tutors/{tutor_id}/course_registers/{course_register_id}")
+    delete_response = client.delete(f"tutors/{tutor_id}/course_registers/{course_register_id}")
+    assert delete_response.status_code == 200
+    assert delete_response.json["tutor"]["id"] == tutor_id
+
+    empty_response_after_delete = client.get(f"tutors/{tutor_id}/course_registers")
+    assert empty_response_after_delete.status_code == 401
 
 
 @pytest.mark.parametrize(
@@ -242,3 +244,131 @@ def test_delete_course_failed_with_tutor_bug(populate_db_with_stub_data, client,
 
     course_registers_response = client.get(f"/course_registers/{course_register_id}")
     assert course_registers_response.status_code == 404
+
+
+def _add_registers_with_students_and_tutors(app, course_id, first_id, count):
+    """Adds `count` course registers to a course, each with a newly enrolled student and tutor"""
+    with app.app_context():
+        for entity_id in range(first_id, first_id + count):
+            user_data = {"name": "john Phillips", "age": 11, "password": "password"}
+            student = StudentModel(id=entity_id, email=f"s{entity_id}@gmail.com", username=f"s{entity_id}", **user_data)
+            tutor = TutorModel(id=entity_id, email=f"t{entity_id}@gmail.com", username=f"t{entity_id}", **user_data)
+            register = CourseRegisterModel(id=entity_id, name=f"register {entity_id}", course_id=course_id)
+            register.students.append(student)
+            register.tutors.append(tutor)
+            db.session.add(register)
+        db.session.commit()
+
+
+@pytest.mark.parametrize("endpoint", ["/course_registers", "/courses", "/students", "/tutors"])
+def test_list_statement_count_independent_of_rows(endpoint, app, client, statement_counter):
+    """
+    This test checks that serialising a list of entities (including the relationships nested by their schemas) takes
+    a fixed number of sql statements whatever the number of rows; i.e. there are no lazy loads per row (N+1 queries)
+    """
+    with app.app_context():
+        db.session.add(CourseModel(id=1, name="English", subject_type="11+ exam"))
+        db.session.commit()
+
+    _add_registers_with_students_and_tutors(app, course_id=1, first_id=1, count=2)
+    statement_counter.clear()
+    assert len(client.get(endpoint).json) in (1, 2)
+    statements_with_few_rows = len(statement_counter)
+
+    _add_registers_with_students_and_tutors(app, course_id=1, first_id=3, count=8)
+    statement_counter.clear()
+    assert len(client.get(endpoint).json) in (1, 10)
+    assert len(statement_counter) == statements_with_few_rows
+
+
+def test_bulk_enrol_and_unenrol(populate_db_with_stub_data, client):
+    """This test checks that students and tutors are enrolled and removed in bulk, reporting the outcome of each id"""
+    payload = {"students": [1, 99, 1], "tutors": [1]}
+    enrol_response = client.post("/course_registers/1/enrolments", json=payload)
+    assert enrol_response.status_code == 200
+    assert enrol_response.json["students"] == [{"id": 1, "outcome": "enrolled"}, {"id": 99, "outcome": "not_found"}]
+    assert enrol_response.json["tutors"] == [{"id": 1, "outcome": "enrolled"}]
+
+    course_register = client.get("/course_registers/1").json
+    assert [student["id"] for student in course_register["students"]] == [1]
+    assert [tutor["id"] for tutor in course_register["tutors"]] == [1]
+
+    repeat_response = client.post("/course_registers/1/enrolments", json={"students": [1]})
+    assert repeat_response.json["students"] == [{"id": 1, "outcome": "already_enrolled"}]
+    assert repeat_response.json["tutors"] == []
+
+    unenrol_response = client.delete("/course_registers/1/enrolments", json={"students": [1], "tutors": [1, 99]})
+    assert unenrol_response.json["students"] == [{"id": 1, "outcome": "unenrolled"}]
+    assert unenrol_response.json["tutors"] == [{"id": 1, "outcome": "unenrolled"}, {"id": 99, "outcome": "not_found"}]
+    assert client.get("/course_registers/1").json["students"] == []
+
+    repeat_response = client.delete("/course_registers/1/enrolments", json={"students": [1]})
+    assert repeat_response.json["students"] == [{"id": 1, "outcome": "not_enrolled"}]
+
+
+def test_bulk_enrol_unknown_register(client):
+    """This test checks that enrolling on a course register that does not exist is rejected"""
+    assert client.post("/course_registers/1/enrolments", json={"students": [1]}).status_code == 404
+
+
+def test_bulk_enrol_statement_count_independent_of_ids(app, client, statement_counter):
+    """This test checks that a bulk enrolment takes a fixed number of sql statements whatever the number of ids"""
+    with app.app_context():
+        db.session.add(CourseModel(id=1, name="English", subject_type="11+ exam"))
+        db.session.add(CourseRegisterModel(id=1, name="register 1", course_id=1))
+        user_data = {"name": "john Phillips", "age": 11, "password": "password"}
+        db.session.add_all(
+            StudentModel(id=student_id, email=f"s{student_id}@gmail.com", username=f"s{student_id}", **user_data)
+            for student_id in range(1, 301)
+        )
+        db.session.commit()
+
+    statement_counter.clear()
+    client.post("/course_registers/1/enrolments", json={"students": [1]})
+    statements_with_one_id = len(statement_counter)
+
+    statement_counter.clear()
+    response = client.post("/course_registers/1/enrolments", json={"students": list(range(2, 301))})
+    assert len(statement_counter) == statements_with_one_id
+    assert {outcome["outcome"] for outcome in response.json["students"]} == {"enrolled"}
+    assert len(client.get("/course_registers/1").json["students"]) == 300
+
+
+@pytest.mark.parametrize("user_type", ["students", "tutors"])
+def test_link_is_idempotent(user_type, populate_db_with_stub_data, client):
+    """This test checks that enrolling a user twice does not duplicate their enrolment"""
+    for _ in range(2):
+        assert client.post(f"{user_type}/1/course_registers/1").status_code == 201
+
+    assert len(client.get("/course_registers/1").json[user_type]) == 1
+
+
+@pytest.mark.parametrize("user_type", ["students", "tutors"])
+def test_unlink_not_enrolled(user_type, populate_db_with_stub_data, client):
+    """This test checks that removing a user from a course register they are not enrolled on is a 404"""
+    assert client.delete(f"{user_type}/1/course_registers/1").status_code == 404
+
+
+def test_link_statement_count_independent_of_registers(app, client, statement_counter):
+    """This test checks that enrolling a student does not load the registers they are already enrolled on"""
+    with app.app_context():
+        db.session.add(CourseModel(id=1, name="English", subject_type="11+ exam"))
+        db.session.add_all(
+            CourseRegisterModel(id=register_id, name=f"register {register_id}", course_id=1)
+            for register_id in range(1, 21)
+        )
+        db.session.commit()
+
+    _add_registers_with_students_and_tutors(app, course_id=1, first_id=21, count=1)
+    statement_counter.clear()
+    client.post("students/21/course_registers/1")
+    statements_with_one_register = len(statement_counter)
+
+    for register_id in range(2, 20):
+        client.post(f"students/21/course_registers/{register_id}")
+    statement_counter.clear()
+    client.post("students/21/course_registers/20")
+    assert len(statement_counter) == statements_with_one_register
+    assert not any(
+        '"StudentRegister".student_id = ' in statement and "SELECT" in statement for statement in statement_counter
+    )
@@ -0,0 +1,56 @@
+import json
+
+
+def test_sparse_fields_dumped(populate_db_with_stub_data, client):
+    """This test checks that only the requested fields, and the requested relationships, are returned"""
+    response = client.get("/students", query_string={"fields": "id,name", "include": ""})
+    assert response.status_code == 200
+    assert response.json == [{"id": 1, "name": "john Phillips"}]
+    assert "X-Pagination" in response.headers
+
+
+def test_sparse_fields_include_relationship(populate_db_with_stub_data, client):
+    """This test checks that an included relationship is returned alongside the requested fields"""
+    response = client.get("/course_registers/1", query_string={"fields": "name", "include": "course"})
+    assert response.json == {
+        "name": "my first course",
+        "course": {"id": 1, "name": "English", "subject_type": "11+ exam", "summary": None, "test_providers": None},
+    }
+
+
+def test_full_fieldset_by_default(populate_db_with_stub_data, client):
+    """This test checks that every field and relationship is returned when no fieldset is requested"""
+    student = client.get("/students/1").json
+    assert set(student) == {"id", "name", "email", "age", "summary", "profile_picture", "username", "registers"}
+
+
+def test_sparse_fields_project_columns(populate_db_with_stub_data, client, statement_counter):
+    """This test checks that only the requested columns are selected, and that no relationship is loaded"""
+    client.get("/tutors/1", query_string={"fields": "name", "include": ""})
+    assert len(statement_counter) == 1
+    assert "email" not in statement_counter[0]
+    assert "password" not in statement_counter[0]
+
+
+def test_password_never_selected(populate_db_with_stub_data, client, statement_counter):
+    """This test checks that the password column of a user is deferred when the full fieldset is read"""
+    client.get("/students")
+    assert not any('"Students".password' in statement for statement in statement_counter)
+
+
+def test_sparse_fields_streamed(populate_db_with_stub_data, client):
+    """This test checks that the fieldset applies to each row of a streamed collection"""
+    response = client.get("/students", query_string={"fields": "username", "include": "", "stream": "ndjson"})
+    assert [json.loads(line) for line in response.data.decode().splitlines()] == [{"username": "jphill111"}]
+
+
+def test_unknown_field_rejected(client):
+    """This test checks that a field the schema does not dump (or does not have) is rejected"""
+    assert client.get("/students", query_string={"fields": "password"}).status_code == 422
+    assert client.get("/courses", query_string={"include": "tutors"}).status_code == 422
+
+
+def test_fieldsets_documented(client):
+    """This test checks that the fieldset arguments are documented"""
+    parameters = client.get("/openapi.json").json["paths"]["/courses/{course_id}"]["get"]["parameters"]
+    assert {"fields", "include"} <= {parameter["name"] for parameter in parameters}
@@ -0,0 +1,98 @@
+import base64
+import json
+
+import pytest
+
+from db import db
+from models import CourseModel
+
+
+@pytest.fixture(scope="function")
+def stub_course_data(app):
+    """This fixture populates the testing database with five courses"""
+    courses = [
+        CourseModel(id=course_id, name=f"course {course_id}", subject_type="11+ exam") for course_id in range(1, 6)
+    ]
+    with app.app_context():
+        db.session.add_all(courses)
+        db.session.commit()
+    return courses
+
+
+def test_keyset_pagination_roundtrip(stub_course_data, client):
+    """
+    This test pages through a collection two items at a time by following the cursor returned in the pagination
+    header until the final page, which does not contain a cursor
+    """
+    pages = []
+    query_string = {"limit": 2}
+    while True:
+        response = client.get("/courses", query_string=query_string)
+        assert response.status_code == 200
+        pages.append([course["id"] for course in response.json])
+        pagination_metadata = json.loads(response.headers["X-Pagination"])
+        if "next_cursor" not in pagination_metadata:
+            assert "Link" not in response.headers
+            break
+        assert 'rel="next"' in response.headers["Link"]
+        query_string = {"limit": 2, "after": pagination_metadata["next_cursor"]}
+
+    assert pages == [[1, 2], [3, 4], [5]]
+
+
+def test_keyset_pagination_default_limit(stub_course_data, client):
+    """This test checks that a collection smaller than the default limit is returned in a single page"""
+    response = client.get("/courses")
+    assert len(response.json) == len(stub_course_data)
+    assert "next_cursor" not in json.loads(response.headers["X-Pagination"])
+
+
+def _cursor(after):
+    """:return: a well formed cursor holding any value"""
+    return base64.urlsafe_b64encode(json.dumps({"after": after}).encode()).decode()
+
+
+@pytest.mark.parametrize(
+    "query_string",
+    [
+        {"after": "not a cursor"},
+        {"after": _cursor("x")},
+        {"after": _cursor(None)},
+        {"after": _cursor(1.5)},
+        {"after": _cursor(True)},
+        {"after": _cursor([1])},
+        {"limit": 0},
+        {"limit": 1001},
+    ],
+    ids=[
+        "invalid cursor",
+        "string cursor",
+        "null cursor",
+        "float cursor",
+        "bool cursor",
+        "list cursor",
+        "limit below minimum",
+        "limit above maximum page size",
+    ],
+)
+def test_keyset_pagination_invalid_parameters(query_string, client):
+    """This test checks that invalid pagination parameters are rejected rather than returning an unbounded page"""
+    response = client.get("/students", query_string=query_string)
+    assert response.status_code == 422
+
+
+def test_keyset_pagination_documented(client):
+    """This test checks that the pagination, fieldset, streaming and If-None-Match parameters are documented"""
+    spec = client.get("/openapi.json").json
+    parameters = [
+        spec["components"]["parameters"][parameter["$ref"].rsplit("/", 1)[-1]] if "$ref" in parameter else parameter
+        for parameter in spec["paths"]["/course_registers"]["get"]["parameters"]
+    ]
+    assert [parameter["name"] for parameter in parameters] == [
+        "after",
+        "limit",
+        "If-None-Match",
+        "fields",
+        "include",
+        "stream",
+    ]
@@ -0,0 +1,180 @@
+import re
+
+import pytest
+from tests.client_headers import get_student_authed_header
+
+from db import db
+from models import StudentModel
+
+
+def test_signup_login_logout_roundtrip(client):
+    """
+    This test roundtrips the html routes used by a browser to create an account, login and logout. These routes
+    dispatch to the API logic in-process rather than making http requests against the server.
+    1. submit the register form and check we are redirected to the login form
+    2. submit the login form and check the jwt cookies are set on the redirect to the homepage
+    3. logout and check the cookies are unset and the access token is revoked
+    """
+    register_form = {
+        "user_type": "student",
+        "name": "john Phillips",
+        "age": 11,
+        "email": "jfgp111@gmail.com",
+        "username": "jphill111",
+        "password": "password",
+        "summary": "Looking for a tutor",
+    }
+    signup_response = client.post("/handle_signup", data=register_form)
+    assert signup_response.status_code == 302
+    assert signup_response.location.endswith("/login")
+
+    login_form = {"user_type": "student", "username": "jphill111", "password": "password"}
+    login_response = client.post("/handle_login", data=login_form)
+    assert login_response.status_code == 302
+    assert login_response.location.endswith("/homepage")
+    access_token_cookie = next(
+        cookie for cookie in login_response.headers.getlist("Set-Cookie") if cookie.startswith("access_token_cookie=")
+    )
+    access_token = access_token_cookie.split(";")[0].split("=", 1)[1]
+    assert access_token.startswith("ey")
+
+    logout_response = client.get("/logout")
+    assert logout_response.status_code == 302
+    assert any(cookie.startswith("access_token_cookie=;") for cookie in logout_response.headers.getlist("Set-Cookie"))
+
+    # the access token used to logout has been revoked
+    revoked_response = client.delete("/courses/1", headers={"Authorization": f"Bearer {access_token}"})
+    assert revoked_response.status_code == 401
+    assert revoked_response.json["error"] == "token_revoked"
+
+
+def test_signup_invalid_form(client):
+    """This test checks that an invalid register form re-renders the form and no student is created"""
+    register_form = {"user_type": "student", "name": "john Phillips", "username": "jphill111", "password": "password"}
+    response = client.post("/handle_signup", data=register_form)
+    assert response.status_code == 200
+    assert len(client.get("/students").json) == 0
+
+
+def test_login_invalid_credentials(populate_db_with_student_and_tutor_data, client):
+    """This test checks that invalid credentials redirect back to the login form without setting any cookies"""
+    login_form = {"user_type": "tutor", "username": "tutor123", "password": "invalid_password"}
+    response = client.post("/handle_login", data=login_form)
+    assert response.status_code == 302
+    assert response.location.endswith("/login")
+    assert "Set-Cookie" not in response.headers
+
+
+def test_anonymous_homepage_cached(populate_db_with_student_and_tutor_data, client, statement_counter):
+    """
+    This test checks that the anonymous homepage is rendered once per data version
+    1. the second visit is served from the cache, only the data version is read from the database
+    2. a visitor revalidating with the ETag gets a 304
+    3. a write bumps the data version, so the next visit renders the new counts
+    """
+    first_response = client.get("/homepage")
+    assert first_response.status_code == 200
+    etag = first_response.headers["ETag"]
+
+    statement_counter.clear()
+    second_response = client.get("/homepage")
+    assert second_response.data == first_response.data
+    assert len(statement_counter) == 1
+
+    assert client.get("/homepage", headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.post("/courses", json={"name": "Maths", "subject_type": "11+ exam"}).status_code == 201
+    changed_response = client.get("/homepage", headers={"If-None-Match": etag})
+    assert changed_response.status_code == 200
+    assert changed_response.headers["ETag"] != etag
+
+
+def test_personal_homepage_reuses_stats_fragment(
+    populate_db_with_student_and_tutor_data, app, client, statement_counter
+):
+    """
+    This test checks that the homepage of a logged in user is stitched around the cached counts
+    1. the second visit reads the student from the cached response and the counts from the cached fragment
+    2. a new student invalidates the counts
+    """
+    headers = get_student_authed_header(student_id=1, app=app)
+    # the first request of a worker loads the revoked tokens
+    client.get("/user_info", headers=headers)
+    first_response = client.get("/homepage", headers=headers)
+    assert b"Logout" in first_response.data
+
+    statement_counter.clear()
+    assert client.get("/homepage", headers=headers).data == first_response.data
+    assert not any("count(" in statement for statement in statement_counter)
+
+    student_data = {"name": "jane", "age": 12, "email": "jane@gmail.com", "username": "jane12", "password": "password"}
+    assert client.post("/students", data=student_data).status_code == 201
+    assert b"<span>2</span>" in client.get("/homepage", headers=headers).data
+
+
+def test_list_table_invalidated_by_writes(populate_db_with_stub_data, client):
+    """This test checks that the cached table of a list is rendered again when one of its rows is written"""
+    assert b"john Phillips" in client.get("/list_fields/student").data
+    assert client.put("/students/1", json={"name": "jane Phillips"}).status_code == 200
+    assert b"jane Phillips" in client.get("/list_fields/student").data
+
+    assert b"jphill111" not in client.get("/list_fields/event").data
+    assert b"my first course" not in client.get("/list_fields/student").data
+    assert client.post("/students/1/course_registers/1").status_code == 201
+    assert b"jphill111" in client.get("/list_fields/event").data
+    assert b"my first course" in client.get("/list_fields/student").data
+
+    assert client.delete("/students/1/course_registers/1").status_code == 200
+    assert b"my first course" not in client.get("/list_fields/student").data
+
+
+def test_list_table_read_from_fragment(populate_db_with_stub_data, client, statement_counter):
+    """This test checks that a list whose table is cached is rendered without reading its rows"""
+    first_response = client.get("/list_fields/student")
+
+    statement_counter.clear()
+    assert client.get("/list_fields/student").data == first_response.data
+    assert statement_counter == []
+
+
+@pytest.mark.parametrize("query_string", ["stream=json", "fields=name", "include=registers", "unknown=1"])
+def test_list_table_ignores_other_args(populate_db_with_stub_data, client, statement_counter, query_string):
+    """This test checks that the args of a list other than its page neither change its table nor its cached entry"""
+    first_response = client.get("/list_fields/student")
+    assert b"jfgp111@gmail.com" in first_response.data
+
+    statement_counter.clear()
+    assert client.get(f"/list_fields/student?{query_string}").data == first_response.data
+    assert statement_counter == []
+
+
+def test_homepage_stats_follow_data_version(populate_db_with_student_and_tutor_data, app, client):
+    """This test checks that the cached counts of the homepage are rendered again after a write outside the handlers,
+    which bumps the data version without invalidating the tags of the fragment"""
+    assert b"<span>1</span>" in client.get("/homepage").data
+    with app.app_context():
+        db.session.add(StudentModel(name="jane", age=12, email="jane@gmail.com", username="jane12", password="x"))
+        db.session.commit()
+
+    assert b"<span>2</span>" in client.get("/homepage").data
+
+
+def test_list_fields_paginated(app, client):
+    """This test checks that the html lists link to their next page"""
+    for index in range(3):
+        student_data = {
+            "name": f"student {index}",
+            "age": 12,
+            "email": f"student{index}@gmail.com",
+            "username": f"student{index}",
+            "password": "password",
+        }
+        assert client.post("/students", data=student_data).status_code == 201
+
+    first_page = client.get("/list_fields/student?limit=2").get_data(as_text=True)
+    assert "student 1" in first_page and "student 2" not in first_page
+    next_url = re.search(r'href="([^"]*after=[^"]*)"', first_page).group(1).replace("&amp;", "&")
+
+    second_page = client.get(f"{next_url}&limit=2").get_data(as_text=True)
+    assert "student 2" in second_page and "student 0" not in second_page
+    assert "after=" not in second_page
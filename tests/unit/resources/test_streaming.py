@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from db import db
+from models import StudentModel
+from resources.pagination import encode_cursor
+
+
+@pytest.fixture(scope="function")
+def stub_student_data(app):
+    """This fixture populates the testing database with five students, more than a streamed batch"""
+    app.config["STREAM_BATCH_SIZE"] = 2
+    students = [
+        StudentModel(
+            id=student_id,
+            name=f"student {student_id}",
+            email=f"student{student_id}@example.com",
+            age=11,
+            username=f"student{student_id}",
+            password="password",
+        )
+        for student_id in range(1, 6)
+    ]
+    with app.app_context():
+        db.session.add_all(students)
+        db.session.commit()
+    return students
+
+
+def test_stream_json_array(stub_student_data, client):
+    """This test checks that the whole collection is streamed as a JSON array, ignoring the page limit"""
+    response = client.get("/students", query_string={"stream": "json", "limit": 2})
+    assert response.is_streamed
+    assert response.mimetype == "application/json"
+    assert "X-Pagination" not in response.headers
+    assert [student["id"] for student in json.loads(response.data)] == [1, 2, 3, 4, 5]
+    assert "password" not in json.loads(response.data)[0]
+
+
+def test_stream_ndjson_resumes_after_cursor(stub_student_data, client):
+    """This test checks that NDJSON has one student per line, and that an interrupted export resumes from a cursor"""
+    response = client.get("/students", query_string={"stream": "ndjson", "after": encode_cursor(2)})
+    assert response.mimetype == "application/x-ndjson"
+    assert [json.loads(line)["id"] for line in response.data.decode().splitlines()] == [3, 4, 5]
+
+
+def test_stream_empty_collection(client):
+    """This test checks that an empty collection streams a valid JSON array"""
+    assert client.get("/tutors", query_string={"stream": "json"}).json == []
+
+
+def test_stream_invalid_format(client):
+    """This test checks that an unknown stream format is rejected"""
+    assert client.get("/course_registers", query_string={"stream": "xml"}).status_code == 422
+
+
+def test_stream_documented(client):
+    """This test checks that the stream argument is documented alongside the pagination arguments"""
+    parameters = client.get("/openapi.json").json["paths"]["/students"]["get"]["parameters"]
+    assert "stream" in [parameter.get("name") for parameter in parameters]
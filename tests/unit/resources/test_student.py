@@ -166,3 +166,25 @@ def test_student_update_constraint_error_bug(stub_tutor_data, client):
 
     students_response = client.get("/students").json
     assert len(students_response) == 1
+
+
+def test_student_update_single_statement(stub_tutor_data, client, statement_counter):
+    """This test checks that an update is written by one UPDATE and its response dumped without reading the row"""
+    response = client.put("/students/1", json={"name": "jane Phillips"})
+    assert response.status_code == 200
+    assert response.json["name"] == "jane Phillips"
+    assert response.json["email"] == "jfgp111@gmail.com"
+
+    assert sum(statement.startswith('UPDATE "Students"') for statement in statement_counter) == 1
+    assert not any(statement.startswith("SELECT") for statement in statement_counter)
+
+
+def test_student_update_documented_response(stub_tutor_data, client):
+    """This test checks that the documented response of a PUT has the fields it returns"""
+    response = client.put("/students/1", json={"name": "jane Phillips"})
+    spec = client.get("/openapi.json").json
+
+    responses = spec["paths"]["/students/{student_id}"]["put"]["responses"]
+    assert responses["200"]["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/PlainStudent"}
+    assert "201" in responses
+    assert set(response.json) == set(spec["components"]["schemas"]["PlainStudent"]["properties"]) - {"password"}
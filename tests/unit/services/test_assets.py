@@ -0,0 +1,77 @@
+import importlib
+import re
+
+from flask import Flask
+
+from services import assets, build_bundles, minify_css
+
+
+def test_minify_css():
+    """This test checks that comments and insignificant whitespace are removed, and strings are kept as is"""
+    css = (
+        '/* header */\n.a ,\n.b {\n  color: red;\n  content: "a ;  b";\n}\n'
+        "@media(max-width: 767px) {\n  .a { margin: 0 auto; }\n}\n"
+    )
+    assert minify_css(css) == '.a,.b{color:red;content:"a ;  b"}@media(max-width:767px){.a{margin:0 auto}}'
+
+
+def test_bundles_fingerprinted_by_content(tmp_path):
+    """This test checks that a bundle concatenates its stylesheets in order, and is renamed when they change"""
+    (tmp_path / "components").mkdir()
+    (tmp_path / "style.css").write_text(".page { margin: 0; }")
+    (tmp_path / "components" / "card.css").write_text(".card { padding: 0; }")
+    bundles = {"page.css": ["style.css", "components/card.css"]}
+
+    manifest = build_bundles(str(tmp_path), bundles)
+    assert re.fullmatch(r"dist/page\.[0-9a-f]{12}\.css", manifest["page.css"])
+    assert (tmp_path / manifest["page.css"]).read_text() == ".page{margin:0}\n.card{padding:0}"
+    assert build_bundles(str(tmp_path), bundles) == manifest
+
+    (tmp_path / "style.css").write_text(".page { margin: 1px; }")
+    assert build_bundles(str(tmp_path), bundles) != manifest
+
+
+def test_read_only_static_folder(tmp_path, monkeypatch):
+    """
+    This test checks that an app whose static folder is read-only is created, linking a bundle as built by
+    `flask build-assets` or, if it is not built, as its stylesheets
+    """
+    (tmp_path / "style.css").write_text(".page { margin: 0; }")
+    (tmp_path / "card.css").write_text(".card { padding: 0; }")
+    # `services.assets` is shadowed by the extension exported by `services`
+    monkeypatch.setattr(
+        importlib.import_module("services.assets"), "BUNDLES", {"built.css": ["style.css"], "unbuilt.css": ["card.css"]}
+    )
+    built = build_bundles(str(tmp_path), {"built.css": ["style.css"]})
+    app = Flask(__name__, static_folder=str(tmp_path), static_url_path="/static")
+
+    for folder in (tmp_path, tmp_path / "dist"):
+        folder.chmod(0o555)
+    try:
+        assets.init_app(app)
+    finally:
+        for folder in (tmp_path, tmp_path / "dist"):
+            folder.chmod(0o755)
+
+    with app.test_request_context():
+        assert assets.asset_urls("built.css") == [f"/static/{built['built.css']}"]
+        assert assets.asset_urls("unbuilt.css") == ["/static/card.css"]
+
+
+def test_homepage_links_one_immutable_bundle(populate_db_with_student_and_tutor_data, client):
+    """This test checks that the homepage links a single fingerprinted stylesheet that is cached for a year"""
+    page = client.get("/homepage").get_data(as_text=True)
+    stylesheets = re.findall(r'<link rel="stylesheet"\s+href="(/static/[^"]+)"', page)
+    assert len(stylesheets) == 1
+
+    bundle = client.get(stylesheets[0], headers={"Accept-Encoding": "br"})
+    assert bundle.status_code == 200
+    assert bundle.mimetype == "text/css"
+    assert bundle.headers["Content-Encoding"] == "br"
+    assert bundle.cache_control.immutable
+    assert bundle.cache_control.max_age == 365 * 24 * 60 * 60
+    bundle.close()
+
+    unfingerprinted = client.get("/static/style.css")
+    assert not unfingerprinted.cache_control.immutable
+    unfingerprinted.close()
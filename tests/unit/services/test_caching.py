@@ -0,0 +1,136 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.caching import FileCache, LocalCache, cache
+
+
+def test_local_cache_evicts_least_recently_used():
+    """This test checks that the local cache is bounded, evicting the least recently used entry"""
+    cache = LocalCache(max_entries=2)
+    cache.set("first", 1)
+    cache.set("second", 2)
+    assert cache.get("first") == 1
+    cache.set("third", 3)
+
+    assert cache.get("second") is None
+    assert cache.get("first") == 1
+    assert cache.get("third") == 3
+
+
+def test_local_cache_entries_expire():
+    """This test checks that entries are not served after their ttl"""
+    cache = LocalCache(ttl=60)
+    cache.set("expired", 1, ttl=-1)
+    cache.set("live", 2)
+
+    assert cache.get("expired") is None
+    assert cache.get("live") == 2
+
+
+def test_file_cache_shared_between_workers(tmp_path):
+    """This test checks that an entry set by one worker is served to another, and that the file is bounded"""
+    first_worker = FileCache(str(tmp_path / "cache.db"), max_entries=2)
+    second_worker = FileCache(str(tmp_path / "cache.db"), max_entries=2)
+    first_worker.set("page", {"body": "<html></html>"})
+    assert second_worker.get("page") == {"body": "<html></html>"}
+
+    second_worker.set("expired", 1, ttl=-1)
+    assert first_worker.get("expired") is None
+
+    first_worker.set("second", 2)
+    first_worker.set("third", 3)
+    assert second_worker.get("page") is None
+    assert second_worker.get("third") == 3
+
+
+@pytest.mark.parametrize("backend", ["local", "file"])
+def test_add_only_sets_missing_keys(backend, tmp_path):
+    """This test checks that `add` does not replace a live entry, but does replace an expired one"""
+    cache = LocalCache() if backend == "local" else FileCache(str(tmp_path / "cache.db"))
+    assert cache.add("lock", 1) is True
+    assert cache.add("lock", 2) is False
+    assert cache.get("lock") == 1
+
+    cache.set("expired", 1, ttl=-1)
+    assert cache.add("expired", 2) is True
+    assert cache.get("expired") == 2
+
+
+@pytest.mark.parametrize("backend", ["local", "file"])
+def test_tagged_entries_invalidated(backend, app, tmp_path):
+    """This test checks that invalidating a tag makes every entry cached with it stale, and only those entries"""
+    app.config.update({"CACHE_BACKEND": backend, "CACHE_FILE": str(tmp_path / "cache.db")})
+    cache.init_app(app)
+    with app.app_context():
+        assert cache.get_or_set("student", lambda: "v1", tags=["student:1", "students"]) == "v1"
+        assert cache.get_or_set("tutor", lambda: "v1", tags=["tutor:1"]) == "v1"
+        assert cache.get_or_set("student", lambda: "v2", tags=["student:1", "students"]) == "v1"
+
+        cache.invalidate("students")
+        assert cache.get_or_set("student", lambda: "v2", tags=["student:1", "students"]) == "v2"
+        assert cache.get_or_set("tutor", lambda: "v2", tags=["tutor:1"]) == "v1"
+
+
+@pytest.mark.parametrize("backend", ["local", "file"])
+def test_hot_key_computed_once(backend, app, tmp_path):
+    """This test checks that concurrent misses of a key wait for the request computing it rather than recomputing"""
+    app.config.update({"CACHE_BACKEND": backend, "CACHE_FILE": str(tmp_path / "cache.db")})
+    cache.init_app(app)
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "page"
+
+    def read():
+        with app.app_context():
+            return cache.get_or_set("hot", compute)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(read)
+        started.wait()
+        others = [executor.submit(read) for _ in range(3)]
+        results = [first.result()] + [future.result() for future in others]
+
+    assert results == ["page"] * 4
+    assert len(calls) == 1
+
+
+def test_local_backend_refused_with_many_workers(app, monkeypatch):
+    """This test checks that the per worker `local` backend is refused when gunicorn runs several workers"""
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    app.config["CACHE_BACKEND"] = "local"
+    with pytest.raises(ValueError):
+        cache.init_app(app)
+
+
+def test_responses_cached_and_invalidated(populate_db_with_stub_data, client, statement_counter):
+    """This test checks that detail responses are served from the cache until a write invalidates them"""
+    assert client.get("/students/1").json["registers"] == []
+    statement_counter.clear()
+    assert client.get("/students/1").json["registers"] == []
+    assert client.get("/students/1", query_string={"fields": "name", "include": ""}).json == {"name": "john Phillips"}
+    assert len(statement_counter) == 1
+
+    client.post("/students/1/course_registers/1")
+    assert client.get("/students/1").json["registers"] == [{"id": 1, "name": "my first course"}]
+    assert client.get("/course_registers/1").json["students"][0]["name"] == "john Phillips"
+
+    client.put("/students/1", json={"name": "jane Phillips"})
+    assert client.get("/students/1").json["name"] == "jane Phillips"
+    assert client.get("/course_registers/1").json["students"][0]["name"] == "jane Phillips"
+
+
+def test_responses_not_cached_when_disabled(populate_db_with_stub_data, app, client, statement_counter):
+    """This test checks that `RESPONSE_CACHE` disables the response cache"""
+    app.config["RESPONSE_CACHE"] = False
+    client.get("/tutors/1")
+    statement_counter.clear()
+    client.get("/tutors/1")
+    assert len(statement_counter) == 2
@@ -0,0 +1,83 @@
+import json
+
+from db import db
+from models import CourseModel, CourseRegisterModel
+from services import catalog
+
+
+def test_catalog_read_through(populate_db_with_stub_data, app, client, statement_counter):
+    """This test checks that the catalog is loaded once and then served from memory after a version check"""
+    assert client.get("/courses").json[0]["registers"] == [{"id": 1, "name": "my first course"}]
+
+    statement_counter.clear()
+    assert client.get("/courses").json[0]["name"] == "English"
+    assert client.get("/courses/1").json["registers"] == [{"id": 1, "name": "my first course"}]
+    # the collection is also validated by the versions of its tables (see `resources.conditional`)
+    assert len(statement_counter) == 3
+    assert all('"CacheVersions"' in statement for statement in statement_counter)
+
+    with app.test_request_context():
+        assert catalog.metrics() == {"hits": 2, "misses": 1, "oversized": 0, "version": 1, "courses": 1}
+
+
+def test_catalog_invalidated_by_writes(populate_db_with_stub_data, app, client, admin_authed_header):
+    """This test checks that creating, updating and deleting courses and registers reloads the catalog"""
+    client.get("/courses")
+
+    client.put("/courses/2", json={"name": "Maths", "subject_type": "GCSE"})
+    assert [course["name"] for course in client.get("/courses").json] == ["English", "Maths"]
+
+    client.put("/courses/1", json={"summary": "updated"})
+    assert client.get("/courses/1").json["summary"] == "updated"
+
+    with app.app_context():
+        db.session.add(CourseRegisterModel(id=2, name="my second course", course_id=1))
+        db.session.commit()
+    assert len(client.get("/courses/1").json["registers"]) == 2
+
+    client.delete("/courses/2", headers=admin_authed_header)
+    assert client.get("/courses/2").status_code == 404
+
+
+def test_catalog_pages(app, client):
+    """This test checks that pages of the catalog are selected with the keyset pagination cursor"""
+    with app.app_context():
+        db.session.add_all(CourseModel(id=course_id, name=f"course {course_id}") for course_id in range(1, 6))
+        db.session.commit()
+
+    first_page = client.get("/courses", query_string={"limit": 2})
+    assert [course["id"] for course in first_page.json] == [1, 2]
+
+    next_cursor = json.loads(first_page.headers["X-Pagination"])["next_cursor"]
+    second_page = client.get("/courses", query_string={"limit": 2, "after": next_cursor})
+    assert [course["id"] for course in second_page.json] == [3, 4]
+
+    sparse_page = client.get("/courses", query_string={"fields": "name", "include": ""})
+    assert sparse_page.json[0] == {"name": "course 1"}
+
+
+def test_oversized_catalog_read_from_database(populate_db_with_stub_data, app, client):
+    """This test checks that a catalog larger than `CATALOG_MAX_ENTRIES` is not held, nor reloaded on every read"""
+    app.config["CATALOG_MAX_ENTRIES"] = 1
+    app.extensions["catalog"].max_entries = 1
+
+    for _ in range(2):
+        assert client.get("/courses/1").json["registers"] == [{"id": 1, "name": "my first course"}]
+
+    with app.test_request_context():
+        assert catalog.metrics() == {"hits": 0, "misses": 1, "oversized": 1, "version": None, "courses": 0}
+
+
+def test_catalog_disabled(populate_db_with_stub_data, app, client):
+    """This test checks that courses are read from the database when the catalog is not cached"""
+    del app.extensions["catalog"]
+    assert client.get("/courses/1").json["name"] == "English"
+    assert client.get("/courses/2").status_code == 404
+
+
+def test_catalog_debug_endpoint(app, client):
+    """This test checks that the catalog metrics are only served when enabled"""
+    assert client.get("/debug/catalog").status_code == 404
+
+    app.config["CATALOG_DEBUG_ENDPOINT"] = True
+    assert client.get("/debug/catalog").json["misses"] == 0
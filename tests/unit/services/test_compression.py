@@ -0,0 +1,77 @@
+import gzip
+import os
+
+import brotli
+import pytest
+
+from services import precompress_static
+
+DECOMPRESS = {"br": brotli.decompress, "gzip": gzip.decompress}
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encoding", [("br", "br"), ("gzip, deflate", "gzip"), ("br;q=0.5, gzip", "gzip"), ("*", "br")]
+)
+def test_dynamic_responses_negotiated(client, accept_encoding, encoding):
+    """This test checks that pages above the size threshold are compressed with the encoding preferred by the client"""
+    plain = client.get("/signup")
+    response = client.get("/signup", headers={"Accept-Encoding": accept_encoding})
+
+    assert "Content-Encoding" not in plain.headers
+    assert response.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert DECOMPRESS[encoding](response.data) == plain.data
+
+
+def test_small_and_unaccepted_responses_not_compressed(app, client):
+    """This test checks that responses below `COMPRESS_MIN_SIZE`, or to clients not accepting them, are sent as is"""
+    assert "Content-Encoding" not in client.get("/signup", headers={"Accept-Encoding": "identity"}).headers
+
+    app.config["COMPRESS_MIN_SIZE"] = 10**6
+    response = client.get("/signup", headers={"Accept-Encoding": "br"})
+    assert "Content-Encoding" not in response.headers
+    assert "Vary" not in response.headers
+
+
+def test_compressed_collection_revalidated(populate_db_with_stub_data, app, client):
+    """This test checks that the weak ETag of a compressed collection still validates its conditional GET"""
+    app.config["COMPRESS_MIN_SIZE"] = 0
+    response = client.get("/course_registers", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"].startswith('W/"')
+
+    revalidated = client.get(
+        "/course_registers", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_static_files_served_precompressed(app, client):
+    """This test checks that a static file is served from its precompressed variant, without compressing it again"""
+    with open(os.path.join(app.static_folder, "style.css"), "rb") as stylesheet:
+        source = stylesheet.read()
+
+    for encoding in ("br", "gzip"):
+        response = client.get("/static/style.css", headers={"Accept-Encoding": encoding})
+        assert response.headers["Content-Encoding"] == encoding
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert response.mimetype == "text/css"
+        assert DECOMPRESS[encoding](response.get_data()) == source
+        response.close()
+
+    response = client.get("/static/style.css")
+    assert "Content-Encoding" not in response.headers
+    assert response.get_data() == source
+    response.close()
+
+
+def test_precompress_static_skips_up_to_date_variants(app, tmp_path):
+    """This test checks that only compressible files without an up to date variant are compressed"""
+    (tmp_path / "components").mkdir()
+    (tmp_path / "components" / "card.css").write_text("body {}")
+    (tmp_path / "logo.png").write_bytes(b"png")
+
+    assert precompress_static(str(tmp_path), app.config) == 2
+    assert (tmp_path / "components" / "card.css.br").exists()
+    assert not (tmp_path / "logo.png.gz").exists()
+    assert precompress_static(str(tmp_path), app.config) == 0
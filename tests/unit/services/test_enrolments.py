@@ -0,0 +1,87 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from db import db
+from models import CourseModel, CourseRegisterModel, StudentModel, TutorModel
+from services import DATA, counterparts_query, courses_query, get_version, link, unlink
+
+
+@pytest.fixture(scope="function")
+def enrolment_data(app):
+    """
+    This fixture populates the testing database with a course containing two registers. One tutor teaches both
+    registers; the first student is enrolled on the first register and the second student is enrolled on both.
+    A second course is created with no enrolments.
+    """
+    user_data = {"name": "john Phillips", "age": 11, "password": "password"}
+    with app.app_context():
+        db.session.add(CourseModel(id=1, name="English", subject_type="11+ exam"))
+        db.session.add(CourseModel(id=2, name="Maths", subject_type="11+ exam"))
+        tutor = TutorModel(id=1, email="tutor@gmail.com", username="tutor", **user_data)
+        first_student = StudentModel(id=1, email="s1@gmail.com", username="s1", **user_data)
+        second_student = StudentModel(id=2, email="s2@gmail.com", username="s2", **user_data)
+        first_register = CourseRegisterModel(id=1, name="monday", course_id=1)
+        second_register = CourseRegisterModel(id=2, name="tuesday", course_id=1)
+        first_register.tutors.append(tutor)
+        second_register.tutors.append(tutor)
+        first_register.students.extend([first_student, second_student])
+        second_register.students.append(second_student)
+        db.session.add_all([first_register, second_register])
+        db.session.commit()
+
+
+@pytest.mark.parametrize(
+    "user_type, uid, expected_ids",
+    [("tutor", 1, [1, 2]), ("student", 2, [1]), ("student", 3, [])],
+    ids=["students of a tutor", "tutors of a student on two registers", "student not enrolled"],
+)
+def test_counterparts_query_deduplicated(user_type, uid, expected_ids, enrolment_data, app):
+    """This test checks that a person shared across several registers is only returned once"""
+    with app.app_context():
+        people = counterparts_query(user_type, uid).order_by("id").all()
+        assert [person.id for person in people] == expected_ids
+
+
+@pytest.mark.parametrize("user_type, uid", [("tutor", 1), ("student", 2)])
+def test_courses_query_deduplicated(user_type, uid, enrolment_data, app):
+    """This test checks that a course is only returned once when the user is enrolled on several of its registers"""
+    with app.app_context():
+        assert [course.id for course in courses_query(user_type, uid).all()] == [1]
+
+
+@pytest.mark.parametrize(
+    "endpoint, user_type, uid, expected_text",
+    [
+        ("/my_people", "tutor", 1, b"s2@gmail.com"),
+        ("/my_people", "student", 1, b"tutor@gmail.com"),
+        ("/my_courses", "student", 2, b"English"),
+    ],
+)
+def test_my_people_and_courses_routes(endpoint, user_type, uid, expected_text, enrolment_data, app, client):
+    """This test renders the `my_people` and `my_courses` html routes as a logged in user"""
+    with app.app_context():
+        access_token = create_access_token(uid, additional_claims={"user_type": user_type})
+    client.set_cookie("localhost", "access_token_cookie", access_token)
+
+    response = client.get(endpoint)
+    assert response.status_code == 200
+    assert expected_text in response.data
+
+
+def test_link_and_unlink_bump_version(enrolment_data, app):
+    """This test checks that links written directly to the association tables are idempotent and bump the version"""
+    with app.app_context():
+        versions = [get_version(DATA)]
+        assert link("tutor", 1, 1) is False
+        assert link("student", 1, 2) is True
+        db.session.commit()
+        versions.append(get_version(DATA))
+
+        assert unlink("student", 1, 2) is True
+        assert unlink("student", 1, 2) is False
+        db.session.commit()
+        versions.append(get_version(DATA))
+
+        assert db.session.get(CourseRegisterModel, 2).students == [db.session.get(StudentModel, 2)]
+
+    assert versions == sorted(set(versions))
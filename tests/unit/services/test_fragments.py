@@ -0,0 +1,52 @@
+import pytest
+from flask import render_template_string
+
+from services import cache
+
+TEMPLATE = '{% cache key, ["courses"] %}{{ render() }}{% endcache %}'
+
+
+def _counter():
+    """:return: a callable returning the number of times it was called"""
+    calls = []
+
+    def render():
+        calls.append(None)
+        return len(calls)
+
+    return render
+
+
+def test_fragment_cached_until_invalidated(app):
+    """This test checks that a fragment is rendered once, and again once one of its tags is invalidated"""
+    render = _counter()
+    with app.test_request_context():
+        assert render_template_string(TEMPLATE, key="fragment", render=render) == "1"
+        assert render_template_string(TEMPLATE, key="fragment", render=render) == "1"
+        assert render_template_string(TEMPLATE, key="other", render=render) == "2"
+
+        cache.invalidate("courses")
+        assert render_template_string(TEMPLATE, key="fragment", render=render) == "3"
+
+
+@pytest.mark.parametrize(
+    "context, config", [({"key": None}, {}), ({}, {}), ({"key": "fragment"}, {"FRAGMENT_CACHE": False})]
+)
+def test_fragment_not_cached(app, context, config):
+    """This test checks that a fragment without a key, or with the fragment cache disabled, is rendered every time"""
+    app.config.update(config)
+    render = _counter()
+    with app.test_request_context():
+        assert render_template_string(TEMPLATE, render=render, **context) == "1"
+        assert render_template_string(TEMPLATE, render=render, **context) == "2"
+
+
+def test_fragment_expires_on_local_backend(app):
+    """This test checks that a fragment cached by a `local` backend, which misses the writes of the other workers, is
+    held for `FRAGMENT_CACHE_LOCAL_TTL` rather than the default TTL of the cache"""
+    app.config.update({"CACHE_BACKEND": "local", "FRAGMENT_CACHE_LOCAL_TTL": 0})
+    cache.init_app(app)
+    render = _counter()
+    with app.test_request_context():
+        assert render_template_string(TEMPLATE, key="fragment", render=render) == "1"
+        assert render_template_string(TEMPLATE, key="fragment", render=render) == "2"
@@ -0,0 +1,62 @@
+from db import db
+from models import StudentModel
+from services import DATA, get_version
+from services.hashing import HashingPool, default_workers
+
+LOGIN_DATA = {"username": "student123", "password": "student_password"}
+
+
+def test_rehash_on_login(populate_db_with_student_and_tutor_data, app, client):
+    """
+    This test checks that a stored password hash is upgraded on login when the configured work factor changes, and
+    that the user can still login with the upgraded hash
+    """
+    app.config["PASSWORD_HASH_ROUNDS"] = 1000
+    assert client.post("/students/login", data=LOGIN_DATA).status_code == 200
+    with app.app_context():
+        assert "$1000$" in db.session.get(StudentModel, 1).password
+
+    assert client.post("/students/login", data=LOGIN_DATA).status_code == 200
+
+
+def test_rehash_keeps_data_version(populate_db_with_student_and_tutor_data, app, client):
+    """This test checks that the rehash of a password, which is never serialised, does not invalidate the caches"""
+    app.config["PASSWORD_HASH_ROUNDS"] = 1000
+    with app.app_context():
+        version = get_version(DATA)
+
+    assert client.post("/students/login", data=LOGIN_DATA).status_code == 200
+    with app.app_context():
+        assert "$1000$" in db.session.get(StudentModel, 1).password
+        assert get_version(DATA) == version
+
+
+def test_saturated_pool_rejects_logins(populate_db_with_student_and_tutor_data, app, client):
+    """
+    This test checks that logins are rejected with a 503 and a `Retry-After` header once the hashing pool has no
+    capacity left, rather than queueing behind the running jobs. The single slot of the pool is held by the test.
+    """
+    pool = HashingPool(workers=1, max_pending=1, retry_after=7)
+    app.extensions["password_hasher"] = pool
+    pool._slots.acquire()
+
+    response = client.post("/students/login", data=LOGIN_DATA)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+
+    pool._slots.release()
+    assert client.post("/students/login", data=LOGIN_DATA).status_code == 200
+    pool.shutdown()
+
+
+def test_default_workers_share_cores_between_web_workers(monkeypatch):
+    """This test checks that the hashing pools of the web workers together use at most every core"""
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert default_workers() == 8
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert default_workers() == 2
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "16")
+    assert default_workers() == 1
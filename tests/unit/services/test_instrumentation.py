@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import select
+
+from db import db
+from models import StudentModel
+from services import query_budget
+from services.instrumentation import QueryBudgetExceeded, statement_pattern
+
+
+@pytest.fixture(scope="function")
+def n_plus_one_endpoint(app):
+    """A fixture used to register an endpoint that selects the same student one query at a time"""
+
+    @app.get("/n_plus_one")
+    @query_budget(1)
+    def n_plus_one():
+        for student_id in range(3):
+            db.session.execute(select(StudentModel).where(StudentModel.id == student_id)).all()
+        return "ok"
+
+    app.config["SQL_DEBUG_ENDPOINT"] = True
+    return "/n_plus_one"
+
+
+def test_statement_pattern_collapses_parameters():
+    """This test checks that statements differing only by their parameters share a pattern"""
+    assert statement_pattern("SELECT * FROM t WHERE id IN (%(id_1)s, %(id_2)s) AND name = 'x'") == (
+        "SELECT * FROM t WHERE id IN (?) AND name = ?"
+    )
+    assert statement_pattern("SELECT * FROM t WHERE id = %(id_1)s") == statement_pattern(
+        "SELECT * FROM t\n WHERE id = %(id_2)s"
+    )
+
+
+def test_server_timing_header(populate_db_with_stub_data, client):
+    """This test checks that the statement count and database time of a request are sent in `Server-Timing`"""
+    response = client.get("/students")
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert response.headers["Server-Timing"].endswith('desc="3 statements"')
+
+
+def test_debug_endpoint_disabled_by_default(client):
+    """This test checks that the request history is not served unless `SQL_DEBUG_ENDPOINT` is set"""
+    assert client.get("/debug/sql").status_code == 404
+
+
+def test_query_budget_exceeded_in_strict_mode(n_plus_one_endpoint, client):
+    """This test checks that strict mode fails a request over its budget and that the N+1 pattern is reported"""
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(n_plus_one_endpoint)
+
+    summary = client.get("/debug/sql").json["requests"][0]
+    assert summary["path"] == n_plus_one_endpoint
+    assert summary["statements"] == 3
+    assert summary["over_budget"] == [{"view": "n_plus_one_endpoint.<locals>.n_plus_one", "statements": 3, "budget": 1}]
+    assert summary["repeated"][0]["count"] == 3
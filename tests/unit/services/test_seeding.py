@@ -0,0 +1,31 @@
+from sqlalchemy import func, select
+
+from db import db
+from models import CourseRegisterModel, StudentModel, StudentRegister, TutorRegister
+from services import SeedCounts, seed
+
+
+def test_seed_related_data(app):
+    """This test checks that seeding creates the requested rows and enrols them on each other"""
+    with app.app_context():
+        counts = seed(students=20, tutors=4, registers=10, enrolments=3, random_seed=1)
+        assert counts == SeedCounts(
+            students=20, tutors=4, courses=1, registers=10, student_enrolments=60, tutor_enrolments=20
+        )
+        assert db.session.scalar(select(func.count()).select_from(StudentRegister)) == 60
+        assert db.session.scalar(select(func.count()).select_from(TutorRegister)) == 20
+        assert len(db.session.get(CourseRegisterModel, 1).tutors) == 2
+
+
+def test_seed_command_users_can_login(app, client):
+    """This test checks the `flask seed` command, and that the seeded users can login with the seeded password"""
+    result = app.test_cli_runner().invoke(
+        args=["seed", "--students", "5", "--tutors", "2", "--registers", "3", "--prefix", "bench"]
+    )
+    assert result.exit_code == 0, result.output
+
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(StudentModel)) == 5
+
+    response = client.post("/students/login", data={"username": "bench-student-4", "password": "password"})
+    assert response.status_code == 200
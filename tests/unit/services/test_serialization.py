@@ -0,0 +1,87 @@
+import inspect
+import json
+
+import marshmallow as ma
+import pytest
+
+import schemas
+from db import db
+from models import CourseModel, CourseRegisterModel, StudentModel, TutorModel
+from schemas import CourseRegisterSchema, StudentSchema
+from services import compile_schema
+
+SCHEMAS = [schema for _, schema in inspect.getmembers(schemas, inspect.isclass) if issubclass(schema, ma.Schema)]
+
+
+def _outcome(dump, *args, **kwargs):
+    """:return: the output of a dump, or the type of the error it raised (e.g. dumping a model with a load schema)"""
+    try:
+        return dump(*args, **kwargs)
+    except (TypeError, ValueError) as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("schema_class", SCHEMAS, ids=lambda schema_class: schema_class.__name__)
+def test_compiled_dump_matches_marshmallow(populate_db_with_stub_data, app, schema_class):
+    """This test checks that every schema is compiled to a dump with the same output as marshmallow's"""
+    schema = schema_class()
+    dump = compile_schema(schema)
+    assert dump != schema.dump
+    with app.app_context():
+        register = db.session.get(CourseRegisterModel, 1)
+        register.students.append(db.session.get(StudentModel, 1))
+        register.tutors.append(db.session.get(TutorModel, 1))
+        db.session.commit()
+        objects = [
+            db.session.get(CourseModel, 1),
+            register,
+            db.session.get(StudentModel, 1),
+            {"id": "2", "name": None, "age": 11.0, "message": b"bytes", "students": [], "course": {"name": 1}},
+            {"registers": None},
+            {},
+        ]
+        for obj in objects:
+            assert _outcome(dump, obj) == _outcome(schema.dump, obj)
+        assert _outcome(dump, objects, many=True) == _outcome(schema.dump, objects, many=True)
+
+
+def test_schemas_with_hooks_not_compiled():
+    """This test checks that a schema the compiler does not reproduce exactly is dumped by marshmallow"""
+
+    class HookedSchema(ma.Schema):
+        name = ma.fields.Str()
+
+        @ma.post_dump
+        def upper(self, data, **kwargs):
+            return {"name": data["name"].upper()}
+
+    class MethodSchema(ma.Schema):
+        name = ma.fields.Method("get_name")
+
+        def get_name(self, obj):
+            return "method"
+
+    assert compile_schema(HookedSchema()).__self__.__class__ is HookedSchema
+    assert compile_schema(MethodSchema())({"name": "ignored"}) == {"name": "method"}
+
+
+def test_compiled_responses_match_default_encoding(populate_db_with_stub_data, app, client):
+    """This test checks that the compiled blueprints respond with the bytes of the marshmallow and json module path"""
+    client.post("/students/1/course_registers/1")
+    with app.app_context():
+        db.session.add(StudentModel(id=2, name="Zoë", email="zoe@example.com", age=12, username="zoe", password="pw"))
+        db.session.commit()
+        expected = {
+            "/students": StudentSchema(many=True).dump(StudentModel.query.order_by(StudentModel.id).all()),
+            "/course_registers": CourseRegisterSchema(many=True).dump(CourseRegisterModel.query.all()),
+        }
+
+    for path, data in expected.items():
+        response = client.get(path)
+        assert response.data.decode() == json.dumps(data, sort_keys=True, separators=(",", ":")) + "\n"
+
+
+def test_compiled_schema_documented(client):
+    """This test checks that the schema of a compiled response is documented as the schema it was compiled from"""
+    responses = client.get("/openapi.json").json["paths"]["/students/{student_id}"]["get"]["responses"]
+    assert responses["200"]["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/Student"}
@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+
+def _access_cookies(response):
+    return [cookie for cookie in response.headers.getlist("Set-Cookie") if cookie.startswith("access_token_cookie=")]
+
+
+@pytest.fixture(scope="function")
+def expiring_token(app):
+    """A fixture used to generate a student access token that is inside the refresh window"""
+    with app.app_context():
+        return create_access_token(1, additional_claims={"user_type": "student"}, expires_delta=timedelta(minutes=5))
+
+
+def test_expiring_token_refreshed_once(expiring_token, client):
+    """This test checks that an access token about to expire is replaced once, not on every response"""
+    client.set_cookie("localhost", "access_token_cookie", expiring_token)
+    assert len(_access_cookies(client.get("/user_info"))) == 1
+
+    # a concurrent request still carrying the old token does not mint another
+    client.set_cookie("localhost", "access_token_cookie", expiring_token)
+    assert _access_cookies(client.get("/user_info")) == []
+
+
+def test_token_outside_refresh_window_not_refreshed(app, client):
+    """This test checks that a token with more than `JWT_REFRESH_WINDOW` left is not refreshed"""
+    with app.app_context():
+        access_token = create_access_token(1, additional_claims={"user_type": "student"})
+    client.set_cookie("localhost", "access_token_cookie", access_token)
+
+    assert _access_cookies(client.get("/user_info")) == []
+
+
+def test_header_token_not_refreshed(expiring_token, client):
+    """This test checks that only cookie sessions are refreshed, API clients use the refresh endpoint"""
+    response = client.get("/user_info", headers={"Authorization": f"Bearer {expiring_token}"})
+    assert _access_cookies(response) == []
@@ -0,0 +1,28 @@
+from services import HomepageStats, get_homepage_stats
+
+
+def test_homepage_stats_counts(populate_db_with_stub_data, app):
+    """
+    This test checks that the homepage stats service counts each table shown on the homepage. The stub data contains
+    one row per table so we expect a count of one for each
+    """
+    with app.app_context():
+        assert get_homepage_stats() == HomepageStats(students=1, tutors=1, courses=1, events=1)
+
+
+def test_homepage_stats_single_round_trip(populate_db_with_stub_data, app, statement_counter):
+    """
+    This test ensures that the four counts are gathered in a single statement rather than one query per table; the
+    `statement_counter` fixture records the statements executed whilst collecting the stats
+    """
+    with app.app_context():
+        get_homepage_stats()
+
+    assert len(statement_counter) == 1
+
+
+def test_homepage_renders_counts(populate_db_with_stub_data, client):
+    """This test checks that the homepage renders the counts from the stats service"""
+    response = client.get("/homepage")
+    assert response.status_code == 200
+    assert b"<span>1</span>" in response.data
@@ -0,0 +1,41 @@
+import pytest
+from flask import render_template
+
+from services import TemplateNotPrecompiled, template_cache
+
+
+@pytest.fixture(scope="function")
+def template_cache_dir(app, tmp_path):
+    """This fixture points the bytecode cache of the app at an empty directory"""
+    app.config["TEMPLATE_CACHE_DIR"] = str(tmp_path)
+    template_cache.init_app(app)
+    return tmp_path
+
+
+def test_compile_command(app, template_cache_dir):
+    """This test checks that `flask templates compile` writes the bytecode of every template"""
+    result = app.test_cli_runner().invoke(args=["templates", "compile"])
+    assert result.exit_code == 0
+    assert len(list(template_cache_dir.iterdir())) == len(app.jinja_env.list_templates())
+
+
+def test_precompiled_templates_rendered_without_compiling(app, template_cache_dir, monkeypatch):
+    """This test checks that a worker loads the precompiled templates rather than compiling them"""
+    template_cache.compile(app)
+    # a new worker, with none of the templates loaded
+    app.jinja_env.cache.clear()
+    app.jinja_env.bytecode_cache.precompiled_only = True
+    monkeypatch.setattr(app.jinja_env, "compile", lambda *args, **kwargs: pytest.fail("template compiled"))
+
+    with app.test_request_context():
+        assert "Login" in render_template("login_form.html")
+
+
+def test_runtime_compilation_refused(app, template_cache_dir):
+    """This test checks that with `TEMPLATE_PRECOMPILED_ONLY` a template missing from the cache is not rendered"""
+    app.config["TEMPLATE_PRECOMPILED_ONLY"] = True
+    template_cache.init_app(app)
+
+    with app.test_request_context():
+        with pytest.raises(TemplateNotPrecompiled):
+            render_template("login_form.html")
@@ -0,0 +1,22 @@
+from db import db
+from models import CourseModel
+from services import upsert
+
+
+def test_upsert_creates_then_updates(app):
+    """This test checks that a missing row is created and an existing row is updated, touching its `updated_at`"""
+    with app.app_context():
+        course, created = upsert(CourseModel, 1, {"name": "English", "subject_type": "GCSE"})
+        db.session.commit()
+        assert created is True
+        assert course["id"] == 1
+
+        updated, created = upsert(CourseModel, 1, {"summary": "updated"})
+        db.session.commit()
+        assert created is False
+        assert (updated["name"], updated["summary"]) == ("English", "updated")
+        assert updated["updated_at"] > course["updated_at"]
+
+        touched, _ = upsert(CourseModel, 1, {})
+        db.session.commit()
+        assert touched["updated_at"] > updated["updated_at"]
@@ -0,0 +1,67 @@
+from sqlalchemy import insert, text
+
+from db import db
+from models import CourseModel, CourseRegisterModel, StudentModel, TutorModel
+from services import DATA, get_version
+
+
+def test_orm_writes_bump_version(populate_db_with_stub_data, app):
+    """This test checks that adding, updating, linking and deleting rows through the session bumps the data version"""
+    with app.app_context():
+        versions = [get_version(DATA)]
+
+        course = db.session.get(CourseModel, 1)
+        course.summary = "updated"
+        db.session.commit()
+        versions.append(get_version(DATA))
+
+        student, register = db.session.get(StudentModel, 1), db.session.get(CourseRegisterModel, 1)
+        student.registers.append(register)
+        db.session.commit()
+        versions.append(get_version(DATA))
+
+        db.session.delete(course.registers[0])
+        db.session.commit()
+        versions.append(get_version(DATA))
+
+    assert versions == sorted(set(versions))
+
+
+def test_bulk_insert_bumps_version(app):
+    """This test checks that bulk insert statements, which bypass the unit of work, bump the data version"""
+    with app.app_context():
+        assert get_version(DATA) == 0
+        db.session.execute(insert(CourseModel), [{"name": "English"}, {"name": "Maths"}])
+        db.session.commit()
+        assert get_version(DATA) == 1
+
+
+def test_rolled_back_write_does_not_bump_version(app):
+    """This test checks that versions are only bumped once the write they cover is committed"""
+    with app.app_context():
+        db.session.add(CourseModel(name="English"))
+        db.session.flush()
+        db.session.rollback()
+        assert get_version(DATA) == 0
+
+
+def test_concurrent_writes_do_not_wait_on_versions(app):
+    """
+    This test checks that two transactions writing different tables run concurrently, rather than the second waiting
+    on the version rows locked by the first until it commits
+    1. the first transaction writes a course and is left open
+    2. the second writes a tutor, failing rather than waiting if a row it locks is held by the first
+    3. both commit, and the versions are bumped once for each
+    """
+    with app.app_context():
+        db.session.add(CourseModel(name="English"))
+        db.session.flush()
+
+        # a new app context holds a session of its own, i.e. a second transaction
+        with app.app_context():
+            db.session.execute(text("SET LOCAL lock_timeout = '1s'"))
+            db.session.add(TutorModel(name="jane", age=30, email="jane@gmail.com", username="jane30", password="x"))
+            db.session.commit()
+
+        db.session.commit()
+        assert get_version(DATA) == 2
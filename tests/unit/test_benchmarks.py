@@ -0,0 +1,29 @@
+from benchmarks.load import is_error, percentile, summarise
+
+
+def test_percentile_nearest_rank():
+    """This test checks the nearest-rank percentiles reported by the load driver"""
+    latencies = list(range(1, 101))
+    assert percentile(latencies, 50) == 50
+    assert percentile(latencies, 95) == 95
+    assert percentile(latencies, 99) == 99
+    assert percentile([7], 99) == 7
+
+
+def test_summarise_per_route():
+    """This test checks that latency, errors and throughput are reported per route"""
+    results = {"GET /students": [(0.01, False), (0.02, False), (0.03, True), (0.04, False)]}
+    assert summarise(results, elapsed=2) == {
+        "GET /students": {"requests": 4, "errors": 1, "throughput": 2.0, "p50_ms": 20.0, "p95_ms": 40.0, "p99_ms": 40.0}
+    }
+
+
+def test_client_errors_counted():
+    """This test checks that every status but a 2xx or 3xx is an error, except those expected of a random route"""
+    assert not is_error("GET /students", 200)
+    assert not is_error("GET /homepage", 304)
+    assert is_error("POST /students/login", 401)
+    assert is_error("POST /students/<id>/course_registers/<id>", 404)
+    assert is_error("GET /students", 503)
+    assert not is_error("DELETE /students/<id>/course_registers/<id>", 404)
+    assert is_error("DELETE /students/<id>/course_registers/<id>", 400)
@@ -0,0 +1,98 @@
+import time
+import uuid
+
+import pytest
+
+from blocklist import BloomFilter, FileTokenSet, RevocationStore, TokenSet
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """This test checks that every item added to the Bloom filter is reported as present"""
+    bloom = BloomFilter(capacity=1000)
+    items = [str(uuid.uuid4()) for _ in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+
+
+def test_bloom_filter_false_positive_rate():
+    """This test checks that the false positive rate of a full Bloom filter is close to the requested error rate"""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for _ in range(1000):
+        bloom.add(str(uuid.uuid4()))
+
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10_000))
+    assert false_positives < 300
+
+
+@pytest.fixture(scope="function")
+def worker_stores(tmp_path):
+    """
+    This fixture mimics two gunicorn workers, each with their own RevocationStore (and Bloom filter) sharing a file
+    backend. Syncing is done on every lookup such that revocations are visible to the other worker immediately.
+    """
+    path = str(tmp_path / "revoked_tokens.db")
+    return RevocationStore(FileTokenSet(path, table="revoked_tokens"), sync_seconds=0), RevocationStore(
+        FileTokenSet(path, table="revoked_tokens"), sync_seconds=0
+    )
+
+
+def test_revocation_shared_between_workers(worker_stores):
+    """This test checks that a token revoked by one worker is rejected by another"""
+    first_worker, second_worker = worker_stores
+    assert not second_worker.is_revoked("jti")
+
+    assert first_worker.revoke("jti", expires_at=int(time.time()) + 60)
+    assert not first_worker.revoke("jti", expires_at=int(time.time()) + 60)  # revoking twice is a no-op
+    assert second_worker.is_revoked("jti")
+    assert not second_worker.is_revoked("another jti")
+
+
+def test_revocation_expires_with_token(worker_stores):
+    """This test checks that revocations are forgotten once the token they revoke has expired"""
+    first_worker, _ = worker_stores
+    first_worker.revoke("expired jti", expires_at=int(time.time()) - 1)
+    first_worker.revoke("live jti", expires_at=int(time.time()) + 60)
+    assert not first_worker.is_revoked("expired jti")
+
+    first_worker.backend.purge_expired()
+    assert first_worker.backend.revoked_since(None)[0] == ["live jti"]
+
+
+def test_refresh_token_revoked_after_use(populate_db_with_student_and_tutor_data, client):
+    """
+    This test checks the database backend end to end; a refresh token is revoked once it has been used to refresh
+    the access token, so a second refresh with the same token is rejected
+    """
+    login_response = client.post("/students/login", data={"username": "student123", "password": "student_password"})
+    headers = {"Authorization": f"Bearer {login_response.json['refresh_token']}"}
+
+    assert client.post("/refresh", headers=headers).status_code == 200
+    revoked_response = client.post("/refresh", headers=headers)
+    assert revoked_response.status_code == 401
+    assert revoked_response.json["error"] == "token_revoked"
+
+
+def test_revocation_after_purge_shared_between_workers(worker_stores, monkeypatch):
+    """
+    This test checks that a revocation added after the newest revocations were purged reaches the other workers; sqlite
+    reuses the ids of purged rows, so workers must not sync on them
+    """
+    first_worker, second_worker = worker_stores
+    now = time.time()
+    first_worker.revoke("first jti", expires_at=int(now) + 60)
+    first_worker.revoke("second jti", expires_at=int(now) + 60)
+    assert second_worker.is_revoked("second jti")
+
+    # the revoked tokens expire and are purged
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    first_worker.backend.purge_expired()
+    first_worker.revoke("jti", expires_at=int(now) + 180)
+    assert second_worker.is_revoked("jti")
+
+
+def test_token_set_interface():
+    """This test checks that a token set must implement the whole interface"""
+    with pytest.raises(TypeError):
+        TokenSet()
@@ -0,0 +1,101 @@
+"""
+Query plan regression tests. The key queries of the repository are EXPLAINed against a seeded postgres database and
+fail if any of them sequentially scans one of the large tables, i.e. if an index their access path relies on is
+missing. Sequential scans, and the hash and merge joins that read a whole table, are disabled whilst planning; at the
+size of a test database the planner would rightly prefer them, but a disabled plan is only chosen when no index can
+answer the query.
+"""
+
+import pytest
+import testing.postgresql
+from sqlalchemy import select, text
+
+from app import create_app
+from db import db
+from models import CourseRegisterModel, StudentModel, StudentRegister, TutorModel, TutorRegister
+from services import counterparts_query, courses_query, seed
+
+# the tables that grow with the number of users, the rest (e.g. `Courses`) are small enough to scan
+LARGE_TABLES = {"Students", "Tutors", "CourseRegisters", "StudentRegister", "TutorRegister"}
+
+QUERIES = {
+    "user by username": lambda: StudentModel.query.filter(StudentModel.username == "seed-student-42"),
+    "page of students": lambda: StudentModel.query.filter(StudentModel.id > 1000).order_by(StudentModel.id).limit(100),
+    "registers of a course": lambda: CourseRegisterModel.query.filter(CourseRegisterModel.course_id == 7),
+    "register name in a course": lambda: CourseRegisterModel.query.filter(
+        CourseRegisterModel.course_id == 7, CourseRegisterModel.name == "Autumn 2020 group 7"
+    ),
+    "registers of a student": lambda: CourseRegisterModel.query.filter(
+        CourseRegisterModel.students.any(StudentModel.id == 42)
+    ),
+    "registers of a tutor": lambda: CourseRegisterModel.query.filter(
+        CourseRegisterModel.tutors.any(TutorModel.id == 42)
+    ),
+    "eager registers of students": lambda: (
+        select(StudentRegister.student_id, CourseRegisterModel)
+        .join(CourseRegisterModel, CourseRegisterModel.id == StudentRegister.course_register_id)
+        .where(StudentRegister.student_id.in_(range(100, 200)))
+    ),
+    "eager students of registers": lambda: (
+        select(StudentRegister.course_register_id, StudentModel)
+        .join(StudentModel, StudentModel.id == StudentRegister.student_id)
+        .where(StudentRegister.course_register_id.in_(range(100, 200)))
+    ),
+    "eager tutors of registers": lambda: (
+        select(TutorRegister.course_register_id, TutorModel)
+        .join(TutorModel, TutorModel.id == TutorRegister.tutor_id)
+        .where(TutorRegister.course_register_id.in_(range(100, 200)))
+    ),
+    "tutors of a student": lambda: counterparts_query("student", 42),
+    "students of a tutor": lambda: counterparts_query("tutor", 42),
+    "courses of a student": lambda: courses_query("student", 42),
+}
+
+
+@pytest.fixture(scope="module")
+def seeded_app():
+    """A fixture yielding an app bound to a postgres database seeded at a scale where indexes are worth using"""
+    postgresql = testing.postgresql.Postgresql()
+    app = create_app(postgresql.url())
+    app.config.update({"TESTING": True})
+
+    with app.app_context():
+        db.create_all()
+        seed(students=2000, tutors=200, registers=400, random_seed=0)
+        db.session.commit()
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+    yield app
+
+    with app.app_context():
+        db.drop_all()
+
+    postgresql.stop()
+
+
+def _full_scans(plan):
+    """
+    :return: the relations read in full by an EXPLAIN (FORMAT JSON) plan; sequentially, or by walking a whole index
+    that does not match the conditions of the query
+    """
+    if plan["Node Type"] == "Seq Scan" or (
+        plan["Node Type"] in ("Index Scan", "Index Only Scan") and "Index Cond" not in plan
+    ):
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from _full_scans(child)
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_query_does_not_scan_large_tables(name, seeded_app):
+    """This test checks that a key query reads the large tables through an index rather than a full scan"""
+    with seeded_app.app_context():
+        query = QUERIES[name]()
+        statement = getattr(query, "statement", query)
+        sql = statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+        for setting in ("enable_seqscan", "enable_hashjoin", "enable_mergejoin"):
+            db.session.execute(text(f"SET LOCAL {setting} = off"))
+        plan = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()[0]["Plan"]
+
+    assert not set(_full_scans(plan)) & LARGE_TABLES, plan